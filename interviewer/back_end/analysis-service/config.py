@@ -43,6 +43,15 @@ PDF_CHUNK_SIZE = int(os.getenv("PDF_CHUNK_SIZE", "1000"))
 PDF_CHUNK_OVERLAP = int(os.getenv("PDF_CHUNK_OVERLAP", "200"))
 PDF_MAX_FILE_SIZE = int(os.getenv("PDF_MAX_FILE_SIZE", "10"))  # MB
 
+# pdf-parser-service客户端 (共享连接池，超时单位为秒；重试次数同时用于连接失败和服务繁忙返回503)
+PDF_PARSER_TIMEOUT = float(os.getenv("PDF_PARSER_TIMEOUT", "60"))
+PDF_PARSER_CONNECT_TIMEOUT = float(os.getenv("PDF_PARSER_CONNECT_TIMEOUT", "5"))
+PDF_PARSER_HEALTH_TIMEOUT = float(os.getenv("PDF_PARSER_HEALTH_TIMEOUT", "5"))
+PDF_PARSER_MAX_CONNECTIONS = int(os.getenv("PDF_PARSER_MAX_CONNECTIONS", "20"))
+PDF_PARSER_MAX_KEEPALIVE = int(os.getenv("PDF_PARSER_MAX_KEEPALIVE", "10"))
+PDF_PARSER_KEEPALIVE_EXPIRY = float(os.getenv("PDF_PARSER_KEEPALIVE_EXPIRY", "30"))
+PDF_PARSER_MAX_RETRIES = int(os.getenv("PDF_PARSER_MAX_RETRIES", "2"))
+
 # 支持的文件类型
 ALLOWED_FILE_EXTENSIONS = ['.pdf']
 ALLOWED_MIME_TYPES = ['application/pdf']
@@ -110,6 +119,12 @@ def get_config_info() -> dict:
             "temperature": LLM_TEMPERATURE,
             "max_tokens": LLM_MAX_TOKENS
         },
+        "pdf_parser": {
+            "timeout": PDF_PARSER_TIMEOUT,
+            "max_connections": PDF_PARSER_MAX_CONNECTIONS,
+            "max_keepalive": PDF_PARSER_MAX_KEEPALIVE,
+            "max_retries": PDF_PARSER_MAX_RETRIES
+        },
         "api": {
             "host": API_HOST,
             "port": API_PORT,
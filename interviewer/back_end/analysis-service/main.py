@@ -72,6 +72,9 @@ async def lifespan(app: FastAPI):
         # 检查LLM服务
         if not llm_service.is_available():
             raise Exception("LLM服务不可用")
+
+        # 创建PDF解析服务的共享HTTP客户端
+        await pdf_service.start()
         
         logger.info("🎉 服务启动完成")
         
@@ -84,6 +87,7 @@ async def lifespan(app: FastAPI):
     # 关闭时执行
     logger.info("🛑 关闭简历分析服务...")
     db_service.disconnect()
+    await pdf_service.close()
     logger.info("✅ 服务已关闭")
 
 # 创建FastAPI应用
@@ -114,7 +118,7 @@ async def health_check():
         llm_available = llm_service.is_available()
         
         # 检查PDF服务
-        pdf_status = pdf_service.check_pdf_parser_service()
+        pdf_status = await pdf_service.check_pdf_parser_service()
         
         # 获取统计信息
         stats = None
@@ -185,7 +189,7 @@ async def analyze_resume(
         
         # 1. 解析PDF文件
         logger.info("步骤1: 解析PDF文件")
-        resume_text = pdf_service.parse_pdf(file, use_local=True)  # 强制使用本地解析
+        resume_text = await pdf_service.parse_pdf(file, use_local=True)  # 强制使用本地解析
         
         if not resume_text or len(resume_text.strip()) < 50:
             raise HTTPException(status_code=400, detail="PDF文件内容过少或解析失败")
@@ -379,7 +383,7 @@ async def parse_pdf_only(file: UploadFile = File(...)):
             raise HTTPException(status_code=400, detail="只支持PDF文件")
 
         # 解析PDF文件
-        resume_text = pdf_service.parse_pdf(file, use_local=False)  # 使用pdf-parser-service
+        resume_text = await pdf_service.parse_pdf(file, use_local=False)  # 使用pdf-parser-service
 
         return {
             "success": True,
@@ -3,20 +3,63 @@ PDF解析服务
 """
 
 import os
+import math
+import asyncio
 import logging
-import tempfile
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional, Dict, Any
 from pathlib import Path
-import requests
+import httpx
 from fastapi import UploadFile, HTTPException
 
 from config import (
     PDF_CHUNK_SIZE, PDF_CHUNK_OVERLAP, PDF_MAX_FILE_SIZE,
-    ALLOWED_FILE_EXTENSIONS, ALLOWED_MIME_TYPES
+    ALLOWED_FILE_EXTENSIONS, ALLOWED_MIME_TYPES,
+    PDF_PARSER_TIMEOUT, PDF_PARSER_CONNECT_TIMEOUT, PDF_PARSER_HEALTH_TIMEOUT,
+    PDF_PARSER_MAX_CONNECTIONS, PDF_PARSER_MAX_KEEPALIVE, PDF_PARSER_KEEPALIVE_EXPIRY,
+    PDF_PARSER_MAX_RETRIES
 )
 
 logger = logging.getLogger(__name__)
 
+# 重试等待时间的默认值和上限(秒)
+DEFAULT_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 10.0
+
+
+def parse_retry_after(value: Optional[str]) -> float:
+    """
+    解析Retry-After响应头
+
+    RFC 9110 允许秒数或HTTP日期两种格式；缺失或无法解析时使用默认值，结果限制在 [0, MAX_RETRY_DELAY]。
+
+    Args:
+        value: Retry-After响应头的值
+
+    Returns:
+        float: 等待秒数
+    """
+    if not value:
+        return DEFAULT_RETRY_DELAY
+
+    value = value.strip()
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return DEFAULT_RETRY_DELAY
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+    if not math.isfinite(delay):
+        return DEFAULT_RETRY_DELAY
+    return min(max(delay, 0.0), MAX_RETRY_DELAY)
+
+
 class PDFService:
     """PDF解析服务类"""
     
@@ -24,6 +67,39 @@ class PDFService:
         # PDF解析服务的URL - 使用新的pdf-parser-service
         self.pdf_parser_url = os.getenv("DOCUMENT_PARSER_URL", "http://43.142.157.145:8003")
         self.max_file_size = PDF_MAX_FILE_SIZE * 1024 * 1024  # 转换为字节
+        # 共享的异步HTTP客户端，在应用生命周期内复用连接
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """创建共享的异步HTTP客户端，应用启动时调用"""
+        if self.client is not None:
+            return
+
+        self.client = httpx.AsyncClient(
+            base_url=self.pdf_parser_url,
+            timeout=httpx.Timeout(PDF_PARSER_TIMEOUT, connect=PDF_PARSER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=PDF_PARSER_MAX_CONNECTIONS,
+                max_keepalive_connections=PDF_PARSER_MAX_KEEPALIVE,
+                keepalive_expiry=PDF_PARSER_KEEPALIVE_EXPIRY
+            ),
+            # 连接建立失败时重试，请求尚未发出，对POST也是安全的
+            transport=httpx.AsyncHTTPTransport(retries=PDF_PARSER_MAX_RETRIES)
+        )
+        logger.info(f"PDF解析服务客户端已创建: {self.pdf_parser_url}, 最大连接数: {PDF_PARSER_MAX_CONNECTIONS}")
+
+    async def close(self):
+        """关闭共享的异步HTTP客户端，应用关闭时调用"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("PDF解析服务客户端已关闭")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """获取共享客户端，未经过应用生命周期启动时（如脚本中直接调用）按需创建"""
+        if self.client is None:
+            await self.start()
+        return self.client
         
     def validate_file(self, file: UploadFile) -> bool:
         """验证上传的文件"""
@@ -51,30 +127,39 @@ class PDFService:
             logger.error(f"文件验证失败: {e}")
             raise HTTPException(status_code=400, detail=f"文件验证失败: {str(e)}")
     
-    def parse_pdf_with_parser_service(self, file: UploadFile) -> str:
+    async def parse_pdf_with_parser_service(self, file: UploadFile) -> str:
         """使用pdf-parser-service解析PDF"""
         try:
             logger.info(f"开始解析PDF文件: {file.filename}")
 
-            # 准备请求数据
-            files = {
-                'file': (file.filename, file.file, file.content_type)
-            }
+            # 读入内存后发送，服务繁忙需要重试时可以重复使用
+            await file.seek(0)
+            content = await file.read()
 
-            data = {
+            # 分块参数是pdf-parser-service的查询参数
+            params = {
                 'chunk_size': PDF_CHUNK_SIZE,
                 'chunk_overlap': PDF_CHUNK_OVERLAP,
                 'split_text': True
             }
 
             # 调用pdf-parser-service的/parse-text接口
-            response = requests.post(
-                f"{self.pdf_parser_url}/parse-text",
-                files=files,
-                data=data,
-                timeout=60
-            )
-            
+            client = await self._get_client()
+            attempt = 0
+            while True:
+                response = await client.post(
+                    "/parse-text",
+                    files={'file': (file.filename, content, file.content_type)},
+                    params=params
+                )
+                # 解析任务池已满时返回503，按Retry-After等待后重试
+                if response.status_code != 503 or attempt >= PDF_PARSER_MAX_RETRIES:
+                    break
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                attempt += 1
+                logger.warning(f"PDF解析服务繁忙，{delay:.1f}秒后第{attempt}次重试")
+                await asyncio.sleep(delay)
+
             if response.status_code != 200:
                 error_msg = f"PDF解析服务调用失败: {response.status_code}"
                 logger.error(error_msg)
@@ -93,7 +178,7 @@ class PDFService:
                 logger.warning(f"PDF解析失败: {error_msg}")
                 raise HTTPException(status_code=503, detail=f"PDF解析失败: {error_msg}")
                 
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             error_msg = f"PDF解析服务连接失败: {str(e)}"
             logger.error(error_msg)
             raise HTTPException(status_code=503, detail=error_msg)
@@ -109,47 +194,36 @@ class PDFService:
         try:
             logger.info(f"使用本地方法解析PDF: {file.filename}")
 
-            # 创建临时文件
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                # 写入上传的文件内容
-                content = file.file.read()
-                logger.info(f"读取文件内容: {len(content) if content else 0} 字节")
-                if not content:
-                    raise HTTPException(status_code=400, detail="上传的文件为空")
-                temp_file.write(content)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 使用PyPDF2解析
-                import PyPDF2
-                
-                text_content = ""
-                with open(temp_file_path, 'rb') as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        try:
-                            page_text = page.extract_text()
-                            if page_text:
-                                text_content += f"\n--- 第{page_num + 1}页 ---\n"
-                                text_content += page_text + "\n"
-                        except Exception as e:
-                            logger.warning(f"解析第{page_num + 1}页失败: {e}")
-                            continue
-                
-                if not text_content.strip():
-                    raise HTTPException(status_code=500, detail="PDF文件无法提取文本内容")
-                
-                logger.info(f"本地PDF解析完成: {file.filename}, 内容长度: {len(text_content)}")
-                return text_content.strip()
-                
-            finally:
-                # 清理临时文件
+            # 直接读取上传的文件流（内存或Starlette的SpooledTemporaryFile），不再另写临时文件
+            file.file.seek(0, os.SEEK_END)
+            size = file.file.tell()
+            file.file.seek(0)
+            logger.info(f"读取文件内容: {size} 字节")
+            if not size:
+                raise HTTPException(status_code=400, detail="上传的文件为空")
+
+            # 使用PyPDF2解析
+            import PyPDF2
+
+            text_content = ""
+            pdf_reader = PyPDF2.PdfReader(file.file)
+
+            for page_num, page in enumerate(pdf_reader.pages):
                 try:
-                    os.unlink(temp_file_path)
+                    page_text = page.extract_text()
+                    if page_text:
+                        text_content += f"\n--- 第{page_num + 1}页 ---\n"
+                        text_content += page_text + "\n"
                 except Exception as e:
-                    logger.warning(f"清理临时文件失败: {e}")
-                    
+                    logger.warning(f"解析第{page_num + 1}页失败: {e}")
+                    continue
+
+            if not text_content.strip():
+                raise HTTPException(status_code=500, detail="PDF文件无法提取文本内容")
+
+            logger.info(f"本地PDF解析完成: {file.filename}, 内容长度: {len(text_content)}")
+            return text_content.strip()
+
         except ImportError:
             raise HTTPException(
                 status_code=500, 
@@ -160,8 +234,8 @@ class PDFService:
             logger.error(error_msg)
             raise HTTPException(status_code=500, detail=error_msg)
     
-    def parse_pdf(self, file: UploadFile, use_local: bool = False) -> str:
-        """解析PDF文件"""
+    async def parse_pdf(self, file: UploadFile, use_local: bool = False) -> str:
+        """解析PDF文件，本地解析在线程池中执行，不阻塞事件循环"""
         # 验证文件
         self.validate_file(file)
 
@@ -170,25 +244,23 @@ class PDFService:
 
         try:
             if use_local:
-                return self.parse_pdf_local(file)
+                return await asyncio.to_thread(self.parse_pdf_local, file)
             else:
-                return self.parse_pdf_with_parser_service(file)
+                return await self.parse_pdf_with_parser_service(file)
         except (HTTPException, Exception) as e:
             # 如果PDF解析服务失败，尝试本地解析
             if not use_local:
                 logger.warning(f"PDF解析服务失败: {str(e)}，尝试本地解析")
                 file.file.seek(0)  # 重置文件指针
-                return self.parse_pdf_local(file)
+                return await asyncio.to_thread(self.parse_pdf_local, file)
             else:
                 raise
     
-    def check_pdf_parser_service(self) -> Dict[str, Any]:
+    async def check_pdf_parser_service(self) -> Dict[str, Any]:
         """检查PDF解析服务状态"""
         try:
-            response = requests.get(
-                f"{self.pdf_parser_url}/health",
-                timeout=5
-            )
+            client = await self._get_client()
+            response = await client.get("/health", timeout=PDF_PARSER_HEALTH_TIMEOUT)
 
             if response.status_code == 200:
                 return {
@@ -203,7 +275,7 @@ class PDFService:
                     "url": self.pdf_parser_url
                 }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             return {
                 "available": False,
                 "status": f"connection_failed ({str(e)})",
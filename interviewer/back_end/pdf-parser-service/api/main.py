@@ -3,21 +3,30 @@ PDF解析服务API主模块
 提供纯粹的PDF文档解析功能
 """
 
+import io
 import os
 import uuid
+import hashlib
 import time
-import tempfile
+import asyncio
 import logging
+import threading
+import zipfile
+import concurrent.futures
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Literal, AsyncIterator, Tuple
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel
 
 from .models import (
     ParseResponse, TextParseResponse, HealthResponse,
-    ErrorResponse, DocumentModel
+    ErrorResponse, DocumentModel, BatchFileResult, BatchParseResponse, ParseStreamChunk, ParseStreamSummary, ParseStreamError,
+    TaskSubmitResponse, TaskStatusResponse
 )
 
 # 修复相对导入问题
@@ -25,7 +34,10 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from parsers import PDFParser
+from parsers import (
+    get_parser, shutdown_page_pool, ParseWorkerPool, ParsePoolFullError, get_parse_cache, ParseJobQueue,
+    available_extractors, default_extractor_name
+)
 
 # 配置日志
 logging.basicConfig(
@@ -34,13 +46,120 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 全局解析任务池，所有解析路由的同步解析都提交到这里执行
+parse_pool = ParseWorkerPool()
+
+# 全局解析结果缓存，未启用时为None
+parse_cache = get_parse_cache()
+
+
+def pool_full_exception(e: ParsePoolFullError) -> HTTPException:
+    """解析任务池已满时返回503，提示客户端稍后重试"""
+    logger.warning(str(e))
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+def build_parse_result(task_id: str, parser, documents, processing_time: float,
+                       cache_hit: bool, return_content: bool) -> dict:
+    """
+    组装 /parse 与异步解析任务共用的解析结果
+
+    Args:
+        task_id: 任务ID
+        parser: 解析器实例
+        documents: 解析得到的文档列表
+        processing_time: 处理时间(秒)
+        cache_hit: 是否命中解析缓存
+        return_content: 是否返回解析内容
+
+    Returns:
+        dict: ParseResponse 的字段
+    """
+    doc_info = parser.get_document_info(documents)
+
+    response_data = {
+        "success": True,
+        "message": "PDF解析成功",
+        "task_id": task_id,
+        "total_documents": doc_info["total_docs"],
+        "total_chars": doc_info["total_chars"],
+        "avg_chars": doc_info["avg_chars"],
+        "total_pages": doc_info.get("total_pages"),
+        "processing_time": round(processing_time, 2),
+        "cache_hit": cache_hit
+    }
+
+    # 如果需要返回内容
+    if return_content:
+        response_data["documents"] = [
+            DocumentModel(
+                content=doc.page_content,
+                metadata=doc.metadata,
+                content_length=len(doc.page_content)
+            )
+            for doc in documents
+        ]
+
+    return response_data
+
+
+def run_parse_job(task_id: str, content: bytes, file_name: str, params: dict) -> dict:
+    """
+    在任务队列的后台线程中执行异步解析任务
+
+    Args:
+        task_id: 任务ID
+        content: PDF文件内容
+        file_name: 文件名
+        params: 解析参数 chunk_size、chunk_overlap、split_text、return_content
+
+    Returns:
+        dict: 可JSON序列化的 ParseResponse
+    """
+    start_time = time.time()
+    parser = get_parser(params["chunk_size"], params["chunk_overlap"], params.get("extractor"))
+    documents, cache_hit = parser.parse_pdf_bytes_cached(content, file_name, split_text=params["split_text"])
+    response_data = build_parse_result(
+        task_id, parser, documents, time.time() - start_time, cache_hit, params["return_content"]
+    )
+    return ParseResponse(**response_data).model_dump()
+
+
+def request_parser(chunk_size: int, chunk_overlap: int, extractor: Optional[str]):
+    """按请求参数获取共享的解析器实例，提取后端未知或未安装时返回400"""
+    try:
+        return get_parser(chunk_size, chunk_overlap, extractor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# 全局异步解析任务队列，任务持久化在本地SQLite中，由后台线程执行
+parse_jobs = ParseJobQueue(run_parse_job)
+
+
+# 应用启动和关闭处理
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理"""
+    # 启动异步解析任务的后台线程，继续执行上次未完成的任务
+    parse_jobs.start()
+
+    yield
+
+    # 关闭时回收解析任务队列、解析任务池和页面提取进程池
+    parse_jobs.shutdown()
+    parse_pool.shutdown()
+    shutdown_page_pool()
+
+
 # 创建FastAPI应用
 app = FastAPI(
     title="PDF解析服务",
     description="专门用于PDF文档解析的微服务",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # 添加CORS中间件
@@ -72,7 +191,11 @@ async def health_check():
         status="healthy",
         service="pdf-parser-service",
         version="1.0.0",
-        timestamp=datetime.now().isoformat()
+        timestamp=datetime.now().isoformat(),
+        parse_pool=parse_pool.get_stats(),
+        parse_cache=parse_cache.get_stats() if parse_cache is not None else {"enabled": False},
+        parse_jobs=parse_jobs.get_stats(),
+        extractors={"default": default_extractor_name(), "available": available_extractors()}
     )
 
 
@@ -81,6 +204,7 @@ async def parse_pdf(
     file: UploadFile = File(...),
     chunk_size: int = Query(1000, description="文档分块大小", ge=100, le=5000),
     chunk_overlap: int = Query(200, description="分块重叠大小", ge=0, le=1000),
+    extractor: Optional[str] = Query(None, description="文本提取后端: pypdf / pdfium / pymupdf，默认读取 PDF_EXTRACTOR"),
     split_text: bool = Query(True, description="是否进行文本分块"),
     return_content: bool = Query(False, description="是否返回解析内容")
 ):
@@ -91,6 +215,7 @@ async def parse_pdf(
         file: 上传的PDF文件
         chunk_size: 文档分块大小
         chunk_overlap: 分块重叠大小
+        extractor: 文本提取后端
         split_text: 是否进行文本分块
         return_content: 是否在响应中返回解析内容
 
@@ -101,64 +226,470 @@ async def parse_pdf(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="只支持PDF文件")
 
+    # 获取共享的解析器实例，提取后端不可用时返回400
+    parser = request_parser(chunk_size, chunk_overlap, extractor)
+
     task_id = str(uuid.uuid4())
     start_time = time.time()
 
     logger.info(f"开始解析PDF文件: {file.filename}, 任务ID: {task_id}")
 
     try:
-        # 保存上传的文件到临时目录
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-
-        # 创建解析器实例
-        parser = PDFParser(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        # 读取上传内容，直接在内存中解析，不写临时文件
+        content = await file.read()
 
-        # 解析PDF
-        documents = parser.parse_pdf_to_documents(temp_file_path, split_text=split_text)
-
-        # 获取文档信息
-        doc_info = parser.get_document_info(documents)
+        # 解析PDF，在解析任务池中执行，不阻塞事件循环；相同内容和分块参数直接返回缓存结果
+        documents, cache_hit = await parse_pool.run(
+            parser.parse_pdf_bytes_cached, content, file.filename, split_text=split_text
+        )
 
         processing_time = time.time() - start_time
 
         # 准备响应数据
-        response_data = {
-            "success": True,
-            "message": "PDF解析成功",
-            "task_id": task_id,
-            "total_documents": doc_info["total_docs"],
-            "total_chars": doc_info["total_chars"],
-            "avg_chars": doc_info["avg_chars"],
-            "total_pages": doc_info.get("total_pages"),
-            "processing_time": round(processing_time, 2)
-        }
-
-        # 如果需要返回内容
-        if return_content:
-            response_data["documents"] = [
-                DocumentModel(
-                    content=doc.page_content,
-                    metadata=doc.metadata,
-                    content_length=len(doc.page_content)
-                )
-                for doc in documents
-            ]
+        response_data = build_parse_result(task_id, parser, documents, processing_time, cache_hit, return_content)
 
         logger.info(f"PDF解析完成: {file.filename}, 耗时: {processing_time:.2f}秒")
 
         return ParseResponse(**response_data)
 
+    except ParsePoolFullError as e:
+        raise pool_full_exception(e)
     except Exception as e:
         logger.error(f"PDF解析失败: {file.filename}, 错误: {str(e)}")
         raise HTTPException(status_code=500, detail=f"PDF解析失败: {str(e)}")
 
+
+@app.post("/parse/async", response_model=TaskSubmitResponse, status_code=202)
+async def submit_parse_task(
+    file: UploadFile = File(...),
+    chunk_size: int = Query(1000, description="文档分块大小", ge=100, le=5000),
+    chunk_overlap: int = Query(200, description="分块重叠大小", ge=0, le=1000),
+    extractor: Optional[str] = Query(None, description="文本提取后端: pypdf / pdfium / pymupdf，默认读取 PDF_EXTRACTOR"),
+    split_text: bool = Query(True, description="是否进行文本分块"),
+    return_content: bool = Query(False, description="是否在结果中返回解析内容")
+):
+    """
+    提交异步解析任务，立即返回任务ID，通过 GET /tasks/{task_id} 查询状态和结果
+
+    Args:
+        file: 上传的PDF文件
+        chunk_size: 文档分块大小
+        chunk_overlap: 分块重叠大小
+        extractor: 文本提取后端
+        split_text: 是否进行文本分块
+        return_content: 是否在结果中返回解析内容
+
+    Returns:
+        TaskSubmitResponse: 任务提交结果
+    """
+    # 验证文件类型
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="只支持PDF文件")
+
+    # 获取共享的解析器实例，提取后端不可用时返回400
+    parser = request_parser(chunk_size, chunk_overlap, extractor)
+
+    task_id = str(uuid.uuid4())
+
+    content = await file.read()
+    params = {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "split_text": split_text,
+        "return_content": return_content,
+        "extractor": parser.extractor.name
+    }
+
+    try:
+        # 写入SQLite很快，直接在事件循环中执行
+        parse_jobs.submit(task_id, content, file.filename, params)
+    except ParsePoolFullError as e:
+        raise pool_full_exception(e)
+
+    logger.info(f"提交异步解析任务: {file.filename}, 任务ID: {task_id}")
+
+    return TaskSubmitResponse(
+        success=True,
+        message="解析任务已提交",
+        task_id=task_id,
+        status="pending"
+    )
+
+
+@app.get("/tasks/{task_id}", response_model=TaskStatusResponse)
+async def get_parse_task(task_id: str):
+    """
+    查询异步解析任务的状态和结果
+
+    Args:
+        task_id: 任务ID
+
+    Returns:
+        TaskStatusResponse: 任务状态，完成时包含解析结果
+    """
+    task = parse_jobs.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在或结果已过期: {task_id}")
+    return TaskStatusResponse(**task)
+
+
+# 批量解析单次最多处理的文件数，压缩包按其中的PDF数计算
+BATCH_MAX_FILES = int(os.getenv('PARSE_BATCH_MAX_FILES', '50'))
+
+# 压缩包内单个PDF解压后的大小上限，防止压缩炸弹
+BATCH_MAX_FILE_BYTES = int(os.getenv('PDF_MAX_FILE_SIZE', '10')) * 1024 * 1024
+
+# 整个批次解压后的总大小上限
+BATCH_MAX_TOTAL_BYTES = int(os.getenv('PARSE_BATCH_MAX_TOTAL_MB', '200')) * 1024 * 1024
+
+
+class BatchLimitError(ValueError):
+    """批次的文件数或总大小超出上限"""
+
+
+def _is_pdf_entry(info: zipfile.ZipInfo) -> bool:
+    """跳过目录、非PDF文件和macOS压缩时附带的资源文件"""
+    return not info.is_dir() and info.filename.lower().endswith('.pdf') and not info.filename.startswith('__MACOSX/')
+
+
+def unpack_batch_uploads(uploads: List[Tuple[str, bytes]]) -> List[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    展开批量上传的PDF和zip压缩包，无法读取的文件记录错误而不中断整个批次
+
+    先只读取压缩包目录统计PDF数量和声明的解压后大小，超出上限时在解压任何内容之前拒绝。
+
+    Args:
+        uploads: (文件名, 文件内容) 列表
+
+    Returns:
+        List[Tuple[str, Optional[bytes], Optional[str]]]: (文件名, PDF内容, 错误信息) 列表
+
+    Raises:
+        BatchLimitError: 文件数超过 BATCH_MAX_FILES 或总大小超过 BATCH_MAX_TOTAL_BYTES
+    """
+    # 第一遍：打开压缩包目录，统计文件数和总大小
+    archives = {}
+    total_files = 0
+    total_bytes = 0
+    for index, (name, content) in enumerate(uploads):
+        lower_name = name.lower()
+        if lower_name.endswith('.zip'):
+            try:
+                archives[index] = zipfile.ZipFile(io.BytesIO(content))
+            except zipfile.BadZipFile:
+                total_files += 1
+                continue
+            pdf_infos = [info for info in archives[index].infolist() if _is_pdf_entry(info)]
+            total_files += len(pdf_infos)
+            total_bytes += sum(min(info.file_size, BATCH_MAX_FILE_BYTES) for info in pdf_infos)
+        else:
+            total_files += 1
+            total_bytes += len(content)
+
+    try:
+        if total_files > BATCH_MAX_FILES:
+            raise BatchLimitError(f"单次最多解析 {BATCH_MAX_FILES} 个文件，本次 {total_files} 个")
+        if total_bytes > BATCH_MAX_TOTAL_BYTES:
+            raise BatchLimitError(f"批次总大小超过上限 {BATCH_MAX_TOTAL_BYTES // (1024 * 1024)}MB")
+
+        # 第二遍：逐个解压
+        entries = []
+        for index, (name, content) in enumerate(uploads):
+            lower_name = name.lower()
+            if lower_name.endswith('.pdf'):
+                entries.append((name, content, None))
+                continue
+            if not lower_name.endswith('.zip'):
+                entries.append((name, None, "只支持PDF文件或zip压缩包"))
+                continue
+
+            archive = archives.get(index)
+            if archive is None:
+                entries.append((name, None, "压缩包无法读取"))
+                continue
+
+            for info in archive.infolist():
+                if not _is_pdf_entry(info):
+                    continue
+                entry_name = f"{name}/{info.filename}"
+                if info.file_size > BATCH_MAX_FILE_BYTES:
+                    entries.append((entry_name, None, f"文件过大: {info.file_size} 字节"))
+                    continue
+                try:
+                    # 最多读取上限加一个字节，目录中声明的大小不可信
+                    with archive.open(info) as entry:
+                        data = entry.read(BATCH_MAX_FILE_BYTES + 1)
+                    if len(data) > BATCH_MAX_FILE_BYTES:
+                        entries.append((entry_name, None, "文件过大"))
+                    else:
+                        entries.append((entry_name, data, None))
+                except Exception as e:
+                    entries.append((entry_name, None, f"解压失败: {str(e)}"))
+        return entries
     finally:
-        # 清理临时文件
-        if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
+        for archive in archives.values():
+            archive.close()
+
+
+@app.post("/parse/batch", response_model=BatchParseResponse)
+async def parse_pdf_batch(
+    files: List[UploadFile] = File([], description="PDF文件或zip压缩包，可上传多个"),
+    chunk_size: int = Query(1000, description="文档分块大小", ge=100, le=5000),
+    chunk_overlap: int = Query(200, description="分块重叠大小", ge=0, le=1000),
+    extractor: Optional[str] = Query(None, description="文本提取后端: pypdf / pdfium / pymupdf，默认读取 PDF_EXTRACTOR"),
+    split_text: bool = Query(True, description="是否进行文本分块"),
+    return_content: bool = Query(False, description="是否返回解析内容")
+):
+    """
+    批量解析多个PDF文件，文件之间在进程池中并行解析，单个文件失败不影响其他文件
+
+    Args:
+        files: 上传的PDF文件或包含PDF的zip压缩包
+        chunk_size: 文档分块大小
+        chunk_overlap: 分块重叠大小
+        extractor: 文本提取后端
+        split_text: 是否进行文本分块
+        return_content: 是否在响应中返回解析内容
+
+    Returns:
+        BatchParseResponse: 各文件的解析结果和整体耗时
+    """
+    # 获取共享的解析器实例，提取后端不可用时返回400
+    parser = request_parser(chunk_size, chunk_overlap, extractor)
+
+    # 读取任何内容之前先检查上传数量
+    if not files:
+        raise HTTPException(status_code=400, detail="请至少上传一个PDF文件或zip压缩包")
+    if len(files) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"单次最多解析 {BATCH_MAX_FILES} 个文件，本次上传 {len(files)} 个")
+
+    task_id = str(uuid.uuid4())
+    start_time = time.time()
+
+    uploads = [(file.filename, await file.read()) for file in files]
+
+    try:
+        # 解压和解析都在解析任务池中执行；批次只占一个任务名额，文件间的并行由进程池完成
+        try:
+            entries = await parse_pool.run(unpack_batch_uploads, uploads)
+        except BatchLimitError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not entries:
+            raise HTTPException(status_code=400, detail="上传内容中没有PDF文件")
+
+        logger.info(f"开始批量解析PDF文件: {len(entries)} 个, 任务ID: {task_id}")
+
+        readable = [(name, content) for name, content, error in entries if error is None]
+        parsed = iter(await parse_pool.run(parser.parse_pdf_batch, readable, split_text=split_text))
+    except ParsePoolFullError as e:
+        raise pool_full_exception(e)
+
+    results = []
+    for name, _, error in entries:
+        if error is not None:
+            results.append(BatchFileResult(file_name=name, success=False, error=error))
+            continue
+
+        item = next(parsed)
+        if item["error"] is not None:
+            results.append(BatchFileResult(file_name=name, success=False, error=f"PDF解析失败: {item['error']}"))
+            continue
+
+        documents = item["documents"]
+        doc_info = parser.get_document_info(documents)
+        results.append(BatchFileResult(
+            file_name=name,
+            success=True,
+            total_documents=doc_info["total_docs"],
+            total_chars=doc_info["total_chars"],
+            total_pages=doc_info.get("total_pages"),
+            processing_time=round(item["processing_time"], 2),
+            cache_hit=item["cache_hit"],
+            documents=[
+                DocumentModel(content=doc.page_content, metadata=doc.metadata, content_length=len(doc.page_content))
+                for doc in documents
+            ] if return_content else None
+        ))
+
+    succeeded = sum(1 for result in results if result.success)
+    processing_time = time.time() - start_time
+
+    logger.info(f"PDF批量解析完成: 成功 {succeeded}, 失败 {len(results) - succeeded}, 耗时: {processing_time:.2f}秒")
+
+    return BatchParseResponse(
+        success=succeeded == len(results),
+        message=f"批量解析完成: 成功 {succeeded} 个, 失败 {len(results) - succeeded} 个",
+        task_id=task_id,
+        total_files=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        total_documents=sum(result.total_documents for result in results),
+        total_chars=sum(result.total_chars for result in results),
+        processing_time=round(processing_time, 2),
+        total_file_time=round(sum(result.processing_time for result in results), 2),
+        results=results
+    )
+
+
+# 流式解析时解析线程与响应之间最多缓冲的页数，决定服务端内存上限
+STREAM_BUFFER_PAGES = 2
+
+# 解析线程等待响应读取下一页的最长时间(秒)，超时即停止解析，避免客户端不读取时长期占用任务池
+STREAM_SEND_TIMEOUT = int(os.getenv('PARSE_STREAM_SEND_TIMEOUT', '60'))
+
+# 解析线程等待期间检查响应是否已结束的间隔(秒)
+STREAM_POLL_INTERVAL = 1
+
+
+def encode_stream_message(message: BaseModel, stream_format: str) -> str:
+    """按NDJSON或SSE格式编码一条流式消息"""
+    body = message.model_dump_json()
+    if stream_format == "sse":
+        return f"event: {message.type}\ndata: {body}\n\n"
+    return body + "\n"
+
+
+@app.post("/parse/stream")
+async def parse_pdf_stream(
+    file: UploadFile = File(...),
+    chunk_size: int = Query(1000, description="文档分块大小", ge=100, le=5000),
+    chunk_overlap: int = Query(200, description="分块重叠大小", ge=0, le=1000),
+    extractor: Optional[str] = Query(None, description="文本提取后端: pypdf / pdfium / pymupdf，默认读取 PDF_EXTRACTOR"),
+    split_text: bool = Query(True, description="是否进行文本分块"),
+    stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format", description="输出格式: ndjson 或 sse")
+):
+    """
+    流式解析PDF文件，逐页提取和分块，每个分块一条消息
+
+    消息依次为若干条 chunk，最后是一条 summary；出错时以一条 error 结束。
+    解析线程最多领先响应 STREAM_BUFFER_PAGES 页，服务端内存只与单页大小相关；
+    响应结束（包括客户端在开始读取前断开）或超过 STREAM_SEND_TIMEOUT 秒未读取时，解析线程停止并释放任务池容量。
+    流式解析不读写解析缓存。
+
+    Args:
+        file: 上传的PDF文件
+        chunk_size: 文档分块大小
+        chunk_overlap: 分块重叠大小
+        extractor: 文本提取后端
+        split_text: 是否进行文本分块
+        stream_format: 输出格式，ndjson 为每行一个JSON，sse 为 text/event-stream
+
+    Returns:
+        StreamingResponse: 流式解析结果
+    """
+    # 验证文件类型
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="只支持PDF文件")
+
+    # 获取共享的解析器实例，提取后端不可用时返回400
+    parser = request_parser(chunk_size, chunk_overlap, extractor)
+
+    task_id = str(uuid.uuid4())
+    start_time = time.time()
+
+    logger.info(f"开始流式解析PDF文件: {file.filename}, 任务ID: {task_id}")
+
+    content = await file.read()
+
+    loop = asyncio.get_running_loop()
+    pages: "asyncio.Queue" = asyncio.Queue(maxsize=STREAM_BUFFER_PAGES)
+    cancelled = threading.Event()
+    # 队列结束标记
+    done = object()
+
+    def send(item) -> bool:
+        """
+        从解析线程放入队列，队列满时等待响应消费
+
+        Returns:
+            bool: 是否已放入队列；响应已结束或等待超时时返回False
+        """
+        if cancelled.is_set():
+            return False
+        try:
+            future = asyncio.run_coroutine_threadsafe(pages.put(item), loop)
+        except RuntimeError:
+            # 事件循环已关闭
+            return False
+
+        deadline = time.monotonic() + STREAM_SEND_TIMEOUT
+        while True:
+            try:
+                future.result(timeout=STREAM_POLL_INTERVAL)
+                return True
+            except concurrent.futures.TimeoutError:
+                if cancelled.is_set():
+                    future.cancel()
+                    return False
+                if time.monotonic() >= deadline:
+                    future.cancel()
+                    logger.warning(f"流式解析响应超过 {STREAM_SEND_TIMEOUT} 秒未读取，停止解析: {file.filename}, 任务ID: {task_id}")
+                    return False
+
+    def produce():
+        """在解析任务池中逐页解析"""
+        try:
+            for page in parser.iter_pdf_bytes(content, file.filename, split_text=split_text):
+                if not send(page):
+                    return
+            send(done)
+        except Exception as e:
+            send(e)
+            raise
+
+    # 在开始响应前占用任务池容量，任务池已满时仍能返回503
+    try:
+        producer = parse_pool.submit(produce)
+    except ParsePoolFullError as e:
+        raise pool_full_exception(e)
+
+    async def stream() -> AsyncIterator[str]:
+        total_documents = 0
+        total_chars = 0
+        total_pages = 0
+        try:
+            while True:
+                item = await pages.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    logger.error(f"PDF流式解析失败: {file.filename}, 错误: {str(item)}")
+                    yield encode_stream_message(
+                        ParseStreamError(task_id=task_id, message=f"PDF解析失败: {str(item)}"), stream_format
+                    )
+                    return
+
+                page_number, total_pages, documents = item
+                for doc in documents:
+                    total_documents += 1
+                    total_chars += len(doc.page_content)
+                    yield encode_stream_message(ParseStreamChunk(
+                        page=page_number,
+                        total_pages=total_pages,
+                        content=doc.page_content,
+                        metadata=doc.metadata,
+                        content_length=len(doc.page_content)
+                    ), stream_format)
+
+            processing_time = time.time() - start_time
+            logger.info(f"PDF流式解析完成: {file.filename}, 分块数: {total_documents}, 耗时: {processing_time:.2f}秒")
+            yield encode_stream_message(ParseStreamSummary(
+                task_id=task_id,
+                total_documents=total_documents,
+                total_chars=total_chars,
+                total_pages=total_pages,
+                processing_time=round(processing_time, 2)
+            ), stream_format)
+        finally:
+            # 客户端提前断开时通知解析线程退出，并清空队列解除其阻塞
+            cancelled.set()
+            while not pages.empty():
+                pages.get_nowait()
+            producer.add_done_callback(lambda future: future.exception())
+
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    # 响应结束后（含生成器未开始迭代时客户端即断开的情况）通知解析线程退出
+    return StreamingResponse(stream(), media_type=media_type, background=BackgroundTask(cancelled.set))
 
 
 @app.post("/parse-text", response_model=TextParseResponse)
@@ -166,6 +697,7 @@ async def parse_pdf_to_text(
     file: UploadFile = File(...),
     chunk_size: int = Query(1000, description="文档分块大小", ge=100, le=5000),
     chunk_overlap: int = Query(200, description="分块重叠大小", ge=0, le=1000),
+    extractor: Optional[str] = Query(None, description="文本提取后端: pypdf / pdfium / pymupdf，默认读取 PDF_EXTRACTOR"),
     split_text: bool = Query(True, description="是否进行文本分块")
 ):
     """
@@ -175,6 +707,7 @@ async def parse_pdf_to_text(
         file: 上传的PDF文件
         chunk_size: 文档分块大小
         chunk_overlap: 分块重叠大小
+        extractor: 文本提取后端
         split_text: 是否进行文本分块
 
     Returns:
@@ -184,23 +717,25 @@ async def parse_pdf_to_text(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="只支持PDF文件")
 
+    # 获取共享的解析器实例，提取后端不可用时返回400
+    parser = request_parser(chunk_size, chunk_overlap, extractor)
+
     task_id = str(uuid.uuid4())
     start_time = time.time()
 
     logger.info(f"开始解析PDF文件为文本: {file.filename}, 任务ID: {task_id}")
 
     try:
-        # 保存上传的文件到临时目录
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # 读取上传内容，直接在内存中解析，不写临时文件
+        content = await file.read()
 
-        # 创建解析器实例
-        parser = PDFParser(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        # 解析PDF，在解析任务池中执行，不阻塞事件循环；相同内容和分块参数直接返回缓存结果
+        documents, cache_hit = await parse_pool.run(
+            parser.parse_pdf_bytes_cached, content, file.filename, split_text=split_text
+        )
 
-        # 解析PDF为文本
-        text_content = parser.parse_pdf_to_text(temp_file_path, split_text=split_text)
+        # 合并所有文档内容
+        text_content = "\n\n".join(doc.page_content for doc in documents)
 
         processing_time = time.time() - start_time
 
@@ -212,24 +747,23 @@ async def parse_pdf_to_text(
             task_id=task_id,
             text_content=text_content,
             total_chars=len(text_content),
-            processing_time=round(processing_time, 2)
+            processing_time=round(processing_time, 2),
+            cache_hit=cache_hit
         )
 
+    except ParsePoolFullError as e:
+        raise pool_full_exception(e)
     except Exception as e:
         logger.error(f"PDF文本解析失败: {file.filename}, 错误: {str(e)}")
         raise HTTPException(status_code=500, detail=f"PDF文本解析失败: {str(e)}")
 
-    finally:
-        # 清理临时文件
-        if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
-
 
 @app.post("/parse-and-store", response_model=ParseResponse)
 async def parse_and_store_pdf(
     file: UploadFile = File(...),
     chunk_size: int = Query(1000, description="文档分块大小", ge=100, le=5000),
-    chunk_overlap: int = Query(200, description="分块重叠大小", ge=0, le=1000)
+    chunk_overlap: int = Query(200, description="分块重叠大小", ge=0, le=1000),
+    extractor: Optional[str] = Query(None, description="文本提取后端: pypdf / pdfium / pymupdf，默认读取 PDF_EXTRACTOR")
 ):
     """
     解析PDF文件并存储到MySQL数据库
@@ -238,6 +772,7 @@ async def parse_and_store_pdf(
         file: 上传的PDF文件
         chunk_size: 文档分块大小
         chunk_overlap: 分块重叠大小
+        extractor: 文本提取后端
 
     Returns:
         ParseResponse: 解析和存储结果
@@ -246,23 +781,22 @@ async def parse_and_store_pdf(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="只支持PDF文件")
 
+    # 获取共享的解析器实例，提取后端不可用时返回400
+    parser = request_parser(chunk_size, chunk_overlap, extractor)
+
     task_id = str(uuid.uuid4())
     start_time = time.time()
 
     logger.info(f"开始解析并存储PDF文件: {file.filename}, 任务ID: {task_id}")
 
     try:
-        # 保存上传的文件到临时目录
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-
-        # 创建解析器实例
-        parser = PDFParser(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        # 读取上传内容，直接在内存中解析，不写临时文件
+        content = await file.read()
 
-        # 解析PDF
-        documents = parser.parse_pdf_to_documents(temp_file_path, split_text=True)
+        # 解析PDF，在解析任务池中执行，不阻塞事件循环
+        documents, cache_hit = await parse_pool.run(
+            parser.parse_pdf_bytes_cached, content, file.filename, split_text=True
+        )
 
         # 添加文件信息到元数据
         for doc in documents:
@@ -287,18 +821,16 @@ async def parse_and_store_pdf(
             avg_chars=doc_info["avg_chars"],
             total_pages=doc_info.get("total_pages"),
             processing_time=round(processing_time, 2),
-            documents=None  # 不返回文档内容以节省带宽
+            documents=None,  # 不返回文档内容以节省带宽
+            cache_hit=cache_hit
         )
 
+    except ParsePoolFullError as e:
+        raise pool_full_exception(e)
     except Exception as e:
         logger.error(f"PDF解析并存储到MySQL失败: {file.filename}, 错误: {str(e)}")
         raise HTTPException(status_code=500, detail=f"PDF解析并存储到MySQL失败: {str(e)}")
 
-    finally:
-        # 清理临时文件
-        if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
-
 
 @app.get("/search")
 async def search_documents(
@@ -373,6 +905,7 @@ async def parse_and_store_vector_pdf(
     collection_name: str = Query("pdf_documents", description="Milvus集合名称"),
     chunk_size: int = Query(1000, description="文档分块大小", ge=100, le=5000),
     chunk_overlap: int = Query(200, description="分块重叠大小", ge=0, le=1000),
+    extractor: Optional[str] = Query(None, description="文本提取后端: pypdf / pdfium / pymupdf，默认读取 PDF_EXTRACTOR"),
     embedding_model: str = Query("zhipuai", description="嵌入模型类型")
 ):
     """
@@ -383,6 +916,7 @@ async def parse_and_store_vector_pdf(
         collection_name: Milvus集合名称
         chunk_size: 文档分块大小
         chunk_overlap: 分块重叠大小
+        extractor: 文本提取后端
         embedding_model: 嵌入模型类型
 
     Returns:
@@ -392,27 +926,28 @@ async def parse_and_store_vector_pdf(
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="只支持PDF文件")
 
+    # 获取共享的解析器实例，提取后端不可用时返回400
+    parser = request_parser(chunk_size, chunk_overlap, extractor)
+
     task_id = str(uuid.uuid4())
     start_time = time.time()
 
     logger.info(f"开始解析并存储PDF文件到向量数据库: {file.filename}, 任务ID: {task_id}")
 
     try:
-        # 保存上传的文件到临时目录
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # 读取上传内容，直接在内存中解析，不写临时文件
+        content = await file.read()
 
-        # 创建解析器实例
-        parser = PDFParser(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-
-        # 解析PDF
-        documents = parser.parse_pdf_to_documents(temp_file_path, split_text=True)
+        # 解析PDF，在解析任务池中执行，不阻塞事件循环
+        documents, cache_hit = await parse_pool.run(
+            parser.parse_pdf_bytes_cached, content, file.filename, split_text=True
+        )
 
-        # 添加文件信息到元数据
+        # 添加文件信息到元数据，source_hash 用于向量存储生成确定性主键，重复导入同一文件时不会产生重复分块
+        source_hash = hashlib.sha256(content).hexdigest()
         for doc in documents:
             doc.metadata['source_filename'] = file.filename
+            doc.metadata['source_hash'] = source_hash
             doc.metadata['task_id'] = task_id
 
         # 调用vector-storage-service存储
@@ -449,18 +984,16 @@ async def parse_and_store_vector_pdf(
             avg_chars=doc_info["avg_chars"],
             total_pages=doc_info.get("total_pages"),
             processing_time=round(processing_time, 2),
-            documents=None  # 不返回文档内容以节省带宽
+            documents=None,  # 不返回文档内容以节省带宽
+            cache_hit=cache_hit
         )
 
+    except ParsePoolFullError as e:
+        raise pool_full_exception(e)
     except Exception as e:
         logger.error(f"PDF解析并存储到向量数据库失败: {file.filename}, 错误: {str(e)}")
         raise HTTPException(status_code=500, detail=f"PDF解析并存储到向量数据库失败: {str(e)}")
 
-    finally:
-        # 清理临时文件
-        if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
-
 
 if __name__ == "__main__":
     import uvicorn
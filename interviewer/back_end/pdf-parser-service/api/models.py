@@ -2,7 +2,7 @@
 PDF解析服务API模型定义
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 from pydantic import BaseModel, Field
 
 
@@ -32,6 +32,84 @@ class ParseResponse(BaseModel):
     total_pages: Optional[int] = Field(None, description="总页数")
     processing_time: float = Field(..., description="处理时间(秒)")
     documents: Optional[List[DocumentModel]] = Field(None, description="文档列表")
+    cache_hit: bool = Field(default=False, description="是否命中解析缓存")
+
+
+class BatchFileResult(BaseModel):
+    """批量解析中单个文件的结果"""
+    file_name: str = Field(..., description="文件名，压缩包内的文件为 压缩包名/文件路径")
+    success: bool = Field(..., description="是否成功")
+    error: Optional[str] = Field(None, description="错误信息，仅失败时返回")
+    total_documents: int = Field(default=0, description="文档总数")
+    total_chars: int = Field(default=0, description="总字符数")
+    total_pages: Optional[int] = Field(None, description="总页数")
+    processing_time: float = Field(default=0.0, description="该文件的解析时间(秒)")
+    cache_hit: bool = Field(default=False, description="是否命中解析缓存")
+    documents: Optional[List[DocumentModel]] = Field(None, description="文档列表")
+
+
+class BatchParseResponse(BaseModel):
+    """批量解析响应模型"""
+    success: bool = Field(..., description="是否全部成功")
+    message: str = Field(..., description="响应消息")
+    task_id: str = Field(..., description="任务ID")
+    total_files: int = Field(..., description="文件总数")
+    succeeded: int = Field(..., description="成功文件数")
+    failed: int = Field(..., description="失败文件数")
+    total_documents: int = Field(..., description="所有文件的文档总数")
+    total_chars: int = Field(..., description="所有文件的总字符数")
+    processing_time: float = Field(..., description="整个批次的处理时间(秒)")
+    total_file_time: float = Field(..., description="各文件解析时间之和(秒)，与 processing_time 之比即并行加速比")
+    results: List[BatchFileResult] = Field(..., description="按上传顺序排列的各文件结果")
+
+
+class ParseStreamChunk(BaseModel):
+    """流式解析的分块消息，每个分块一条"""
+    type: Literal["chunk"] = Field(default="chunk", description="消息类型")
+    page: int = Field(..., description="所在页码（从0开始）")
+    total_pages: int = Field(..., description="总页数")
+    content: str = Field(..., description="分块内容")
+    metadata: Dict[str, Any] = Field(default_factory=dict, description="分块元数据")
+    content_length: int = Field(..., description="内容长度")
+
+
+class ParseStreamSummary(BaseModel):
+    """流式解析的结束消息"""
+    type: Literal["summary"] = Field(default="summary", description="消息类型")
+    task_id: str = Field(..., description="任务ID")
+    total_documents: int = Field(..., description="文档总数")
+    total_chars: int = Field(..., description="总字符数")
+    total_pages: int = Field(..., description="总页数")
+    processing_time: float = Field(..., description="处理时间(秒)")
+
+
+class ParseStreamError(BaseModel):
+    """流式解析的错误消息，出错后不再发送其他消息"""
+    type: Literal["error"] = Field(default="error", description="消息类型")
+    task_id: str = Field(..., description="任务ID")
+    message: str = Field(..., description="错误信息")
+
+
+class TaskSubmitResponse(BaseModel):
+    """异步解析任务提交响应模型"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(..., description="响应消息")
+    task_id: str = Field(..., description="任务ID，用于查询 /tasks/{task_id}")
+    status: str = Field(..., description="任务状态")
+
+
+class TaskStatusResponse(BaseModel):
+    """异步解析任务状态响应模型"""
+    task_id: str = Field(..., description="任务ID")
+    status: Literal["pending", "running", "completed", "failed"] = Field(..., description="任务状态")
+    file_name: str = Field(..., description="文件名")
+    queue_position: Optional[int] = Field(None, description="排队位置（前面还有几个任务），仅排队中时返回")
+    created_at: float = Field(..., description="提交时间戳")
+    started_at: Optional[float] = Field(None, description="开始执行时间戳")
+    finished_at: Optional[float] = Field(None, description="结束时间戳")
+    expires_at: Optional[float] = Field(None, description="结果过期时间戳，过期后任务不可查询")
+    result: Optional[ParseResponse] = Field(None, description="解析结果，仅完成时返回")
+    error: Optional[str] = Field(None, description="错误信息，仅失败时返回")
 
 
 class TextParseResponse(BaseModel):
@@ -42,6 +120,7 @@ class TextParseResponse(BaseModel):
     text_content: str = Field(..., description="解析后的文本内容")
     total_chars: int = Field(..., description="总字符数")
     processing_time: float = Field(..., description="处理时间(秒)")
+    cache_hit: bool = Field(default=False, description="是否命中解析缓存")
 
 
 class HealthResponse(BaseModel):
@@ -50,6 +129,10 @@ class HealthResponse(BaseModel):
     service: str = Field(..., description="服务名称")
     version: str = Field(..., description="服务版本")
     timestamp: str = Field(..., description="检查时间")
+    parse_pool: Optional[Dict[str, Any]] = Field(None, description="解析任务池指标：排队数、执行中任务数等")
+    parse_cache: Optional[Dict[str, Any]] = Field(None, description="解析缓存命中统计")
+    parse_jobs: Optional[Dict[str, Any]] = Field(None, description="异步解析任务队列指标")
+    extractors: Optional[Dict[str, Any]] = Field(None, description="默认文本提取后端和已安装的后端")
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,93 @@
+"""
+文本提取后端基准测试脚本
+在一组样例简历上对比各提取后端的吞吐量（页/秒）和与参考后端的字符级一致率
+
+一致率为去除空白后两份文本的 difflib 相似度：各后端对空格、换行和版面的处理不同，
+比较时只关心提取到的字符和顺序是否一致
+
+用法:
+    python benchmark_extractors.py --corpus ../../xzk.pdf ./samples/ --repeat 10
+"""
+
+import os
+import re
+import time
+import difflib
+import argparse
+from typing import Dict, List
+
+import numpy as np
+
+from parsers import get_extractor, available_extractors
+
+DEFAULT_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "xzk.pdf")
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def load_corpus(paths: List[str]) -> Dict[str, bytes]:
+    """读取样例PDF，目录下的所有PDF文件都加入语料"""
+    corpus = {}
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith(".pdf"))
+        else:
+            files = [path]
+        for file_path in files:
+            with open(file_path, "rb") as f:
+                corpus[os.path.basename(file_path)] = f.read()
+    return corpus
+
+
+def extract_text(extractor, content: bytes) -> str:
+    """提取整份文档的文本"""
+    return "\n".join(text for _, text in extractor.extract_pages(content))
+
+
+def agreement(reference: str, text: str) -> float:
+    """去除空白后的字符级相似度"""
+    return difflib.SequenceMatcher(
+        None, WHITESPACE.sub("", reference), WHITESPACE.sub("", text), autojunk=False
+    ).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文本提取后端基准测试")
+    parser.add_argument("--corpus", nargs="+", default=[DEFAULT_PDF], help="样例PDF文件或目录")
+    parser.add_argument("--extractors", nargs="+", default=None, help="参与测试的后端，默认为已安装的全部后端")
+    parser.add_argument("--reference", default="pypdf", help="计算一致率的参考后端")
+    parser.add_argument("--repeat", type=int, default=10, help="每个后端的测量轮数")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        raise SystemExit("语料为空")
+
+    names = args.extractors or available_extractors()
+    extractors = {name: get_extractor(name) for name in names}
+    reference = get_extractor(args.reference)
+    reference_texts = {file_name: extract_text(reference, content) for file_name, content in corpus.items()}
+    total_pages = sum(reference.page_count(content) for content in corpus.values())
+
+    print(f"语料: {len(corpus)} 个文件, {total_pages} 页, 参考后端: {reference.name}")
+    print(f"{'后端':>10}{'p50(ms)':>12}{'页/秒':>10}{'字符数':>10}{'一致率':>10}{'最低一致率':>12}")
+
+    for name, extractor in extractors.items():
+        # 预热一轮，排除首次导入和字体加载的开销
+        texts = {file_name: extract_text(extractor, content) for file_name, content in corpus.items()}
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for content in corpus.values():
+                extract_text(extractor, content)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        p50_ms = float(np.median(timings))
+        scores = [agreement(reference_texts[file_name], text) for file_name, text in texts.items()]
+        print(f"{name:>10}{p50_ms:>12.2f}{total_pages / (p50_ms / 1000):>10.1f}"
+              f"{sum(len(text) for text in texts.values()):>10}{np.mean(scores):>10.2%}{min(scores):>12.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+文本分割器基准测试脚本
+对比 LangChain RecursiveCharacterTextSplitter 与基于偏移量的 FastTextSplitter，
+先校验两者输出完全一致，再测量不同语料规模下的分割耗时
+
+用法:
+    python benchmark_splitter.py --pdf ../../xzk.pdf --scales 1 10 100 --repeat 20
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from parsers import PDFParser, FastTextSplitter
+from parsers.text_splitter import DEFAULT_SEPARATORS
+
+DEFAULT_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "xzk.pdf")
+
+
+def load_pages(pdf_path: str):
+    """提取样例PDF的页面文本"""
+    with open(pdf_path, "rb") as f:
+        content = f.read()
+    parser = PDFParser(parallel_workers=1)
+    return [doc.page_content for doc in parser.load_pdf_bytes(content, os.path.basename(pdf_path))]
+
+
+def measure(split, texts, repeat: int):
+    """重复分割全部文本，返回每轮耗时列表（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            split(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="文本分割器基准测试")
+    parser.add_argument("--pdf", default=DEFAULT_PDF, help="样例PDF路径")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="语料放大倍数（页面文本重复次数）")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="分块大小")
+    parser.add_argument("--chunk-overlap", type=int, default=200, help="分块重叠大小")
+    parser.add_argument("--repeat", type=int, default=20, help="每个规模的测量轮数")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pdf)
+    langchain_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        length_function=len,
+        separators=DEFAULT_SEPARATORS
+    )
+    fast_splitter = FastTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    print(f"样例: {args.pdf}, 页数: {len(pages)}, 字符数: {sum(len(page) for page in pages)}")
+    print(f"{'倍数':>6}{'字符数':>12}{'分块数':>8}  {'LangChain p50(ms)':>18}{'Fast p50(ms)':>14}{'加速比':>8}")
+
+    for scale in args.scales:
+        # 整份文档重复 scale 次作为一页，模拟长简历和项目报告
+        texts = ["\n\n".join(pages * scale)]
+
+        expected = langchain_splitter.split_text(texts[0])
+        actual = fast_splitter.split_text(texts[0])
+        if expected != actual:
+            raise SystemExit(f"倍数 {scale}: 分割结果不一致 ({len(expected)} vs {len(actual)} 个分块)")
+
+        repeat = max(3, args.repeat // scale) if scale > 1 else args.repeat
+        langchain_ms = float(np.median(measure(langchain_splitter.split_text, texts, repeat)))
+        fast_ms = float(np.median(measure(fast_splitter.split_text, texts, repeat)))
+        print(f"{scale:>6}{len(texts[0]):>12}{len(expected):>8}  {langchain_ms:>18.2f}{fast_ms:>14.2f}"
+              f"{langchain_ms / fast_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,38 @@ PDF_CHUNK_SIZE = int(os.getenv("PDF_CHUNK_SIZE", "1000"))
 PDF_CHUNK_OVERLAP = int(os.getenv("PDF_CHUNK_OVERLAP", "200"))
 PDF_MAX_FILE_SIZE = int(os.getenv("PDF_MAX_FILE_SIZE", "10"))  # MB
 
+# 文本提取后端 (pypdf: 纯Python，默认；pdfium: pypdfium2；pymupdf: PyMuPDF，按版面排序；请求参数 extractor 可覆盖)
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pypdf").lower()
+
+# 使用基于偏移量的分割器 (输出与LangChain RecursiveCharacterTextSplitter一致，false时回退到LangChain实现)
+PDF_FAST_SPLITTER = os.getenv("PDF_FAST_SPLITTER", "true").lower() == "true"
+
+# 并行页面提取 (进程数为1时关闭；页数少于阈值的文件仍在请求线程内顺序提取)
+PDF_PARALLEL_WORKERS = int(os.getenv("PDF_PARALLEL_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+
+# 解析任务池 (同时执行的解析任务数、最大排队数；超出时返回503)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "2"))
+PARSE_MAX_QUEUE = int(os.getenv("PARSE_MAX_QUEUE", "8"))
+
+# 解析结果缓存 (按 sha256(文件内容) + 分块参数缓存，磁盘总大小超过上限时按LRU淘汰)
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+PARSE_CACHE_DB_PATH = os.getenv("PARSE_CACHE_DB_PATH", "./cache/parse_cache.db")
+PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "256"))
+
+# 批量解析 (POST /parse/batch 单次最多处理的PDF数和解压后的总大小，压缩包按其中的PDF计算)
+PARSE_BATCH_MAX_FILES = int(os.getenv("PARSE_BATCH_MAX_FILES", "50"))
+PARSE_BATCH_MAX_TOTAL_MB = int(os.getenv("PARSE_BATCH_MAX_TOTAL_MB", "200"))
+
+# 流式解析 (POST /parse/stream 响应超过该时间未读取下一页时停止解析，释放解析任务池容量)
+PARSE_STREAM_SEND_TIMEOUT = int(os.getenv("PARSE_STREAM_SEND_TIMEOUT", "60"))
+
+# 异步解析任务队列 (POST /parse/async 提交，GET /tasks/{task_id} 查询；结果在任务结束后保留 TTL 秒)
+PARSE_JOB_DB_PATH = os.getenv("PARSE_JOB_DB_PATH", "./cache/parse_jobs.db")
+PARSE_JOB_WORKERS = int(os.getenv("PARSE_JOB_WORKERS", "1"))
+PARSE_JOB_MAX_PENDING = int(os.getenv("PARSE_JOB_MAX_PENDING", "100"))
+PARSE_JOB_TTL_SECONDS = int(os.getenv("PARSE_JOB_TTL_SECONDS", "3600"))
+
 # 支持的文件类型
 ALLOWED_FILE_EXTENSIONS = ['.pdf']
 ALLOWED_MIME_TYPES = ['application/pdf']
@@ -61,6 +93,38 @@ def validate_config():
     if PDF_MAX_FILE_SIZE <= 0:
         errors.append(f"Invalid PDF_MAX_FILE_SIZE: {PDF_MAX_FILE_SIZE}")
 
+    # 检查文本提取后端
+    if PDF_EXTRACTOR not in ("pypdf", "pdfium", "pymupdf"):
+        errors.append(f"Invalid PDF_EXTRACTOR: {PDF_EXTRACTOR}")
+
+    # 检查并行提取配置
+    if PDF_PARALLEL_WORKERS <= 0:
+        errors.append(f"Invalid PDF_PARALLEL_WORKERS: {PDF_PARALLEL_WORKERS}")
+
+    # 检查解析任务池配置
+    if PARSE_WORKERS <= 0:
+        errors.append(f"Invalid PARSE_WORKERS: {PARSE_WORKERS}")
+    if PARSE_MAX_QUEUE < 0:
+        errors.append(f"Invalid PARSE_MAX_QUEUE: {PARSE_MAX_QUEUE}")
+    if PARSE_CACHE_MAX_MB <= 0:
+        errors.append(f"Invalid PARSE_CACHE_MAX_MB: {PARSE_CACHE_MAX_MB}")
+
+    # 检查批量解析配置
+    if PARSE_BATCH_MAX_FILES <= 0:
+        errors.append(f"Invalid PARSE_BATCH_MAX_FILES: {PARSE_BATCH_MAX_FILES}")
+    if PARSE_BATCH_MAX_TOTAL_MB <= 0:
+        errors.append(f"Invalid PARSE_BATCH_MAX_TOTAL_MB: {PARSE_BATCH_MAX_TOTAL_MB}")
+    if PARSE_STREAM_SEND_TIMEOUT <= 0:
+        errors.append(f"Invalid PARSE_STREAM_SEND_TIMEOUT: {PARSE_STREAM_SEND_TIMEOUT}")
+
+    # 检查异步解析任务队列配置
+    if PARSE_JOB_WORKERS <= 0:
+        errors.append(f"Invalid PARSE_JOB_WORKERS: {PARSE_JOB_WORKERS}")
+    if PARSE_JOB_MAX_PENDING <= 0:
+        errors.append(f"Invalid PARSE_JOB_MAX_PENDING: {PARSE_JOB_MAX_PENDING}")
+    if PARSE_JOB_TTL_SECONDS <= 0:
+        errors.append(f"Invalid PARSE_JOB_TTL_SECONDS: {PARSE_JOB_TTL_SECONDS}")
+
     if errors:
         raise ValueError(f"Configuration errors: {', '.join(errors)}")
 
@@ -76,7 +140,21 @@ def get_config_info() -> dict:
         "pdf": {
             "chunk_size": PDF_CHUNK_SIZE,
             "chunk_overlap": PDF_CHUNK_OVERLAP,
-            "max_file_size_mb": PDF_MAX_FILE_SIZE
+            "max_file_size_mb": PDF_MAX_FILE_SIZE,
+            "extractor": PDF_EXTRACTOR,
+            "fast_splitter": PDF_FAST_SPLITTER,
+            "parallel_workers": PDF_PARALLEL_WORKERS,
+            "parallel_min_pages": PDF_PARALLEL_MIN_PAGES,
+            "parse_workers": PARSE_WORKERS,
+            "parse_max_queue": PARSE_MAX_QUEUE,
+            "parse_cache_enabled": PARSE_CACHE_ENABLED,
+            "parse_cache_max_mb": PARSE_CACHE_MAX_MB,
+            "parse_batch_max_files": PARSE_BATCH_MAX_FILES,
+            "parse_batch_max_total_mb": PARSE_BATCH_MAX_TOTAL_MB,
+            "parse_stream_send_timeout": PARSE_STREAM_SEND_TIMEOUT,
+            "parse_job_workers": PARSE_JOB_WORKERS,
+            "parse_job_max_pending": PARSE_JOB_MAX_PENDING,
+            "parse_job_ttl_seconds": PARSE_JOB_TTL_SECONDS
         },
         "security": {
             "auth_enabled": ENABLE_AUTH,
@@ -2,6 +2,15 @@
 PDF解析器模块
 """
 
-from .pdf_parser import PDFParser
+from .pdf_parser import PDFParser, get_parser, shutdown_page_pool
+from .extractors import PDFExtractor, get_extractor, available_extractors, default_extractor_name
+from .text_splitter import FastTextSplitter
+from .worker_pool import ParseWorkerPool, ParsePoolFullError
+from .parse_cache import ParseCache, get_parse_cache
+from .job_queue import ParseJobQueue
 
-__all__ = ['PDFParser']
\ No newline at end of file
+__all__ = [
+    'PDFParser', 'get_parser', 'FastTextSplitter', 'shutdown_page_pool',
+    'PDFExtractor', 'get_extractor', 'available_extractors', 'default_extractor_name',
+    'ParseWorkerPool', 'ParsePoolFullError', 'ParseCache', 'get_parse_cache', 'ParseJobQueue'
+]
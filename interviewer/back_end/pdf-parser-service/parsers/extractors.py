@@ -0,0 +1,179 @@
+"""
+PDF文本提取后端 - 独立服务版本
+统一 pypdf（纯Python，默认）、pypdfium2（PDFium，C实现）和 PyMuPDF（MuPDF，C实现，按阅读顺序排版）的提取接口，
+可通过 PDF_EXTRACTOR 环境变量或请求参数选择
+"""
+
+import io
+import os
+import logging
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# 文件路径或内存中的文件内容
+PDFSource = Union[str, bytes]
+
+
+class PDFExtractor:
+    """
+    文本提取后端基类
+
+    子类只需实现 page_count 和 extract_pages；实例不保存状态，可跨线程共享，
+    并行提取时按名称在子进程中重新获取。
+    """
+
+    name = ""
+
+    def page_count(self, source: PDFSource) -> int:
+        """
+        获取总页数
+
+        Args:
+            source: PDF文件路径或文件内容
+
+        Returns:
+            int: 总页数
+        """
+        raise NotImplementedError
+
+    def extract_pages(self, source: PDFSource, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        逐页提取 [start, end) 范围内的文本，迭代期间文件保持打开
+
+        Args:
+            source: PDF文件路径或文件内容
+            start: 起始页（从0开始）
+            end: 结束页（不包含），为空时提取到最后一页
+
+        Yields:
+            Tuple[int, str]: (页码, 页面文本)
+        """
+        raise NotImplementedError
+
+
+class PyPDFExtractor(PDFExtractor):
+    """pypdf 提取，与 PyPDFLoader 输出一致"""
+
+    name = "pypdf"
+
+    @staticmethod
+    def _open(source: PDFSource):
+        import pypdf
+
+        return pypdf.PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+
+    def page_count(self, source: PDFSource) -> int:
+        return len(self._open(source).pages)
+
+    def extract_pages(self, source: PDFSource, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        reader = self._open(source)
+        end = len(reader.pages) if end is None else end
+        for page_number in range(start, end):
+            yield page_number, reader.pages[page_number].extract_text()
+
+
+class PdfiumExtractor(PDFExtractor):
+    """pypdfium2 提取，按内容流顺序输出，适合文本片段很多的简历"""
+
+    name = "pdfium"
+
+    def page_count(self, source: PDFSource) -> int:
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(source)
+        try:
+            return len(document)
+        finally:
+            document.close()
+
+    def extract_pages(self, source: PDFSource, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(source)
+        try:
+            end = len(document) if end is None else end
+            for page_number in range(start, end):
+                page = document[page_number]
+                text_page = page.get_textpage()
+                # PDFium 使用 \r\n 换行，统一为 \n 以便分割器按行切分
+                text = text_page.get_text_bounded().replace("\r\n", "\n")
+                text_page.close()
+                page.close()
+                yield page_number, text
+        finally:
+            document.close()
+
+
+class PyMuPDFExtractor(PDFExtractor):
+    """PyMuPDF 提取，按版面位置排序文本块，表格和多栏布局的阅读顺序更好"""
+
+    name = "pymupdf"
+
+    @staticmethod
+    def _open(source: PDFSource):
+        import pymupdf
+
+        if isinstance(source, str):
+            return pymupdf.open(source)
+        return pymupdf.open(stream=source, filetype="pdf")
+
+    def page_count(self, source: PDFSource) -> int:
+        document = self._open(source)
+        try:
+            return document.page_count
+        finally:
+            document.close()
+
+    def extract_pages(self, source: PDFSource, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        document = self._open(source)
+        try:
+            end = document.page_count if end is None else end
+            for page_number in range(start, end):
+                yield page_number, document[page_number].get_text("text", sort=True)
+        finally:
+            document.close()
+
+
+# 已注册的提取后端，名称即 PDF_EXTRACTOR 和请求参数 extractor 的取值
+EXTRACTORS: Dict[str, PDFExtractor] = {
+    extractor.name: extractor
+    for extractor in (PyPDFExtractor(), PdfiumExtractor(), PyMuPDFExtractor())
+}
+
+# 各后端依赖的模块
+_EXTRACTOR_MODULES = {"pypdf": "pypdf", "pdfium": "pypdfium2", "pymupdf": "pymupdf"}
+
+
+def default_extractor_name() -> str:
+    """默认提取后端名称，读取 PDF_EXTRACTOR"""
+    return os.getenv('PDF_EXTRACTOR', 'pypdf').lower()
+
+
+def get_extractor(name: Optional[str] = None) -> PDFExtractor:
+    """
+    按名称获取提取后端
+
+    Args:
+        name: 后端名称，为空时读取 PDF_EXTRACTOR
+
+    Returns:
+        PDFExtractor: 提取后端实例
+
+    Raises:
+        ValueError: 后端名称未知或依赖未安装
+    """
+    name = (name or default_extractor_name()).lower()
+    extractor = EXTRACTORS.get(name)
+    if extractor is None:
+        raise ValueError(f"未知的PDF提取后端: {name}，可选: {', '.join(EXTRACTORS)}")
+    if name not in available_extractors():
+        raise ValueError(f"PDF提取后端 {name} 不可用，请先安装 {_EXTRACTOR_MODULES[name]}")
+    return extractor
+
+
+def available_extractors() -> List[str]:
+    """获取依赖已安装的提取后端名称"""
+    import importlib.util
+
+    return [name for name, module in _EXTRACTOR_MODULES.items() if importlib.util.find_spec(module) is not None]
@@ -0,0 +1,313 @@
+"""
+异步解析任务队列 - 独立服务版本
+上传后立即返回 task_id，任务持久化在本地SQLite中，由固定数量的后台线程依次执行；
+完成或失败的任务结果在 TTL 到期后清理
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .worker_pool import ParsePoolFullError
+
+logger = logging.getLogger(__name__)
+
+# 任务状态
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# 任务处理函数: (task_id, PDF内容, 文件名, 解析参数) -> 可JSON序列化的结果
+JobHandler = Callable[[str, bytes, str, Dict[str, Any]], Dict[str, Any]]
+
+
+class ParseJobQueue:
+    """
+    持久化解析任务队列
+
+    任务连同PDF内容写入SQLite后立即返回，后台线程按提交顺序领取执行，执行完毕后删除PDF内容、
+    保存压缩后的结果。服务重启时未完成的任务重新排队，不会丢失。
+    队列数据库由单个服务进程独占，多进程部署时每个进程需配置不同的 PARSE_JOB_DB_PATH。
+    """
+
+    def __init__(self,
+                 handler: JobHandler,
+                 db_path: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 result_ttl: Optional[int] = None):
+        """
+        初始化解析任务队列
+
+        Args:
+            handler: 任务处理函数
+            db_path: SQLite数据库文件路径，默认读取 PARSE_JOB_DB_PATH
+            workers: 后台执行线程数，默认读取 PARSE_JOB_WORKERS
+            max_pending: 最大排队任务数，默认读取 PARSE_JOB_MAX_PENDING
+            result_ttl: 任务结束后结果的保留时间(秒)，默认读取 PARSE_JOB_TTL_SECONDS
+        """
+        self.handler = handler
+        self.db_path = db_path or os.getenv('PARSE_JOB_DB_PATH', './cache/parse_jobs.db')
+        self.workers = max(1, workers or int(os.getenv('PARSE_JOB_WORKERS', '1')))
+        self.max_pending = max(1, max_pending or int(os.getenv('PARSE_JOB_MAX_PENDING', '100')))
+        self.result_ttl = max(1, result_ttl or int(os.getenv('PARSE_JOB_TTL_SECONDS', '3600')))
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+        self._last_cleanup = 0.0
+
+        # 任务指标
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        # 连接在锁保护下跨线程共享
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parse_jobs (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                file_name TEXT NOT NULL,
+                params TEXT NOT NULL,
+                content BLOB,
+                result BLOB,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                expires_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_parse_jobs_status ON parse_jobs(status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_parse_jobs_expires_at ON parse_jobs(expires_at)")
+        self._conn.commit()
+
+        logger.info(f"解析任务队列初始化完成 - 路径: {self.db_path}, 线程数: {self.workers}, "
+                    f"最大排队数: {self.max_pending}, 结果保留: {self.result_ttl}秒")
+
+    def start(self):
+        """启动后台执行线程，上次退出时未完成的任务重新排队"""
+        with self._lock:
+            recovered = self._conn.execute(
+                "UPDATE parse_jobs SET status = ?, started_at = NULL WHERE status = ?",
+                (JOB_PENDING, JOB_RUNNING)
+            ).rowcount
+            self._conn.commit()
+            self._stopping = False
+
+        if recovered:
+            logger.info(f"解析任务队列恢复 {recovered} 个未完成任务")
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"pdf-parse-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, task_id: str, content: bytes, file_name: str, params: Dict[str, Any]):
+        """
+        提交解析任务，写入队列后立即返回
+
+        Args:
+            task_id: 任务ID
+            content: PDF文件内容
+            file_name: 文件名
+            params: 解析参数，原样传给任务处理函数
+
+        Raises:
+            ParsePoolFullError: 排队中的任务数已达上限
+        """
+        with self._lock:
+            pending = self._conn.execute(
+                "SELECT COUNT(*) FROM parse_jobs WHERE status = ?", (JOB_PENDING,)
+            ).fetchone()[0]
+            if pending >= self.max_pending:
+                self.rejected += 1
+                raise ParsePoolFullError(f"解析任务队列已满: 排队 {pending}, 请稍后重试")
+
+            self._conn.execute(
+                "INSERT INTO parse_jobs (task_id, status, file_name, params, content, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (task_id, JOB_PENDING, file_name, json.dumps(params), content, time.time())
+            )
+            self._conn.commit()
+            self.submitted += 1
+            self._wakeup.notify()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        查询任务状态和结果
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 任务信息，任务不存在或结果已过期时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT task_id, status, file_name, result, error, created_at, started_at, finished_at, expires_at "
+                "FROM parse_jobs WHERE task_id = ?",
+                (task_id,)
+            ).fetchone()
+            position = None
+            if row is not None and row[1] == JOB_PENDING:
+                position = self._conn.execute(
+                    "SELECT COUNT(*) FROM parse_jobs WHERE status = ? AND created_at < ?",
+                    (JOB_PENDING, row[5])
+                ).fetchone()[0]
+
+        if row is None:
+            return None
+
+        task_id, status, file_name, result, error, created_at, started_at, finished_at, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return None
+
+        return {
+            "task_id": task_id,
+            "status": status,
+            "file_name": file_name,
+            "queue_position": position,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "expires_at": expires_at,
+            "result": json.loads(zlib.decompress(result)) if result is not None else None,
+            "error": error
+        }
+
+    def cleanup_expired(self) -> int:
+        """
+        删除结果已过期的任务
+
+        Returns:
+            int: 删除的任务数
+        """
+        with self._lock:
+            return self._cleanup_expired()
+
+    def _cleanup_expired(self) -> int:
+        """删除结果已过期的任务，调用方需持有锁"""
+        deleted = self._conn.execute(
+            "DELETE FROM parse_jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        ).rowcount
+        self._conn.commit()
+        self._last_cleanup = time.time()
+        if deleted:
+            self.expired += deleted
+            logger.info(f"解析任务队列清理 {deleted} 个过期任务")
+        return deleted
+
+    def _claim(self) -> Optional[tuple]:
+        """领取最早提交的排队任务，调用方需持有锁"""
+        row = self._conn.execute(
+            "SELECT task_id, file_name, params, content FROM parse_jobs "
+            "WHERE status = ? ORDER BY created_at LIMIT 1",
+            (JOB_PENDING,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self._conn.execute(
+            "UPDATE parse_jobs SET status = ?, started_at = ? WHERE task_id = ?",
+            (JOB_RUNNING, time.time(), row[0])
+        )
+        self._conn.commit()
+        return row
+
+    def _worker_loop(self):
+        """后台线程：领取任务并执行，空闲时顺带清理过期结果"""
+        while True:
+            with self._lock:
+                job = None
+                while not self._stopping:
+                    job = self._claim()
+                    if job is not None:
+                        break
+                    # 空闲时定期清理过期结果，间隔不超过60秒
+                    if time.time() - self._last_cleanup >= min(60, self.result_ttl / 10):
+                        self._cleanup_expired()
+                    self._wakeup.wait(timeout=5)
+                if self._stopping:
+                    return
+
+            task_id, file_name, params, content = job
+            self._run(task_id, content, file_name, json.loads(params))
+
+    def _run(self, task_id: str, content: bytes, file_name: str, params: Dict[str, Any]):
+        """执行单个任务并保存结果，PDF内容随之删除"""
+        logger.info(f"开始执行解析任务: {file_name}, 任务ID: {task_id}")
+        try:
+            result = self.handler(task_id, content, file_name, params)
+        except Exception as e:
+            logger.error(f"解析任务失败: {file_name}, 任务ID: {task_id}, 错误: {str(e)}")
+            self._finish(task_id, JOB_FAILED, error=str(e))
+            return
+
+        payload = zlib.compress(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+        self._finish(task_id, JOB_COMPLETED, result=payload)
+        logger.info(f"解析任务完成: {file_name}, 任务ID: {task_id}")
+
+    def _finish(self, task_id: str, status: str, result: Optional[bytes] = None, error: Optional[str] = None):
+        """记录任务结束状态和过期时间"""
+        finished_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE parse_jobs SET status = ?, content = NULL, result = ?, error = ?, "
+                "finished_at = ?, expires_at = ? WHERE task_id = ?",
+                (status, result, error, finished_at, finished_at + self.result_ttl, task_id)
+            )
+            self._conn.commit()
+            if status == JOB_COMPLETED:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取任务队列指标"""
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM parse_jobs GROUP BY status"
+            ).fetchall())
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "result_ttl": self.result_ttl,
+                "pending": counts.get(JOB_PENDING, 0),
+                "running": counts.get(JOB_RUNNING, 0),
+                "stored_completed": counts.get(JOB_COMPLETED, 0),
+                "stored_failed": counts.get(JOB_FAILED, 0),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "expired": self.expired
+            }
+
+    def shutdown(self):
+        """停止后台线程，等待执行中的任务结束；未执行的任务保留在队列中，下次启动时继续"""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        logger.info("解析任务队列已关闭")
@@ -0,0 +1,200 @@
+"""
+解析结果缓存 - 独立服务版本
+按 sha256(PDF内容) + 提取后端缓存页面文本，再加分块参数缓存分块结果，SQLite磁盘存储，按总字节数做LRU淘汰
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import logging
+import threading
+from typing import List, Optional, Dict, Any
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache:
+    """
+    PDF解析结果磁盘缓存
+
+    同一文件的页面文本与分块参数无关，单独缓存；分块参数变化时只需重新分块，不必再次提取文本。
+    条目以zlib压缩的JSON存储，总大小超过上限时按最近访问时间淘汰。
+    """
+
+    def __init__(self, db_path: str = "./cache/parse_cache.db", max_bytes: int = 256 * 1024 * 1024):
+        """
+        初始化解析结果缓存
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_bytes: 缓存条目（压缩后）总字节数上限
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+
+        # 命中统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        # 连接在锁保护下跨线程共享
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                cache_key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_parse_cache_last_access ON parse_cache(last_access)")
+        self._conn.commit()
+
+        # 条目总字节数，写入和淘汰时增量维护，避免每次写入都全表求和
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM parse_cache").fetchone()[0]
+
+        logger.info(f"解析缓存初始化完成 - 路径: {db_path}, 容量: {max_bytes // (1024 * 1024)}MB")
+
+    @staticmethod
+    def make_key(content_hash: str,
+                 extractor: str,
+                 chunk_size: Optional[int] = None,
+                 chunk_overlap: Optional[int] = None,
+                 split_text: Optional[bool] = None) -> str:
+        """
+        生成缓存键，只传内容哈希时为页面文本的键
+
+        Args:
+            content_hash: PDF内容的sha256
+            extractor: 文本提取后端名称，不同后端提取的文本不同
+            chunk_size: 分块大小
+            chunk_overlap: 分块重叠大小
+            split_text: 是否分块
+
+        Returns:
+            str: 缓存键
+        """
+        if chunk_size is None:
+            return f"{content_hash}:{extractor}:pages"
+        return f"{content_hash}:{extractor}:{chunk_size}:{chunk_overlap}:{int(bool(split_text))}"
+
+    def get(self, key: str) -> Optional[List[Document]]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[List[Document]]: 命中时返回文档列表，否则返回None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM parse_cache WHERE cache_key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE parse_cache SET last_access = ? WHERE cache_key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+
+        items = json.loads(zlib.decompress(row[0]))
+        return [Document(page_content=item["content"], metadata=item["metadata"]) for item in items]
+
+    def put(self, key: str, documents: List[Document]):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            documents: 文档列表
+        """
+        payload = zlib.compress(json.dumps(
+            [{"content": doc.page_content, "metadata": doc.metadata} for doc in documents],
+            ensure_ascii=False
+        ).encode("utf-8"))
+
+        with self._lock:
+            # 覆盖已有条目时扣除旧条目的大小
+            old = self._conn.execute("SELECT size FROM parse_cache WHERE cache_key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parse_cache (cache_key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+            self._total_size += len(payload) - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """总大小超出上限时淘汰最久未访问的条目，调用方需持有锁"""
+        if self._total_size <= self.max_bytes:
+            return
+
+        # 一次淘汰到上限的90%，避免每次写入都触发淘汰
+        target = self._total_size - int(self.max_bytes * 0.9)
+        freed = 0
+        evicted = []
+        for cache_key, size in self._conn.execute("SELECT cache_key, size FROM parse_cache ORDER BY last_access ASC"):
+            evicted.append((cache_key,))
+            freed += size
+            if freed >= target:
+                break
+
+        self._conn.executemany("DELETE FROM parse_cache WHERE cache_key = ?", evicted)
+        self._total_size -= freed
+        self.evictions += len(evicted)
+        logger.info(f"解析缓存淘汰 {len(evicted)} 条, 释放 {freed} 字节")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            # 统计接口调用不频繁，顺便校正增量维护的总大小（其他进程共享同一数据库时会有偏差）
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parse_cache"
+            ).fetchone()
+            self._total_size = total
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "entries": entries,
+                "size_bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+
+_parse_cache: Optional[ParseCache] = None
+_parse_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """获取全局解析缓存，未启用时返回None"""
+    global _parse_cache
+
+    if os.getenv('PARSE_CACHE_ENABLED', 'true').lower() != 'true':
+        return None
+
+    with _parse_cache_lock:
+        if _parse_cache is None:
+            _parse_cache = ParseCache(
+                db_path=os.getenv('PARSE_CACHE_DB_PATH', './cache/parse_cache.db'),
+                max_bytes=int(os.getenv('PARSE_CACHE_MAX_MB', '256')) * 1024 * 1024
+            )
+    return _parse_cache
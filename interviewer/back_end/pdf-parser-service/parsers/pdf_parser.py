@@ -1,43 +1,201 @@
 """
 PDF解析器模块 - 独立服务版本
-基于PyPDFLoader的基础PDF解析功能，去除向量存储依赖
+基于PyPDFLoader的基础PDF解析功能，去除向量存储依赖；文本提取后端可替换为 pypdfium2 / PyMuPDF
 """
 import os
+import math
+import time
+import hashlib
 import logging
-from typing import List, Optional
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from .extractors import PDFExtractor, get_extractor
+from .parse_cache import get_parse_cache
+from .text_splitter import FastTextSplitter, DEFAULT_SEPARATORS
+
 # 使用标准logging，避免外部依赖
 logger = logging.getLogger(__name__)
 
+# 页面提取进程池，所有解析器实例共享，首次并行解析时创建
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_workers = 0
+_page_pool_lock = threading.Lock()
+
+
+def _extract_page_range(source: Union[str, bytes],
+                        start: int,
+                        end: Optional[int] = None,
+                        extractor: str = "pypdf") -> List[Tuple[int, str]]:
+    """
+    提取 [start, end) 范围内各页的文本，并行模式下在子进程中执行
+
+    Args:
+        source (Union[str, bytes]): PDF文件路径或文件内容
+        start (int): 起始页（从0开始）
+        end (int, optional): 结束页（不包含），为空时提取到最后一页
+        extractor (str): 提取后端名称，按名称传递以便在子进程中获取
+
+    Returns:
+        List[Tuple[int, str]]: (页码, 页面文本) 列表
+    """
+    return list(get_extractor(extractor).extract_pages(source, start, end))
+
+
+def _parse_file(content: bytes,
+                file_name: str,
+                chunk_size: int,
+                chunk_overlap: int,
+                split_text: bool,
+                extractor: str) -> Tuple[List[Document], float]:
+    """
+    在子进程中完整解析单个文件，批量解析时使用，子进程内不再并行提取页面
+
+    Args:
+        content (bytes): PDF文件内容
+        file_name (str): 文件名
+        chunk_size (int): 文档分块大小
+        chunk_overlap (int): 分块重叠大小
+        split_text (bool): 是否进行文本分块
+        extractor (str): 提取后端名称
+
+    Returns:
+        Tuple[List[Document], float]: (文档列表, 解析耗时秒数)
+    """
+    start_time = time.time()
+    parser = PDFParser(chunk_size=chunk_size, chunk_overlap=chunk_overlap, parallel_workers=1, extractor=extractor)
+    documents = parser.parse_pdf_to_documents(content, split_text, file_name)
+    return documents, time.time() - start_time
+
+
+def get_page_pool(workers: int) -> ProcessPoolExecutor:
+    """获取共享的页面提取进程池，配置的进程数变化时重建"""
+    global _page_pool, _page_pool_workers
+
+    with _page_pool_lock:
+        if _page_pool is None or _page_pool_workers != workers:
+            if _page_pool is not None:
+                _page_pool.shutdown(wait=False)
+            # 服务进程中已有多个线程，fork 可能复制其他线程持有的锁导致子进程死锁，
+            # 改用 forkserver（不支持的平台使用 spawn）启动子进程
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _page_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method))
+            _page_pool_workers = workers
+            logger.info(f"页面提取进程池已创建 - 进程数: {workers}")
+        return _page_pool
+
+
+def shutdown_page_pool():
+    """关闭页面提取进程池"""
+    global _page_pool, _page_pool_workers
+
+    with _page_pool_lock:
+        if _page_pool is not None:
+            _page_pool.shutdown(wait=True)
+            _page_pool = None
+            _page_pool_workers = 0
+
+
+def _discard_page_pool(pool: ProcessPoolExecutor):
+    """子进程异常退出后进程池不可再用，丢弃后下次获取时重建"""
+    global _page_pool, _page_pool_workers
+
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+            _page_pool_workers = 0
+    pool.shutdown(wait=False)
+    logger.warning("页面提取进程池中有子进程异常退出，已丢弃并将在下次使用时重建")
+
+
+# 按 (chunk_size, chunk_overlap, 提取后端) 缓存的解析器实例，跨请求共享
+MAX_CACHED_PARSERS = 32
+_parsers: "OrderedDict[Tuple[int, int, str], PDFParser]" = OrderedDict()
+_parsers_lock = threading.Lock()
+
+
+def get_parser(chunk_size: int = 1000, chunk_overlap: int = 200, extractor: Optional[str] = None) -> "PDFParser":
+    """
+    获取共享的解析器实例，解析器和分割器只保存配置，可被多个请求并发使用
+
+    Args:
+        chunk_size (int): 文档分块大小
+        chunk_overlap (int): 分块重叠大小
+        extractor (str, optional): 文本提取后端名称，默认读取 PDF_EXTRACTOR
+
+    Returns:
+        PDFParser: 对应参数的解析器实例
+
+    Raises:
+        ValueError: 提取后端未知或依赖未安装
+    """
+    extractor_name = get_extractor(extractor).name
+    key = (chunk_size, chunk_overlap, extractor_name)
+    with _parsers_lock:
+        parser = _parsers.get(key)
+        if parser is None:
+            parser = PDFParser(chunk_size=chunk_size, chunk_overlap=chunk_overlap, extractor=extractor_name)
+            _parsers[key] = parser
+            while len(_parsers) > MAX_CACHED_PARSERS:
+                _parsers.popitem(last=False)
+        else:
+            _parsers.move_to_end(key)
+        return parser
+
+
 class PDFParser:
     """
     PDF文档解析器 - 独立服务版本
-    使用PyPDFLoader进行基础PDF解析，专注于文本提取
+    默认使用pypdf进行基础PDF解析，专注于文本提取；提取后端可按实例选择
     """
 
-    def __init__(self, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None):
+    def __init__(self,
+                 chunk_size: Optional[int] = None,
+                 chunk_overlap: Optional[int] = None,
+                 parallel_workers: Optional[int] = None,
+                 extractor: Optional[str] = None):
         """
         初始化PDF解析器
 
         Args:
             chunk_size (int, optional): 文档分块大小，默认1000
             chunk_overlap (int, optional): 分块重叠大小，默认200
+            parallel_workers (int, optional): 并行提取页面的进程数，默认读取 PDF_PARALLEL_WORKERS，1表示不并行
+            extractor (str, optional): 文本提取后端 pypdf / pdfium / pymupdf，默认读取 PDF_EXTRACTOR
+
+        Raises:
+            ValueError: 提取后端未知或依赖未安装
         """
         self.chunk_size = chunk_size or 1000
         self.chunk_overlap = chunk_overlap or 200
-
-        # 初始化文本分割器
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
-
-        logger.info(f"PDF解析器初始化完成 - 分块大小: {self.chunk_size}, 重叠大小: {self.chunk_overlap}")
+        self.extractor: PDFExtractor = get_extractor(extractor)
+
+        # 并行页面提取配置：页数不少于 parallel_min_pages 时按页码区间分发到进程池
+        if parallel_workers is None:
+            parallel_workers = int(os.getenv('PDF_PARALLEL_WORKERS', str(min(4, os.cpu_count() or 1))))
+        self.parallel_workers = max(1, parallel_workers)
+        self.parallel_min_pages = int(os.getenv('PDF_PARALLEL_MIN_PAGES', '8'))
+
+        # 初始化文本分割器，默认使用基于偏移量的等价实现
+        if os.getenv('PDF_FAST_SPLITTER', 'true').lower() == 'true':
+            self.text_splitter = FastTextSplitter(chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
+        else:
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_function=len,
+                separators=DEFAULT_SEPARATORS
+            )
+
+        logger.info(f"PDF解析器初始化完成 - 分块大小: {self.chunk_size}, 重叠大小: {self.chunk_overlap}, "
+                    f"提取后端: {self.extractor.name}")
 
     def load_pdf(self, pdf_path: str) -> List[Document]:
         """
@@ -59,9 +217,18 @@ class PDFParser:
         logger.info(f"开始加载PDF文件: {pdf_path}")
 
         try:
-            # 使用PyPDFLoader加载PDF
-            loader = PyPDFLoader(file_path=pdf_path)
-            documents = loader.load()
+            documents = None
+            if self.parallel_workers > 1:
+                documents = self._load_pdf_parallel(pdf_path, pdf_path)
+
+            if documents is None and self.extractor.name == "pypdf":
+                # 使用PyPDFLoader加载PDF
+                loader = PyPDFLoader(file_path=pdf_path)
+                documents = loader.load()
+            elif documents is None:
+                documents = self._pages_to_documents(
+                    _extract_page_range(pdf_path, 0, extractor=self.extractor.name), pdf_path
+                )
 
             logger.info(f"PDF加载完成 - 总页数: {len(documents)}")
 
@@ -76,6 +243,129 @@ class PDFParser:
             logger.error(f"PDF加载失败: {pdf_path}, 错误: {str(e)}")
             raise
 
+    def load_pdf_bytes(self, content: bytes, file_name: str) -> List[Document]:
+        """
+        从内存中的文件内容加载PDF文档，不写临时文件
+
+        Args:
+            content (bytes): PDF文件内容
+            file_name (str): 文件名，写入元数据的 source 和 file_name
+
+        Returns:
+            List[Document]: 文档列表，每页对应一个Document对象
+
+        Raises:
+            ValueError: 文件内容为空
+            Exception: 解析失败
+        """
+        if not content:
+            raise ValueError(f"PDF文件内容为空: {file_name}")
+
+        logger.info(f"开始从内存加载PDF文件: {file_name}, 大小: {len(content)} 字节")
+
+        try:
+            documents = None
+            if self.parallel_workers > 1:
+                documents = self._load_pdf_parallel(content, file_name)
+
+            if documents is None:
+                documents = self._pages_to_documents(
+                    _extract_page_range(content, 0, extractor=self.extractor.name), file_name
+                )
+
+            logger.info(f"PDF加载完成 - 总页数: {len(documents)}")
+
+            for doc in documents:
+                doc.metadata['file_name'] = file_name
+
+            return documents
+
+        except Exception as e:
+            logger.error(f"PDF加载失败: {file_name}, 错误: {str(e)}")
+            raise
+
+    def iter_pdf_bytes(self,
+                       content: bytes,
+                       file_name: str,
+                       split_text: bool = True) -> Iterator[Tuple[int, int, List[Document]]]:
+        """
+        逐页提取并分块，每次只在内存中保留一页的文本和分块
+
+        分块按页独立进行，结果与 parse_pdf_to_documents 一致，chunk_id 在整个文档内连续编号。
+
+        Args:
+            content (bytes): PDF文件内容
+            file_name (str): 文件名
+            split_text (bool): 是否进行文本分块，默认True
+
+        Yields:
+            Tuple[int, int, List[Document]]: (页码, 总页数, 该页的文档列表)
+
+        Raises:
+            ValueError: 文件内容为空
+        """
+        if not content:
+            raise ValueError(f"PDF文件内容为空: {file_name}")
+
+        total_pages = self.extractor.page_count(content)
+        logger.info(f"开始逐页解析PDF文件: {file_name}, 总页数: {total_pages}")
+
+        chunk_id = 0
+        for page_number, text in self.extractor.extract_pages(content):
+            page_doc = Document(
+                page_content=text,
+                metadata={"source": file_name, "page": page_number, "file_name": file_name}
+            )
+            if not split_text:
+                yield page_number, total_pages, [page_doc]
+                continue
+
+            chunks = self.text_splitter.split_documents([page_doc])
+            for doc in chunks:
+                doc.metadata['chunk_id'] = chunk_id
+                doc.metadata['chunk_size'] = len(doc.page_content)
+                chunk_id += 1
+            yield page_number, total_pages, chunks
+
+    @staticmethod
+    def _pages_to_documents(pages: List[Tuple[int, str]], source_name: str) -> List[Document]:
+        """将 (页码, 文本) 列表转换为与PyPDFLoader元数据一致的Document列表"""
+        return [
+            Document(page_content=text, metadata={"source": source_name, "page": page_number})
+            for page_number, text in pages
+        ]
+
+    def _load_pdf_parallel(self, source: Union[str, bytes], source_name: str) -> Optional[List[Document]]:
+        """
+        将页码区间分发到进程池并行提取文本，按页码顺序合并
+
+        Args:
+            source (Union[str, bytes]): PDF文件路径或文件内容
+            source_name (str): 写入元数据 source 的名称
+
+        Returns:
+            Optional[List[Document]]: 文档列表，元数据与PyPDFLoader一致；页数不足时返回None，由调用方顺序加载
+        """
+        total_pages = self.extractor.page_count(source)
+        if total_pages < self.parallel_min_pages:
+            return None
+
+        # 每个进程处理一段连续页码，减少子进程重复解析文件结构的次数
+        workers = min(self.parallel_workers, total_pages)
+        pages_per_task = math.ceil(total_pages / workers)
+        ranges = [(start, min(start + pages_per_task, total_pages))
+                  for start in range(0, total_pages, pages_per_task)]
+
+        logger.info(f"并行提取PDF页面 - 总页数: {total_pages}, 进程数: {workers}, 区间数: {len(ranges)}")
+
+        pool = get_page_pool(self.parallel_workers)
+        futures = [pool.submit(_extract_page_range, source, start, end, self.extractor.name) for start, end in ranges]
+
+        documents = []
+        for future in futures:
+            documents.extend(self._pages_to_documents(future.result(), source_name))
+        return documents
+
     def split_documents(self, documents: List[Document]) -> List[Document]:
         """
         对文档进行分块处理
@@ -104,21 +394,28 @@ class PDFParser:
             logger.error(f"文档分块失败: {str(e)}")
             raise
 
-    def parse_pdf_to_documents(self, pdf_path: str, split_text: bool = True) -> List[Document]:
+    def parse_pdf_to_documents(self,
+                               pdf_path: Union[str, bytes],
+                               split_text: bool = True,
+                               file_name: Optional[str] = None) -> List[Document]:
         """
         解析PDF文档为Document对象列表
 
         Args:
-            pdf_path (str): PDF文件路径
+            pdf_path (Union[str, bytes]): PDF文件路径，或上传文件的内容（直接在内存中解析）
             split_text (bool): 是否进行文本分块，默认True
+            file_name (str, optional): 传入文件内容时的文件名
 
         Returns:
             List[Document]: 解析后的文档列表
         """
-        logger.info(f"开始解析PDF文档: {pdf_path}")
-
-        # 加载PDF文档
-        documents = self.load_pdf(pdf_path)
+        if isinstance(pdf_path, bytes):
+            file_name = file_name or "upload.pdf"
+            logger.info(f"开始解析PDF文档: {file_name}")
+            documents = self.load_pdf_bytes(pdf_path, file_name)
+        else:
+            logger.info(f"开始解析PDF文档: {pdf_path}")
+            documents = self.load_pdf(pdf_path)
 
         # 如果需要分块
         if split_text:
@@ -127,18 +424,165 @@ class PDFParser:
         logger.info(f"PDF文档解析完成 - 最终文档数: {len(documents)}")
         return documents
 
-    def parse_pdf_to_text(self, pdf_path: str, split_text: bool = True) -> str:
+    @staticmethod
+    def _with_file_name(documents: List[Document], file_name: str) -> List[Document]:
+        """同一内容可能以不同文件名上传，缓存中取出的文档以本次上传的文件名为准"""
+        for doc in documents:
+            doc.metadata['source'] = file_name
+            doc.metadata['file_name'] = file_name
+        return documents
+
+    def parse_pdf_bytes_cached(self,
+                               content: bytes,
+                               file_name: str,
+                               split_text: bool = True) -> Tuple[List[Document], bool]:
+        """
+        带缓存的内存PDF解析，缓存键为 sha256(content) 加提取后端和分块参数
+
+        分块结果未命中时复用已缓存的页面文本，只重新分块。
+
+        Args:
+            content (bytes): PDF文件内容
+            file_name (str): 文件名
+            split_text (bool): 是否进行文本分块，默认True
+
+        Returns:
+            Tuple[List[Document], bool]: (文档列表, 是否命中分块结果缓存)
+        """
+        cache = get_parse_cache()
+        if cache is None:
+            return self.parse_pdf_to_documents(content, split_text, file_name), False
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        result_key = cache.make_key(
+            content_hash, self.extractor.name, self.chunk_size, self.chunk_overlap, split_text
+        )
+
+        documents = cache.get(result_key)
+        if documents is not None:
+            logger.info(f"解析缓存命中: {file_name}, 文档数: {len(documents)}")
+            return self._with_file_name(documents, file_name), True
+
+        pages_key = cache.make_key(content_hash, self.extractor.name)
+        documents = cache.get(pages_key)
+        if documents is None:
+            documents = self.load_pdf_bytes(content, file_name)
+            cache.put(pages_key, documents)
+        else:
+            documents = self._with_file_name(documents, file_name)
+
+        if split_text:
+            documents = self.split_documents(documents)
+        cache.put(result_key, documents)
+
+        logger.info(f"PDF文档解析完成 - 最终文档数: {len(documents)}")
+        return documents, False
+
+    def parse_pdf_batch(self,
+                        files: List[Tuple[str, bytes]],
+                        split_text: bool = True) -> List[Dict[str, Any]]:
+        """
+        批量解析多个文件，每个文件作为一个任务分发到进程池，单个文件失败不影响其他文件
+
+        命中解析缓存的文件直接返回；子进程异常退出（例如C扩展崩溃）时重建进程池，
+        受影响的文件逐个重试，以确定并只标记真正导致崩溃的文件。
+
+        Args:
+            files (List[Tuple[str, bytes]]): (文件名, 文件内容) 列表
+            split_text (bool): 是否进行文本分块，默认True
+
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的结果，包含 file_name、documents、error、processing_time、cache_hit
+        """
+        cache = get_parse_cache()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+        result_keys: Dict[int, str] = {}
+
+        pending = []
+        for index, (file_name, content) in enumerate(files):
+            if cache is not None:
+                result_keys[index] = cache.make_key(
+                    hashlib.sha256(content).hexdigest(), self.extractor.name,
+                    self.chunk_size, self.chunk_overlap, split_text
+                )
+                documents = cache.get(result_keys[index])
+                if documents is not None:
+                    results[index] = {
+                        "file_name": file_name,
+                        "documents": self._with_file_name(documents, file_name),
+                        "error": None,
+                        "processing_time": 0.0,
+                        "cache_hit": True
+                    }
+                    continue
+            pending.append(index)
+
+        logger.info(f"开始批量解析PDF - 文件数: {len(files)}, 缓存命中: {len(files) - len(pending)}, "
+                    f"进程数: {self.parallel_workers}")
+
+        def submit(pool: ProcessPoolExecutor, index: int):
+            file_name, content = files[index]
+            return pool.submit(_parse_file, content, file_name, self.chunk_size, self.chunk_overlap,
+                               split_text, self.extractor.name)
+
+        def record(index: int, future):
+            """记录单个文件的结果，进程池损坏时抛出 BrokenProcessPool 由调用方处理"""
+            file_name = files[index][0]
+            try:
+                documents, processing_time = future.result()
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                logger.error(f"批量解析中的文件失败: {file_name}, 错误: {str(e)}")
+                results[index] = {"file_name": file_name, "documents": None, "error": str(e),
+                                  "processing_time": 0.0, "cache_hit": False}
+                return
+            if cache is not None:
+                cache.put(result_keys[index], documents)
+            results[index] = {"file_name": file_name, "documents": documents, "error": None,
+                              "processing_time": processing_time, "cache_hit": False}
+
+        pool = get_page_pool(self.parallel_workers)
+        futures = [(index, submit(pool, index)) for index in pending]
+        broken = []
+        for index, future in futures:
+            try:
+                record(index, future)
+            except BrokenProcessPool:
+                broken.append(index)
+
+        # 进程池损坏后无法判断是哪个文件导致的，逐个重试
+        if broken:
+            _discard_page_pool(pool)
+            for index in broken:
+                pool = get_page_pool(self.parallel_workers)
+                try:
+                    record(index, submit(pool, index))
+                except BrokenProcessPool:
+                    _discard_page_pool(pool)
+                    file_name = files[index][0]
+                    logger.error(f"批量解析中的文件导致解析进程异常退出: {file_name}")
+                    results[index] = {"file_name": file_name, "documents": None, "error": "解析进程异常退出",
+                                      "processing_time": 0.0, "cache_hit": False}
+
+        return results
+
+    def parse_pdf_to_text(self,
+                          pdf_path: Union[str, bytes],
+                          split_text: bool = True,
+                          file_name: Optional[str] = None) -> str:
         """
         解析PDF文档为纯文本
 
         Args:
-            pdf_path (str): PDF文件路径
+            pdf_path (Union[str, bytes]): PDF文件路径或上传文件的内容
             split_text (bool): 是否进行文本分块，默认True
+            file_name (str, optional): 传入文件内容时的文件名
 
         Returns:
             str: 解析后的文本内容
         """
-        documents = self.parse_pdf_to_documents(pdf_path, split_text)
+        documents = self.parse_pdf_to_documents(pdf_path, split_text, file_name)
 
         # 合并所有文档内容
         text_content = "\n\n".join([doc.page_content for doc in documents])
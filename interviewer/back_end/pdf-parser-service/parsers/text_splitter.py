@@ -0,0 +1,154 @@
+"""
+快速文本分割器 - 独立服务版本
+针对默认分隔符 ["\n\n", "\n", " ", ""] 的 RecursiveCharacterTextSplitter 等价实现，
+全程在原文的字符偏移上计算，只在输出分块时切片一次
+"""
+
+import copy
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+# 支持的分隔符顺序，与 RecursiveCharacterTextSplitter 的默认值一致
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+class FastTextSplitter:
+    """
+    基于偏移量的递归字符分割器
+
+    输出与 RecursiveCharacterTextSplitter(separators=DEFAULT_SEPARATORS, keep_separator=True,
+    strip_whitespace=True, length_function=len) 完全一致。保留分隔符时各片段在原文中首尾相接，
+    因此片段可以用 (起点, 终点) 表示，合并窗口的长度等于终点减起点，无需创建中间字符串和列表。
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        """
+        初始化分割器
+
+        Args:
+            chunk_size: 分块大小
+            chunk_overlap: 分块重叠大小
+
+        Raises:
+            ValueError: 重叠大小大于分块大小
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"分块重叠大小({chunk_overlap})不能大于分块大小({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        分割文本
+
+        Args:
+            text: 原文
+
+        Returns:
+            List[str]: 分块列表
+        """
+        chunks: List[str] = []
+        self._split_range(text, 0, len(text), 0, chunks)
+        return chunks
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """
+        分割文档，每个分块复制一份原文档的元数据
+
+        Args:
+            documents: 原始文档列表
+
+        Returns:
+            List[Document]: 分块后的文档列表
+        """
+        split_docs = []
+        for doc in documents:
+            for chunk in self.split_text(doc.page_content):
+                split_docs.append(Document(page_content=chunk, metadata=copy.deepcopy(doc.metadata)))
+        return split_docs
+
+    def _split_range(self, text: str, start: int, end: int, level: int, chunks: List[str]):
+        """
+        递归分割 text[start:end]
+
+        Args:
+            text: 原文
+            start: 起始偏移
+            end: 结束偏移
+            level: 从 DEFAULT_SEPARATORS 的第几个分隔符开始尝试
+            chunks: 输出分块列表
+        """
+        # 选择范围内出现的第一个分隔符，空分隔符按字符切分
+        separator = ""
+        next_level = len(DEFAULT_SEPARATORS)
+        for i in range(level, len(DEFAULT_SEPARATORS)):
+            candidate = DEFAULT_SEPARATORS[i]
+            if candidate == "":
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                next_level = i + 1
+                break
+
+        has_next = next_level < len(DEFAULT_SEPARATORS)
+        good: List[Tuple[int, int]] = []
+        for split_start, split_end in self._iter_splits(text, start, end, separator):
+            if split_end - split_start < self.chunk_size:
+                good.append((split_start, split_end))
+                continue
+            if good:
+                self._merge(text, good, chunks)
+                good = []
+            if has_next:
+                self._split_range(text, split_start, split_end, next_level, chunks)
+            else:
+                chunks.append(text[split_start:split_end])
+        if good:
+            self._merge(text, good, chunks)
+
+    @staticmethod
+    def _iter_splits(text: str, start: int, end: int, separator: str):
+        """按分隔符切分 [start, end)，分隔符保留在后一个片段开头，跳过空片段"""
+        if separator == "":
+            for position in range(start, end):
+                yield position, position + 1
+            return
+
+        step = len(separator)
+        piece_start = start
+        position = text.find(separator, start, end)
+        while position != -1:
+            if position > piece_start:
+                yield piece_start, position
+            piece_start = position
+            position = text.find(separator, position + step, end)
+        if end > piece_start:
+            yield piece_start, end
+
+    def _merge(self, text: str, splits: List[Tuple[int, int]], chunks: List[str]):
+        """
+        将相邻的小片段合并为不超过 chunk_size 的分块，相邻分块保留 chunk_overlap 的重叠
+
+        片段首尾相接，窗口 [first, last] 对应的文本为 text[splits[first][0]:splits[last][1]]。
+        """
+        first = 0
+        total = 0
+        for index, (split_start, split_end) in enumerate(splits):
+            length = split_end - split_start
+            if total + length > self.chunk_size and index > first:
+                self._emit(text, splits[first][0], splits[index - 1][1], chunks)
+                # 从窗口头部移除片段，直到重叠部分不超过 chunk_overlap 且能放下当前片段
+                while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                    total -= splits[first][1] - splits[first][0]
+                    first += 1
+            total += length
+        if first < len(splits):
+            self._emit(text, splits[first][0], splits[-1][1], chunks)
+
+    @staticmethod
+    def _emit(text: str, start: int, end: int, chunks: List[str]):
+        """输出去除首尾空白后的非空分块"""
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
@@ -0,0 +1,135 @@
+"""
+解析任务池 - 独立服务版本
+将同步的PDF解析放到有界线程池中执行，避免阻塞事件循环；排队已满时直接拒绝
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ParsePoolFullError(Exception):
+    """解析任务池已满"""
+
+
+class ParseWorkerPool:
+    """
+    有界解析任务池
+
+    最多 workers 个任务同时执行，另有 max_queue 个任务排队；
+    超出部分立即抛出 ParsePoolFullError，由路由转换为503响应。
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        """
+        初始化解析任务池
+
+        Args:
+            workers: 同时执行的解析任务数，默认读取 PARSE_WORKERS
+            max_queue: 最大排队任务数，默认读取 PARSE_MAX_QUEUE
+        """
+        self.workers = max(1, workers or int(os.getenv('PARSE_WORKERS', '2')))
+        self.max_queue = max(0, max_queue if max_queue is not None else int(os.getenv('PARSE_MAX_QUEUE', '8')))
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdf-parse")
+        self._lock = threading.Lock()
+
+        # 队列指标
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._total_wait = 0.0
+
+        logger.info(f"解析任务池初始化完成 - 并发数: {self.workers}, 最大排队数: {self.max_queue}")
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        提交解析任务并等待结果
+
+        Args:
+            func: 同步解析函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            Any: 解析函数的返回值
+
+        Raises:
+            ParsePoolFullError: 执行中和排队中的任务数已达上限
+        """
+        return await self.submit(func, *args, **kwargs)
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> "asyncio.Future":
+        """
+        提交解析任务，立即检查容量并返回可等待的Future，需在事件循环中调用
+
+        流式接口在开始响应前调用，任务池已满时还能返回503。
+
+        Args:
+            func: 同步解析函数
+            *args: 位置参数
+            **kwargs: 关键字参数
+
+        Returns:
+            asyncio.Future: 解析函数的执行结果
+
+        Raises:
+            ParsePoolFullError: 执行中和排队中的任务数已达上限
+        """
+        with self._lock:
+            if self.queued + self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ParsePoolFullError(
+                    f"解析任务已满: 执行中 {self.in_flight}, 排队 {self.queued}, 请稍后重试"
+                )
+            self.queued += 1
+
+        submitted_at = time.time()
+
+        def task():
+            with self._lock:
+                self.queued -= 1
+                self.in_flight += 1
+                self._total_wait += time.time() - submitted_at
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    self.in_flight -= 1
+                    self.failed += 1
+                raise
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+            return result
+
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._executor, task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取任务池指标"""
+        with self._lock:
+            started = self.completed + self.failed + self.in_flight
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_time": round(self._total_wait / started, 4) if started else 0.0
+            }
+
+    def shutdown(self):
+        """关闭任务池，等待执行中的任务结束"""
+        self._executor.shutdown(wait=True)
+        logger.info("解析任务池已关闭")
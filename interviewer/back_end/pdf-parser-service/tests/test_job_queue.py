@@ -0,0 +1,107 @@
+"""
+解析任务队列测试：重启恢复、排队上限、结果过期清理和排队位置
+"""
+
+import time
+
+import pytest
+
+from parsers.job_queue import ParseJobQueue, JOB_COMPLETED, JOB_PENDING, JOB_RUNNING
+from parsers.worker_pool import ParsePoolFullError
+
+
+def echo_handler(task_id, content, file_name, params):
+    return {"task_id": task_id, "size": len(content), "file_name": file_name, "params": params}
+
+
+def wait_for_status(queue: ParseJobQueue, task_id: str, status: str, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(task_id)
+        if job is not None and job["status"] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"任务 {task_id} 未在 {timeout} 秒内进入 {status} 状态")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "parse_jobs.db")
+
+
+def test_running_jobs_are_requeued_on_restart(db_path):
+    # 模拟上次进程在执行中退出：任务停留在 running 状态，PDF内容仍在库中
+    crashed = ParseJobQueue(echo_handler, db_path=db_path)
+    crashed.submit("t1", b"%PDF-1", "a.pdf", {"chunk_size": 500})
+    crashed._conn.execute("UPDATE parse_jobs SET status = ?, started_at = ?", (JOB_RUNNING, time.time()))
+    crashed._conn.commit()
+    crashed._conn.close()
+
+    queue = ParseJobQueue(echo_handler, db_path=db_path)
+    queue.start()
+    try:
+        job = wait_for_status(queue, "t1", JOB_COMPLETED)
+        assert job["result"] == {"task_id": "t1", "size": 6, "file_name": "a.pdf", "params": {"chunk_size": 500}}
+        assert queue.get_stats()["running"] == 0
+    finally:
+        queue.shutdown()
+
+
+def test_submit_rejects_when_max_pending_reached(db_path):
+    queue = ParseJobQueue(echo_handler, db_path=db_path, max_pending=2)
+    queue.submit("t1", b"1", "a.pdf", {})
+    queue.submit("t2", b"2", "b.pdf", {})
+
+    with pytest.raises(ParsePoolFullError):
+        queue.submit("t3", b"3", "c.pdf", {})
+
+    stats = queue.get_stats()
+    assert stats["pending"] == 2
+    assert stats["submitted"] == 2
+    assert stats["rejected"] == 1
+    assert queue.get("t3") is None
+
+
+def test_queue_position_counts_earlier_pending_jobs(db_path):
+    queue = ParseJobQueue(echo_handler, db_path=db_path)
+    for i in range(3):
+        queue.submit(f"t{i}", b"x", f"{i}.pdf", {})
+        time.sleep(0.01)
+
+    assert [queue.get(f"t{i}")["queue_position"] for i in range(3)] == [0, 1, 2]
+    assert queue.get("t0")["status"] == JOB_PENDING
+
+
+def test_results_expire_after_ttl(db_path):
+    queue = ParseJobQueue(echo_handler, db_path=db_path, result_ttl=1)
+    queue.start()
+    try:
+        queue.submit("t1", b"x", "a.pdf", {})
+        job = wait_for_status(queue, "t1", JOB_COMPLETED)
+        assert job["queue_position"] is None
+        assert job["expires_at"] == pytest.approx(job["finished_at"] + 1)
+
+        time.sleep(1.1)
+        # 过期后查询不到结果，清理时删除记录
+        assert queue.get("t1") is None
+        assert queue.cleanup_expired() == 1
+        assert queue.get_stats()["stored_completed"] == 0
+        assert queue.expired == 1
+        assert queue.cleanup_expired() == 0
+    finally:
+        queue.shutdown()
+
+
+def test_failed_handler_marks_job_failed(db_path):
+    def failing_handler(task_id, content, file_name, params):
+        raise ValueError("损坏的PDF")
+
+    queue = ParseJobQueue(failing_handler, db_path=db_path)
+    queue.start()
+    try:
+        queue.submit("t1", b"x", "a.pdf", {})
+        job = wait_for_status(queue, "t1", "failed")
+        assert job["error"] == "损坏的PDF"
+        assert job["result"] is None
+    finally:
+        queue.shutdown()
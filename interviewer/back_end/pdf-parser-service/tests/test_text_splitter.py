@@ -0,0 +1,71 @@
+"""
+FastTextSplitter 测试：与 LangChain RecursiveCharacterTextSplitter 在相同参数下输出完全一致
+"""
+
+import random
+
+import pytest
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from parsers.text_splitter import FastTextSplitter, DEFAULT_SEPARATORS
+
+CHINESE_RESUME = (
+    "教育背景\n\n某某大学 计算机科学与技术 本科 2019-2023\n"
+    "主修课程：数据结构、操作系统、计算机网络、数据库原理。\n\n"
+    "项目经历\n\n基于muduo网络库实现高并发HTTP服务器，采用Reactor模型与线程池，单机QPS达到2万。\n"
+    "使用C++11实现线程安全的日志系统，支持异步写入与按日期滚动。\n\n"
+    "专业技能\n\n熟悉Redis常用数据结构，了解持久化机制、主从复制与哨兵模式，能够处理缓存穿透和缓存雪崩问题。"
+)
+
+ENGLISH_TEXT = (
+    "Designed a sharded cache layer in front of MySQL.\n\n"
+    "Reduced p99 latency from 800ms to 120ms by batching lookups and adding a local LRU.\n"
+    "Wrote integration tests  with   irregular   spacing and trailing spaces   \n\n\n"
+    "Short line.\nAnother short line.\n"
+)
+
+
+def langchain_split(text: str, chunk_size: int, chunk_overlap: int):
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=DEFAULT_SEPARATORS
+    ).split_text(text)
+
+
+def assert_same_output(text: str, chunk_size: int, chunk_overlap: int):
+    expected = langchain_split(text, chunk_size, chunk_overlap)
+    actual = FastTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split_text(text)
+    assert actual == expected
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(20, 0), (20, 5), (50, 10), (100, 20), (1000, 200)])
+@pytest.mark.parametrize("text", [CHINESE_RESUME, ENGLISH_TEXT, CHINESE_RESUME + "\n\n" + ENGLISH_TEXT],
+                         ids=["chinese", "english", "mixed"])
+def test_matches_langchain(text, chunk_size, chunk_overlap):
+    assert_same_output(text, chunk_size, chunk_overlap)
+
+
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(10, 0), (10, 3), (64, 16)])
+@pytest.mark.parametrize("text", [
+    "连续的中文没有任何空白或换行分隔符因此只能按字符切分" * 5,
+    "abcdefghijklmnopqrstuvwxyz" * 10,
+], ids=["chinese", "ascii"])
+def test_matches_langchain_without_separators(text, chunk_size, chunk_overlap):
+    assert_same_output(text, chunk_size, chunk_overlap)
+
+
+@pytest.mark.parametrize("text", ["", " ", "\n\n", "短文本"])
+def test_matches_langchain_on_trivial_input(text):
+    assert_same_output(text, 100, 20)
+
+
+def test_matches_langchain_on_random_text():
+    rng = random.Random(0)
+    alphabet = list("简历项目经验技能abcxyz0123") + [" ", " ", "\n", "\n\n"]
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 400)))
+        chunk_size = rng.randint(5, 120)
+        chunk_overlap = rng.randint(0, chunk_size // 2)
+        assert_same_output(text, chunk_size, chunk_overlap)
@@ -3,15 +3,18 @@
 提供向量存储和检索功能
 """
 
+import json
 import time
+import base64
+import asyncio
 import logging
 from datetime import datetime
-from typing import Dict
+from typing import List, Tuple, Dict, Any, Optional
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from langchain_core.documents import Document
 
 # 修复相对导入问题
 import sys
@@ -21,9 +24,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from api.models import (
     StoreRequest, StoreDocumentsRequest, SearchRequest,
     StoreResponse, SearchResponse, CollectionStatsResponse,
-    HealthResponse, ErrorResponse, SearchResult
+    HealthResponse, ErrorResponse, SearchResult, BatchTiming,
+    EmbedRequest, EmbedResponse, BatchSearchRequest, BatchSearchResponse,
+    QueryResults, StreamStoreResponse, StreamLineError, KeywordIndexRebuildResponse
 )
-from database import MilvusVectorStore
+from config import (
+    MILVUS_POOL_SIZE, MILVUS_MAX_COLLECTION_HANDLES, MILVUS_HANDLE_IDLE_SECONDS,
+    MILVUS_PRELOAD_COLLECTIONS, DEFAULT_EMBEDDING_MODEL,
+    STORE_STREAM_BATCH_SIZE, STORE_STREAM_MAX_LINE_BYTES, VECTOR_STORE_BACKEND
+)
+from database import MilvusVectorStore, MilvusConnectionPool, get_result_cache
+from embeddings import embedding_service
 
 # 配置日志
 logging.basicConfig(
@@ -32,13 +43,56 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 全局Milvus连接池，共享连接并缓存集合实例
+connection_pool = MilvusConnectionPool(
+    pool_size=MILVUS_POOL_SIZE,
+    max_stores=MILVUS_MAX_COLLECTION_HANDLES,
+    idle_timeout=MILVUS_HANDLE_IDLE_SECONDS,
+    backend_type=VECTOR_STORE_BACKEND
+)
+
+# 全局检索结果缓存，未启用时为None
+result_cache = get_result_cache()
+
+
+def parse_preload_collections(value: str) -> List[Tuple[str, str]]:
+    """解析预加载集合配置，格式: 集合名:嵌入模型,集合名:嵌入模型"""
+    collections = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, model = item.partition(":")
+        collections.append((name.strip(), model.strip() or DEFAULT_EMBEDDING_MODEL))
+    return collections
+
+
+# 应用启动和关闭处理
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期管理"""
+    # 启动时预先建立连接并加载常用集合
+    logger.info("🚀 启动向量存储服务...")
+    if await asyncio.to_thread(connection_pool.connect):
+        await asyncio.to_thread(connection_pool.preload, parse_preload_collections(MILVUS_PRELOAD_COLLECTIONS))
+    else:
+        logger.warning("⚠️ 启动时无法连接Milvus，将在首次请求时重试")
+
+    yield
+
+    # 关闭时释放连接
+    logger.info("🛑 关闭向量存储服务...")
+    connection_pool.close()
+
+
 # 创建FastAPI应用
 app = FastAPI(
     title="向量存储服务",
     description="专门用于向量存储和检索的微服务",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # 添加CORS中间件
@@ -50,9 +104,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 全局向量存储实例缓存
-vector_stores: Dict[str, MilvusVectorStore] = {}
-
 # 全局异常处理
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -66,56 +117,43 @@ async def global_exception_handler(request, exc):
     )
 
 
-def get_vector_store(collection_name: str, embedding_model: str) -> MilvusVectorStore:
+async def get_vector_store(collection_name: str,
+                           embedding_model: str,
+                           create: bool = True) -> Optional[MilvusVectorStore]:
     """
     获取或创建向量存储实例
 
+    首次访问集合时需要探测向量维度并创建集合，放到线程中执行，不阻塞事件循环
+
     Args:
         collection_name: 集合名称
         embedding_model: 嵌入模型类型
+        create: 集合不存在时是否创建，只有写入路径创建集合
 
     Returns:
-        MilvusVectorStore: 向量存储实例
+        Optional[MilvusVectorStore]: 向量存储实例，create为False且集合不存在时返回None
     """
-    store_key = f"{collection_name}_{embedding_model}"
-
-    if store_key not in vector_stores:
-        logger.info(f"创建新的向量存储实例: {store_key}")
-        vector_store = MilvusVectorStore(
-            collection_name=collection_name,
-            embedding_model_type=embedding_model
-        )
-
-        # 创建连接
-        if not vector_store.create_connection():
-            raise HTTPException(status_code=500, detail="无法连接到Milvus数据库")
-
-        # 确保集合存在
-        if not vector_store.create_collection_if_not_exists():
-            raise HTTPException(status_code=500, detail="无法创建或访问集合")
-
-        vector_stores[store_key] = vector_store
-
-    return vector_stores[store_key]
+    try:
+        return await asyncio.to_thread(connection_pool.get_store, collection_name, embedding_model, create)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """健康检查接口"""
-    # 测试Milvus连接
-    milvus_connected = False
-    try:
-        test_store = MilvusVectorStore("health_check", "zhipuai")
-        milvus_connected = test_store.create_connection()
-    except Exception as e:
-        logger.warning(f"健康检查时Milvus连接失败: {str(e)}")
+    # 复用连接池中的连接检测Milvus，避免每次探测都新建连接
+    milvus_connected = await asyncio.to_thread(connection_pool.ping)
 
     return HealthResponse(
         status="healthy" if milvus_connected else "degraded",
         service="vector-storage-service",
         version="1.0.0",
         timestamp=datetime.now().isoformat(),
-        milvus_connected=milvus_connected
+        milvus_connected=milvus_connected,
+        embedding_cache=embedding_service.get_cache_stats(),
+        search_cache=result_cache.get_stats() if result_cache is not None else {"enabled": False},
+        connection_pool=connection_pool.get_stats()
     )
 
 
@@ -136,13 +174,10 @@ async def store_texts(request: StoreRequest):
 
     try:
         # 获取向量存储实例
-        vector_store = get_vector_store(request.collection_name, request.embedding_model)
-
-        # 存储文本
-        success = vector_store.add_texts(request.texts, request.metadatas)
+        vector_store = await get_vector_store(request.collection_name, request.embedding_model)
 
-        if not success:
-            raise HTTPException(status_code=500, detail="文本存储失败")
+        # 分批嵌入并写入，在线程中执行避免阻塞事件循环
+        batch_stats = await asyncio.to_thread(vector_store.insert_texts, request.texts, request.metadatas)
 
         processing_time = time.time() - start_time
 
@@ -152,8 +187,10 @@ async def store_texts(request: StoreRequest):
             success=True,
             message="文本存储成功",
             collection_name=request.collection_name,
-            stored_count=len(request.texts),
-            processing_time=round(processing_time, 2)
+            stored_count=sum(batch["size"] for batch in batch_stats),
+            existing_count=sum(batch["skipped"] for batch in batch_stats),
+            processing_time=round(processing_time, 2),
+            batch_timings=[BatchTiming(**batch) for batch in batch_stats]
         )
 
     except HTTPException:
@@ -180,19 +217,14 @@ async def store_documents(request: StoreDocumentsRequest):
 
     try:
         # 获取向量存储实例
-        vector_store = get_vector_store(request.collection_name, request.embedding_model)
-
-        # 转换为Document对象
-        documents = [
-            Document(page_content=doc.content, metadata=doc.metadata)
-            for doc in request.documents
-        ]
-
-        # 存储文档
-        success = vector_store.add_documents(documents)
+        vector_store = await get_vector_store(request.collection_name, request.embedding_model)
 
-        if not success:
-            raise HTTPException(status_code=500, detail="文档存储失败")
+        # 分批嵌入并写入，在线程中执行避免阻塞事件循环
+        batch_stats = await asyncio.to_thread(
+            vector_store.insert_texts,
+            [doc.content for doc in request.documents],
+            [doc.metadata for doc in request.documents]
+        )
 
         processing_time = time.time() - start_time
 
@@ -202,8 +234,10 @@ async def store_documents(request: StoreDocumentsRequest):
             success=True,
             message="文档存储成功",
             collection_name=request.collection_name,
-            stored_count=len(request.documents),
-            processing_time=round(processing_time, 2)
+            stored_count=sum(batch["size"] for batch in batch_stats),
+            existing_count=sum(batch["skipped"] for batch in batch_stats),
+            processing_time=round(processing_time, 2),
+            batch_timings=[BatchTiming(**batch) for batch in batch_stats]
         )
 
     except HTTPException:
@@ -213,6 +247,195 @@ async def store_documents(request: StoreDocumentsRequest):
         raise HTTPException(status_code=500, detail=f"存储文档失败: {str(e)}")
 
 
+# 流式写入响应中最多返回的行错误数
+MAX_STREAM_ERRORS = 20
+
+
+def parse_stream_line(raw: bytes) -> Tuple[str, Dict[str, Any]]:
+    """
+    解析一行NDJSON
+
+    Args:
+        raw: 单行内容，格式为 {"text": "...", "metadata": {...}}，text也可写作content
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: (文本, 元数据)
+    """
+    item = json.loads(raw)
+    if not isinstance(item, dict):
+        raise ValueError("每行必须是JSON对象")
+
+    text = item.get("text", item.get("content"))
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("缺少非空的text字段")
+
+    metadata = item.get("metadata") or {}
+    if not isinstance(metadata, dict):
+        raise ValueError("metadata必须是JSON对象")
+
+    return text, metadata
+
+
+@app.post("/store/stream", response_model=StreamStoreResponse)
+async def store_stream(request: Request, collection_name: str, embedding_model: str = "zhipuai"):
+    """
+    流式存储NDJSON文本到向量数据库
+
+    请求体每行一个JSON对象，边接收边按批嵌入写入。当前批次写入期间继续接收下一批，
+    内存中最多保留两个批次，与上传总量无关；格式错误的行跳过并记录行号。
+
+    Args:
+        request: 原始请求，请求体为NDJSON
+        collection_name: 集合名称
+        embedding_model: 嵌入模型类型
+
+    Returns:
+        StreamStoreResponse: 写入进度汇总
+    """
+    start_time = time.time()
+
+    logger.info(f"开始流式存储到集合: {collection_name}")
+
+    vector_store = await get_vector_store(collection_name, embedding_model)
+
+    progress = {"received": 0, "stored": 0, "existing": 0, "skipped": 0, "batches": 0, "embedding_time": 0.0, "insert_time": 0.0}
+    errors: List[StreamLineError] = []
+    texts: List[str] = []
+    metadatas: List[Dict[str, Any]] = []
+    pending = None  # 正在执行的写入任务
+
+    async def wait_pending():
+        """等待上一批写入完成并累计统计"""
+        nonlocal pending
+        if pending is None:
+            return
+        task, pending = pending, None
+        for batch in await task:
+            progress["stored"] += batch["size"]
+            progress["existing"] += batch["skipped"]
+            progress["batches"] += 1
+            progress["embedding_time"] += batch["embedding_time"]
+            progress["insert_time"] += batch["insert_time"]
+        logger.info(f"流式存储进度: 集合={collection_name}, 已写入={progress['stored']}")
+
+    async def submit_batch():
+        """提交当前批次，写入与后续行的接收并行"""
+        nonlocal pending, texts, metadatas
+        await wait_pending()
+        if texts:
+            pending = asyncio.create_task(asyncio.to_thread(vector_store.insert_texts, texts, metadatas))
+            texts, metadatas = [], []
+
+    async def handle_line(line_no: int, raw: bytes):
+        """解析单行并在批次满时提交"""
+        if not raw.strip():
+            return
+        progress["received"] += 1
+        try:
+            text, metadata = parse_stream_line(raw)
+        except ValueError as e:
+            # json.JSONDecodeError 是 ValueError 的子类
+            progress["skipped"] += 1
+            if len(errors) < MAX_STREAM_ERRORS:
+                errors.append(StreamLineError(line=line_no, error=str(e)))
+            return
+
+        texts.append(text)
+        metadatas.append(metadata)
+        if len(texts) >= STORE_STREAM_BATCH_SIZE:
+            await submit_batch()
+
+    line_no = 0
+    buffer = b""
+    try:
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for raw in lines:
+                line_no += 1
+                await handle_line(line_no, raw)
+
+            if len(buffer) > STORE_STREAM_MAX_LINE_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"第 {line_no + 1} 行超过 {STORE_STREAM_MAX_LINE_BYTES} 字节，已写入 {progress['stored']} 条"
+                )
+
+        # 最后一行可能没有换行符
+        await handle_line(line_no + 1, buffer)
+        await submit_batch()
+        await wait_pending()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"流式存储失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"流式存储失败: {str(e)}，已写入 {progress['stored']} 条")
+    finally:
+        # 出错时也要等待在途批次结束，避免任务异常无人处理
+        if pending is not None:
+            await asyncio.gather(pending, return_exceptions=True)
+
+    processing_time = time.time() - start_time
+
+    logger.info(f"流式存储完成: {collection_name}, 写入: {progress['stored']}, "
+                f"跳过: {progress['skipped']}, 耗时: {processing_time:.2f}秒")
+
+    return StreamStoreResponse(
+        success=True,
+        message="流式存储完成",
+        collection_name=collection_name,
+        received_lines=progress["received"],
+        stored_count=progress["stored"],
+        existing_count=progress["existing"],
+        skipped_count=progress["skipped"],
+        batch_count=progress["batches"],
+        embedding_time=round(progress["embedding_time"], 3),
+        insert_time=round(progress["insert_time"], 3),
+        processing_time=round(processing_time, 2),
+        errors=errors
+    )
+
+
+@app.post("/embed", response_model=EmbedResponse)
+async def embed_texts(request: EmbedRequest):
+    """
+    计算文本向量
+
+    服务内部全程使用float32数组，只在这里按请求的编码格式转换一次。
+
+    Args:
+        request: 嵌入请求
+
+    Returns:
+        EmbedResponse: 向量结果
+    """
+    start_time = time.time()
+
+    try:
+        vectors = await embedding_service.aembed_array(request.texts, request.embedding_model)
+        count, dim = vectors.shape if vectors.size else (0, 0)
+
+        response_data = {
+            "success": True,
+            "embedding_model": request.embedding_model,
+            "count": count,
+            "dim": dim,
+            "encoding_format": request.encoding_format
+        }
+        if request.encoding_format == "base64":
+            response_data["embeddings_base64"] = base64.b64encode(vectors.astype("<f4", copy=False).tobytes()).decode("ascii")
+        else:
+            response_data["embeddings"] = vectors.tolist()
+
+        response_data["processing_time"] = round(time.time() - start_time, 4)
+        return EmbedResponse(**response_data)
+
+    except Exception as e:
+        logger.error(f"文本嵌入失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"文本嵌入失败: {str(e)}")
+
+
 @app.post("/search", response_model=SearchResponse)
 async def search_vectors(request: SearchRequest):
     """
@@ -229,43 +452,36 @@ async def search_vectors(request: SearchRequest):
     logger.info(f"开始向量搜索: 集合={request.collection_name}, 查询={request.query[:50]}...")
 
     try:
-        # 获取向量存储实例
-        vector_store = get_vector_store(request.collection_name, request.embedding_model)
-
-        # 执行搜索
-        if request.with_score:
-            # 带分数的搜索
-            results_with_score = vector_store.similarity_search_with_score(
+        # 获取向量存储实例，集合不存在时返回空结果，不创建集合
+        vector_store = await get_vector_store(request.collection_name, request.embedding_model, create=False)
+
+        # 执行搜索：查询嵌入走异步接口，并发的单条查询可合并为一次前向计算
+        if vector_store is None:
+            results_with_score = []
+        elif request.search_mode == "hybrid":
+            results_with_score = await vector_store.ahybrid_search_with_score(
                 query=request.query,
                 k=request.k,
-                filter_expr=request.filter_expr
+                filter_expr=request.filter_expr,
+                user_id=request.user_id
             )
-
-            # 转换结果格式
-            search_results = [
-                SearchResult(
-                    content=doc.page_content,
-                    metadata=doc.metadata,
-                    score=score
-                )
-                for doc, score in results_with_score
-            ]
         else:
-            # 普通搜索
-            results = vector_store.similarity_search(
+            results_with_score = await vector_store.asimilarity_search_with_score(
                 query=request.query,
                 k=request.k,
-                filter_expr=request.filter_expr
+                filter_expr=request.filter_expr,
+                user_id=request.user_id
             )
 
-            # 转换结果格式
-            search_results = [
-                SearchResult(
-                    content=doc.page_content,
-                    metadata=doc.metadata
-                )
-                for doc in results
-            ]
+        # 转换结果格式
+        search_results = [
+            SearchResult(
+                content=doc.page_content,
+                metadata=doc.metadata,
+                score=score if request.with_score else None
+            )
+            for doc, score in results_with_score
+        ]
 
         processing_time = time.time() - start_time
 
@@ -273,7 +489,7 @@ async def search_vectors(request: SearchRequest):
 
         return SearchResponse(
             success=True,
-            message="搜索完成",
+            message="搜索完成" if vector_store is not None else f"集合 {request.collection_name} 不存在",
             collection_name=request.collection_name,
             query=request.query,
             results=search_results,
@@ -288,6 +504,74 @@ async def search_vectors(request: SearchRequest):
         raise HTTPException(status_code=500, detail=f"向量搜索失败: {str(e)}")
 
 
+@app.post("/search/batch", response_model=BatchSearchResponse)
+async def search_vectors_batch(request: BatchSearchRequest):
+    """
+    批量向量相似性搜索
+
+    N个查询只做一次批量嵌入和一次多向量Milvus搜索，适合Dify按关键词分组循环检索的场景。
+
+    Args:
+        request: 批量搜索请求
+
+    Returns:
+        BatchSearchResponse: 按查询顺序排列的搜索结果
+    """
+    start_time = time.time()
+
+    logger.info(f"开始批量向量搜索: 集合={request.collection_name}, 查询数={len(request.queries)}")
+
+    try:
+        # 获取向量存储实例，集合不存在时每个查询返回空结果，不创建集合
+        vector_store = await get_vector_store(request.collection_name, request.embedding_model, create=False)
+
+        if vector_store is None:
+            batch_results = [[] for _ in request.queries]
+        else:
+            batch_results = await vector_store.asimilarity_search_batch(
+                queries=request.queries,
+                k=request.k,
+                filter_expr=request.filter_expr,
+                user_id=request.user_id
+            )
+
+        # 转换结果格式
+        query_results = [
+            QueryResults(
+                query=query,
+                results=[
+                    SearchResult(
+                        content=doc.page_content,
+                        metadata=doc.metadata,
+                        score=score if request.with_score else None
+                    )
+                    for doc, score in hits
+                ],
+                total_results=len(hits)
+            )
+            for query, hits in zip(request.queries, batch_results)
+        ]
+
+        processing_time = time.time() - start_time
+
+        logger.info(f"批量向量搜索完成: 集合={request.collection_name}, 查询数={len(query_results)}, 耗时={processing_time:.2f}秒")
+
+        return BatchSearchResponse(
+            success=True,
+            message="批量搜索完成" if vector_store is not None else f"集合 {request.collection_name} 不存在",
+            collection_name=request.collection_name,
+            results=query_results,
+            total_queries=len(query_results),
+            processing_time=round(processing_time, 2)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"批量向量搜索失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"批量向量搜索失败: {str(e)}")
+
+
 @app.get("/collections/{collection_name}/stats", response_model=CollectionStatsResponse)
 async def get_collection_stats(collection_name: str, embedding_model: str = "zhipuai"):
     """
@@ -303,18 +587,26 @@ async def get_collection_stats(collection_name: str, embedding_model: str = "zhi
     logger.info(f"获取集合统计信息: {collection_name}")
 
     try:
-        # 获取向量存储实例
-        vector_store = get_vector_store(collection_name, embedding_model)
+        # 获取向量存储实例，集合不存在时不创建
+        vector_store = await get_vector_store(collection_name, embedding_model, create=False)
+        if vector_store is None:
+            return CollectionStatsResponse(
+                success=True,
+                collection_name=collection_name,
+                exists=False
+            )
 
-        # 获取统计信息
-        stats = vector_store.get_collection_stats()
+        # 获取统计信息，在线程中执行避免阻塞事件循环
+        stats = await asyncio.to_thread(vector_store.get_collection_stats)
 
         return CollectionStatsResponse(
             success=True,
             collection_name=collection_name,
             exists=stats.get("exists", False),
             row_count=stats.get("row_count"),
-            embedding_model=stats.get("embedding_model")
+            embedding_model=stats.get("embedding_model"),
+            search_cache=stats.get("search_cache"),
+            keyword_index=stats.get("keyword_index")
         )
 
     except Exception as e:
@@ -326,6 +618,46 @@ async def get_collection_stats(collection_name: str, embedding_model: str = "zhi
         )
 
 
+@app.post("/collections/{collection_name}/keyword-index/rebuild", response_model=KeywordIndexRebuildResponse)
+async def rebuild_keyword_index(collection_name: str, embedding_model: str = "zhipuai"):
+    """
+    从存储后端重建集合的关键词索引
+
+    关键词索引只包含经本机写入的数据，已有数据或其他实例写入的数据通过该接口补齐，
+    集合统计接口中的 keyword_index.coverage 可用于判断是否需要重建。
+
+    Args:
+        collection_name: 集合名称
+        embedding_model: 嵌入模型类型
+
+    Returns:
+        KeywordIndexRebuildResponse: 重建结果
+    """
+    start_time = time.time()
+
+    logger.info(f"重建关键词索引: {collection_name}")
+
+    vector_store = await get_vector_store(collection_name, embedding_model, create=False)
+    if vector_store is None:
+        raise HTTPException(status_code=404, detail=f"集合 {collection_name} 不存在")
+    if vector_store.keyword_index is None:
+        raise HTTPException(status_code=400, detail="关键词索引未启用")
+
+    try:
+        indexed_rows = await asyncio.to_thread(vector_store.rebuild_keyword_index)
+    except Exception as e:
+        logger.error(f"重建关键词索引失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"重建关键词索引失败: {str(e)}")
+
+    return KeywordIndexRebuildResponse(
+        success=True,
+        message="关键词索引重建完成",
+        collection_name=collection_name,
+        indexed_rows=indexed_rows,
+        processing_time=round(time.time() - start_time, 2)
+    )
+
+
 @app.delete("/collections/{collection_name}")
 async def delete_collection(collection_name: str, embedding_model: str = "zhipuai"):
     """
@@ -341,17 +673,17 @@ async def delete_collection(collection_name: str, embedding_model: str = "zhipua
     logger.info(f"删除集合: {collection_name}")
 
     try:
-        # 获取向量存储实例
-        vector_store = get_vector_store(collection_name, embedding_model)
+        # 获取向量存储实例，集合不存在时返回404，不创建
+        vector_store = await get_vector_store(collection_name, embedding_model, create=False)
+        if vector_store is None:
+            raise HTTPException(status_code=404, detail=f"集合 {collection_name} 不存在")
 
-        # 删除集合
-        success = vector_store.delete_collection()
+        # 删除集合及其关键词索引，在线程中执行避免阻塞事件循环
+        success = await asyncio.to_thread(vector_store.delete_collection)
 
         if success:
             # 从缓存中移除
-            store_key = f"{collection_name}_{embedding_model}"
-            if store_key in vector_stores:
-                del vector_stores[store_key]
+            connection_pool.remove_store(collection_name, embedding_model)
 
             return {"success": True, "message": f"集合 {collection_name} 已删除"}
         else:
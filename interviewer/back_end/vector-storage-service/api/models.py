@@ -2,7 +2,7 @@
 向量存储服务API模型定义
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Literal
 from pydantic import BaseModel, Field
 
 
@@ -33,8 +33,46 @@ class SearchRequest(BaseModel):
     collection_name: str = Field(..., description="集合名称")
     k: int = Field(default=5, description="返回结果数量", ge=1, le=100)
     embedding_model: str = Field(default="zhipuai", description="嵌入模型类型")
-    filter_expr: Optional[str] = Field(None, description="过滤表达式")
+    filter_expr: Optional[str] = Field(None, description="Milvus布尔过滤表达式，如 metadata[\"user_id\"] == \"u001\"")
     with_score: bool = Field(default=False, description="是否返回相似度分数")
+    user_id: Optional[str] = Field(None, description="用户ID，指定时只检索该用户所在的分区")
+    search_mode: Literal["dense", "hybrid"] = Field(
+        default="dense",
+        description="检索模式：dense为纯向量检索；hybrid为向量+BM25关键词检索并按RRF融合，适合技术名词类短查询"
+    )
+
+
+class EmbedRequest(BaseModel):
+    """嵌入请求模型"""
+    texts: List[str] = Field(..., description="要嵌入的文本列表")
+    embedding_model: str = Field(default="zhipuai", description="嵌入模型类型")
+    encoding_format: Literal["float", "base64"] = Field(
+        default="float",
+        description="向量编码格式：float为JSON数组；base64为小端float32矩阵的base64编码，适合服务间调用"
+    )
+
+
+class EmbedResponse(BaseModel):
+    """嵌入响应模型"""
+    success: bool = Field(..., description="是否成功")
+    embedding_model: str = Field(..., description="嵌入模型类型")
+    count: int = Field(..., description="向量数量")
+    dim: int = Field(..., description="向量维度")
+    encoding_format: str = Field(..., description="向量编码格式")
+    embeddings: Optional[List[List[float]]] = Field(None, description="向量列表(float格式)")
+    embeddings_base64: Optional[str] = Field(None, description="形状为(count, dim)的float32矩阵(base64格式)")
+    processing_time: float = Field(..., description="处理时间(秒)")
+
+
+class BatchSearchRequest(BaseModel):
+    """批量搜索请求模型"""
+    queries: List[str] = Field(..., description="查询文本列表", min_length=1, max_length=100)
+    collection_name: str = Field(..., description="集合名称")
+    k: int = Field(default=5, description="每个查询返回的结果数量", ge=1, le=100)
+    embedding_model: str = Field(default="zhipuai", description="嵌入模型类型")
+    filter_expr: Optional[str] = Field(None, description="Milvus布尔过滤表达式，对所有查询生效")
+    with_score: bool = Field(default=False, description="是否返回相似度分数")
+    user_id: Optional[str] = Field(None, description="用户ID，指定时只检索该用户所在的分区")
 
 
 class SearchResult(BaseModel):
@@ -44,13 +82,47 @@ class SearchResult(BaseModel):
     score: Optional[float] = Field(None, description="相似度分数")
 
 
+class BatchTiming(BaseModel):
+    """批次耗时模型"""
+    batch_index: int = Field(..., description="批次序号")
+    size: int = Field(..., description="批次写入数量")
+    skipped: int = Field(default=0, description="已存在而跳过的数量")
+    lookup_time: float = Field(default=0.0, description="存在性查询耗时(秒)")
+    embedding_time: float = Field(..., description="嵌入耗时(秒)")
+    insert_time: float = Field(..., description="写入耗时(秒)")
+
+
 class StoreResponse(BaseModel):
     """存储响应模型"""
     success: bool = Field(..., description="是否成功")
     message: str = Field(..., description="响应消息")
     collection_name: str = Field(..., description="集合名称")
     stored_count: int = Field(..., description="存储的文档数量")
+    existing_count: int = Field(default=0, description="已存在而跳过的文档数量")
+    processing_time: float = Field(..., description="处理时间(秒)")
+    batch_timings: List[BatchTiming] = Field(default_factory=list, description="各批次耗时")
+
+
+class StreamLineError(BaseModel):
+    """流式写入的行错误模型"""
+    line: int = Field(..., description="行号(从1开始)")
+    error: str = Field(..., description="错误信息")
+
+
+class StreamStoreResponse(BaseModel):
+    """流式存储响应模型"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(..., description="响应消息")
+    collection_name: str = Field(..., description="集合名称")
+    received_lines: int = Field(..., description="接收的非空行数")
+    stored_count: int = Field(..., description="存储的文档数量")
+    existing_count: int = Field(default=0, description="已存在而跳过的文档数量")
+    skipped_count: int = Field(..., description="因格式错误跳过的行数")
+    batch_count: int = Field(..., description="写入批次数")
+    embedding_time: float = Field(..., description="嵌入总耗时(秒)")
+    insert_time: float = Field(..., description="写入总耗时(秒)")
     processing_time: float = Field(..., description="处理时间(秒)")
+    errors: List[StreamLineError] = Field(default_factory=list, description="前若干条行错误")
 
 
 class SearchResponse(BaseModel):
@@ -64,6 +136,23 @@ class SearchResponse(BaseModel):
     processing_time: float = Field(..., description="处理时间(秒)")
 
 
+class QueryResults(BaseModel):
+    """单个查询的搜索结果模型"""
+    query: str = Field(..., description="查询文本")
+    results: List[SearchResult] = Field(..., description="搜索结果")
+    total_results: int = Field(..., description="结果总数")
+
+
+class BatchSearchResponse(BaseModel):
+    """批量搜索响应模型"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(..., description="响应消息")
+    collection_name: str = Field(..., description="集合名称")
+    results: List[QueryResults] = Field(..., description="按查询顺序排列的结果")
+    total_queries: int = Field(..., description="查询总数")
+    processing_time: float = Field(..., description="处理时间(秒)")
+
+
 class CollectionStatsResponse(BaseModel):
     """集合统计响应模型"""
     success: bool = Field(..., description="是否成功")
@@ -71,6 +160,17 @@ class CollectionStatsResponse(BaseModel):
     exists: bool = Field(..., description="集合是否存在")
     row_count: Optional[int] = Field(None, description="文档数量")
     embedding_model: Optional[str] = Field(None, description="嵌入模型类型")
+    search_cache: Optional[Dict[str, Any]] = Field(None, description="检索结果缓存命中统计")
+    keyword_index: Optional[Dict[str, Any]] = Field(None, description="关键词索引覆盖情况")
+
+
+class KeywordIndexRebuildResponse(BaseModel):
+    """关键词索引重建响应模型"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(..., description="响应消息")
+    collection_name: str = Field(..., description="集合名称")
+    indexed_rows: int = Field(..., description="写入索引的行数")
+    processing_time: float = Field(..., description="处理时间(秒)")
 
 
 class HealthResponse(BaseModel):
@@ -80,6 +180,9 @@ class HealthResponse(BaseModel):
     version: str = Field(..., description="服务版本")
     timestamp: str = Field(..., description="检查时间")
     milvus_connected: bool = Field(..., description="Milvus连接状态")
+    embedding_cache: Optional[Dict[str, Any]] = Field(None, description="嵌入缓存命中统计")
+    search_cache: Optional[Dict[str, Any]] = Field(None, description="检索结果缓存命中统计")
+    connection_pool: Optional[Dict[str, Any]] = Field(None, description="Milvus连接池统计")
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,143 @@
+"""
+按用户检索的分区裁剪基准测试脚本
+对比“无分区键 + 元数据过滤”与“user_id分区键”两种集合布局，
+在集合规模逐步增长到100万向量的过程中测量按用户检索的p50/p95延迟
+
+用法:
+    python benchmark_partition_search.py --max-rows 1000000 --checkpoints 10000 100000 1000000
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+from pymilvus import MilvusClient, DataType
+
+from database.milvus_client import (
+    ID_FIELD, VECTOR_FIELD, TEXT_FIELD, METADATA_FIELD, USER_ID_FIELD, USER_ID_MAX_LENGTH
+)
+
+
+def percentile(values, q: float) -> float:
+    """计算分位数（毫秒）"""
+    return float(np.percentile(np.asarray(values) * 1000, q))
+
+
+def create_collection(client: MilvusClient, name: str, dim: int, partitioned: bool, num_partitions: int):
+    """按服务中的字段定义创建测试集合"""
+    if client.has_collection(name):
+        client.drop_collection(name)
+
+    schema = client.create_schema(auto_id=True, enable_dynamic_field=False)
+    schema.add_field(field_name=ID_FIELD, datatype=DataType.INT64, is_primary=True)
+    schema.add_field(field_name=VECTOR_FIELD, datatype=DataType.FLOAT_VECTOR, dim=dim)
+    schema.add_field(field_name=TEXT_FIELD, datatype=DataType.VARCHAR, max_length=64)
+    schema.add_field(field_name=METADATA_FIELD, datatype=DataType.JSON)
+    if partitioned:
+        schema.add_field(
+            field_name=USER_ID_FIELD,
+            datatype=DataType.VARCHAR,
+            max_length=USER_ID_MAX_LENGTH,
+            is_partition_key=True
+        )
+
+    index_params = client.prepare_index_params()
+    index_params.add_index(
+        field_name=VECTOR_FIELD,
+        index_type="HNSW",
+        metric_type="COSINE",
+        params={"M": 16, "efConstruction": 200}
+    )
+
+    kwargs = {"num_partitions": num_partitions} if partitioned else {}
+    client.create_collection(collection_name=name, schema=schema, index_params=index_params, **kwargs)
+
+
+def insert_rows(client: MilvusClient, name: str, vectors: np.ndarray, user_ids, partitioned: bool):
+    """写入一批向量"""
+    rows = []
+    for vector, user_id in zip(vectors, user_ids):
+        row = {
+            VECTOR_FIELD: vector,
+            TEXT_FIELD: "benchmark",
+            METADATA_FIELD: {"user_id": user_id}
+        }
+        if partitioned:
+            row[USER_ID_FIELD] = user_id
+        rows.append(row)
+    client.insert(collection_name=name, data=rows)
+
+
+def measure(client: MilvusClient, name: str, queries: np.ndarray, user_ids, k: int, partitioned: bool):
+    """对每个查询执行按用户过滤的检索，返回延迟列表"""
+    field = USER_ID_FIELD if partitioned else f'{METADATA_FIELD}["user_id"]'
+    latencies = []
+    for vector, user_id in zip(queries, user_ids):
+        start = time.perf_counter()
+        client.search(
+            collection_name=name,
+            data=[vector],
+            limit=k,
+            filter=f'{field} == "{user_id}"',
+            search_params={"metric_type": "COSINE", "params": {"ef": max(64, k)}}
+        )
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分区裁剪基准测试")
+    parser.add_argument("--uri", default=os.getenv("MILVUS_URI", "http://localhost:19530"), help="Milvus地址")
+    parser.add_argument("--token", default=os.getenv("MILVUS_TOKEN", ""), help="Milvus访问令牌")
+    parser.add_argument("--dim", type=int, default=512, help="向量维度（bge-small-zh为512）")
+    parser.add_argument("--users", type=int, default=1000, help="用户数")
+    parser.add_argument("--num-partitions", type=int, default=64, help="分区键集合的分区数")
+    parser.add_argument("--max-rows", type=int, default=1000000, help="最终集合规模")
+    parser.add_argument("--checkpoints", type=int, nargs="+", default=[10000, 100000, 1000000], help="测量点")
+    parser.add_argument("--batch-size", type=int, default=5000, help="写入批大小")
+    parser.add_argument("--queries", type=int, default=200, help="每个测量点的查询数")
+    parser.add_argument("--k", type=int, default=5, help="返回结果数量")
+    parser.add_argument("--keep", action="store_true", help="测试结束后保留集合")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    client = MilvusClient(uri=args.uri, token=args.token)
+    layouts = {"metadata过滤": ("benchmark_flat_user", False), "分区键": ("benchmark_partition_user", True)}
+
+    for name, partitioned in layouts.values():
+        create_collection(client, name, args.dim, partitioned, args.num_partitions)
+
+    checkpoints = sorted(c for c in args.checkpoints if c <= args.max_rows)
+    user_names = [f"u{i:05d}" for i in range(args.users)]
+
+    print(f"{'规模':>10}  {'布局':<12}{'p50(ms)':>10}{'p95(ms)':>10}")
+    inserted = 0
+    try:
+        for checkpoint in checkpoints:
+            while inserted < checkpoint:
+                size = min(args.batch_size, checkpoint - inserted)
+                vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+                user_ids = [user_names[i] for i in rng.integers(0, args.users, size)]
+                for name, partitioned in layouts.values():
+                    insert_rows(client, name, vectors, user_ids, partitioned)
+                inserted += size
+
+            # 落盘封存segment，使搜索走索引而不是增长中的segment
+            for name, _ in layouts.values():
+                client.flush(collection_name=name)
+
+            queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+            query_users = [user_names[i] for i in rng.integers(0, args.users, args.queries)]
+            for label, (name, partitioned) in layouts.items():
+                measure(client, name, queries[:5], query_users[:5], args.k, partitioned)  # 预热
+                latencies = measure(client, name, queries, query_users, args.k, partitioned)
+                print(f"{checkpoint:>10}  {label:<12}{percentile(latencies, 50):>10.2f}{percentile(latencies, 95):>10.2f}")
+    finally:
+        if not args.keep:
+            for name, _ in layouts.values():
+                client.drop_collection(name)
+
+
+if __name__ == "__main__":
+    main()
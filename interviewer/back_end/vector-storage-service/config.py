@@ -19,27 +19,76 @@ CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*").split(",")
 CORS_METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
 CORS_HEADERS = ["*"]
 
+# ==================== 存储后端配置 ====================
+# 向量存储后端 (milvus 或 local；local 为单机内存映射+HNSW，无需部署Milvus)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "milvus").lower()
+
+# 本地后端配置 (数据目录、HNSW建图与搜索参数)
+LOCAL_VECTOR_STORE_DIR = os.getenv("LOCAL_VECTOR_STORE_DIR", "./data/vector_store")
+LOCAL_HNSW_M = int(os.getenv("LOCAL_HNSW_M", "16"))
+LOCAL_HNSW_EF_CONSTRUCTION = int(os.getenv("LOCAL_HNSW_EF_CONSTRUCTION", "200"))
+LOCAL_HNSW_EF_SEARCH = int(os.getenv("LOCAL_HNSW_EF_SEARCH", "64"))
+
 # ==================== Milvus配置 ====================
 # Milvus连接配置
 MILVUS_URI = os.getenv("MILVUS_URI", "http://localhost:19530")
 MILVUS_TOKEN = os.getenv("MILVUS_TOKEN", "")
 
+# 索引配置 (HNSW 或 IVF_FLAT)
+MILVUS_INDEX_TYPE = os.getenv("MILVUS_INDEX_TYPE", "HNSW").upper()
+MILVUS_METRIC_TYPE = os.getenv("MILVUS_METRIC_TYPE", "COSINE").upper()
+MILVUS_HNSW_M = int(os.getenv("MILVUS_HNSW_M", "16"))
+MILVUS_HNSW_EF_CONSTRUCTION = int(os.getenv("MILVUS_HNSW_EF_CONSTRUCTION", "200"))
+MILVUS_IVF_NLIST = int(os.getenv("MILVUS_IVF_NLIST", "128"))
+
+# 搜索参数 (HNSW使用ef，IVF_FLAT使用nprobe)
+MILVUS_SEARCH_EF = int(os.getenv("MILVUS_SEARCH_EF", "64"))
+MILVUS_SEARCH_NPROBE = int(os.getenv("MILVUS_SEARCH_NPROBE", "16"))
+
+# 分区键配置 (新建集合以 user_id 作为分区键，按用户检索时只扫描对应分区)
+MILVUS_PARTITION_KEY_ENABLED = os.getenv("MILVUS_PARTITION_KEY_ENABLED", "true").lower() == "true"
+MILVUS_NUM_PARTITIONS = int(os.getenv("MILVUS_NUM_PARTITIONS", "64"))
+
 # 默认集合配置
 DEFAULT_COLLECTION_NAME = os.getenv("DEFAULT_COLLECTION_NAME", "default_collection")
 
+# 连接池配置
+MILVUS_POOL_SIZE = int(os.getenv("MILVUS_POOL_SIZE", "2"))
+MILVUS_MAX_COLLECTION_HANDLES = int(os.getenv("MILVUS_MAX_COLLECTION_HANDLES", "32"))
+MILVUS_HANDLE_IDLE_SECONDS = int(os.getenv("MILVUS_HANDLE_IDLE_SECONDS", "1800"))
+# 启动时预加载的集合，格式: 集合名:嵌入模型,集合名:嵌入模型 (省略模型时使用默认嵌入模型)
+MILVUS_PRELOAD_COLLECTIONS = os.getenv("MILVUS_PRELOAD_COLLECTIONS", "")
+
 # ==================== 嵌入模型配置 ====================
 # 智谱AI配置
 ZHIPUAI_API_KEY = os.getenv("ZHIPUAI_API_KEY", "")
 ZHIPUAI_EMBEDDING_MODEL = os.getenv("ZHIPUAI_EMBEDDING_MODEL", "embedding-2")
+ZHIPUAI_EMBEDDING_BATCH_SIZE = int(os.getenv("ZHIPUAI_EMBEDDING_BATCH_SIZE", "64"))  # 单次请求输入条数，上限64
+ZHIPUAI_EMBEDDING_CONCURRENCY = int(os.getenv("ZHIPUAI_EMBEDDING_CONCURRENCY", "4"))
+ZHIPUAI_EMBEDDING_MAX_RETRIES = int(os.getenv("ZHIPUAI_EMBEDDING_MAX_RETRIES", "3"))
 
 # BGE嵌入模型配置
 BGE_MODEL_NAME = os.getenv("BGE_MODEL_NAME", "BAAI/bge-small-zh-v1.5")
 BGE_DEVICE = os.getenv("BGE_DEVICE", "cpu")
 BGE_NORMALIZE_EMBEDDINGS = os.getenv("BGE_NORMALIZE_EMBEDDINGS", "True").lower() == "true"
+# BGE推理线程池与微批合并配置
+BGE_INFERENCE_THREADS = int(os.getenv("BGE_INFERENCE_THREADS", "1"))
+BGE_MICRO_BATCH_WINDOW_MS = float(os.getenv("BGE_MICRO_BATCH_WINDOW_MS", "5"))
+BGE_MICRO_BATCH_MAX_SIZE = int(os.getenv("BGE_MICRO_BATCH_MAX_SIZE", "64"))
+# BGE推理后端 (torch, int8, onnx)，int8和onnx仅支持CPU
+BGE_BACKEND = os.getenv("BGE_BACKEND", "torch").lower()
+BGE_INTRA_OP_THREADS = int(os.getenv("BGE_INTRA_OP_THREADS", "0"))  # 0表示使用默认线程数
+BGE_ONNX_PATH = os.getenv("BGE_ONNX_PATH", "")  # 已导出的ONNX模型目录，为空时启动时导出
 
 # 默认嵌入模型
 DEFAULT_EMBEDDING_MODEL = os.getenv("DEFAULT_EMBEDDING_MODEL", "zhipuai")
 
+# 嵌入缓存配置 (内存LRU + SQLite磁盘)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_DB_PATH = os.getenv("EMBEDDING_CACHE_DB_PATH", "./cache/embeddings.db")
+EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "10000"))
+EMBEDDING_CACHE_MAX_DISK_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_DISK_ENTRIES", "200000"))
+
 # ==================== 日志配置 ====================
 # 日志级别
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -64,8 +113,27 @@ MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "10"))
 DEFAULT_SEARCH_K = int(os.getenv("DEFAULT_SEARCH_K", "5"))
 MAX_SEARCH_K = int(os.getenv("MAX_SEARCH_K", "100"))
 
+# 混合检索配置 (向量 + BM25关键词，RRF融合)
+# 关键词索引是本机SQLite文件，只包含经本机写入的数据；已有数据或其他实例写入的数据
+# 需调用 POST /collections/{name}/keyword-index/rebuild 重建，覆盖率见集合统计接口
+KEYWORD_INDEX_ENABLED = os.getenv("KEYWORD_INDEX_ENABLED", "true").lower() == "true"
+KEYWORD_INDEX_DB_PATH = os.getenv("KEYWORD_INDEX_DB_PATH", "./cache/keyword_index.db")
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+HYBRID_CANDIDATE_MULTIPLIER = int(os.getenv("HYBRID_CANDIDATE_MULTIPLIER", "4"))
+
+# 检索结果缓存 (TTL + LRU，写入或删除集合时按集合版本号失效；版本号保存在进程内，API_WORKERS 大于1时自动禁用)
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048"))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+
 # 批处理配置
 MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+MILVUS_INSERT_BATCH_SIZE = int(os.getenv("MILVUS_INSERT_BATCH_SIZE", "500"))
+
+# 流式写入配置 (POST /store/stream)
+STORE_STREAM_BATCH_SIZE = int(os.getenv("STORE_STREAM_BATCH_SIZE", "256"))
+STORE_STREAM_MAX_LINE_BYTES = int(os.getenv("STORE_STREAM_MAX_LINE_BYTES", "1048576"))
 
 # ==================== 配置验证 ====================
 def validate_config():
@@ -76,13 +144,52 @@ def validate_config():
     if not (1 <= API_PORT <= 65535):
         errors.append(f"Invalid API_PORT: {API_PORT}")
 
+    # 检查存储后端配置
+    if VECTOR_STORE_BACKEND not in ("milvus", "local"):
+        errors.append(f"Invalid VECTOR_STORE_BACKEND: {VECTOR_STORE_BACKEND}")
+    if LOCAL_HNSW_M <= 0 or LOCAL_HNSW_EF_CONSTRUCTION <= 0 or LOCAL_HNSW_EF_SEARCH <= 0:
+        errors.append("Invalid LOCAL_HNSW_* parameters")
+
     # 检查Milvus配置
     if not MILVUS_URI:
         errors.append("MILVUS_URI is required")
+    if MILVUS_INDEX_TYPE not in ("HNSW", "IVF_FLAT"):
+        errors.append(f"Invalid MILVUS_INDEX_TYPE: {MILVUS_INDEX_TYPE}")
+    if not (1 <= MILVUS_NUM_PARTITIONS <= 1024):
+        errors.append(f"Invalid MILVUS_NUM_PARTITIONS: {MILVUS_NUM_PARTITIONS}")
+
+    # 检查BGE后端配置
+    if BGE_BACKEND not in ("torch", "int8", "onnx"):
+        errors.append(f"Invalid BGE_BACKEND: {BGE_BACKEND}")
+
+    # 检查批处理配置
+    if EMBEDDING_BATCH_SIZE <= 0:
+        errors.append(f"Invalid EMBEDDING_BATCH_SIZE: {EMBEDDING_BATCH_SIZE}")
+    if MILVUS_INSERT_BATCH_SIZE <= 0:
+        errors.append(f"Invalid MILVUS_INSERT_BATCH_SIZE: {MILVUS_INSERT_BATCH_SIZE}")
+
+    if STORE_STREAM_BATCH_SIZE <= 0:
+        errors.append(f"Invalid STORE_STREAM_BATCH_SIZE: {STORE_STREAM_BATCH_SIZE}")
+
+    # 检查混合检索配置
+    if HYBRID_RRF_K <= 0:
+        errors.append(f"Invalid HYBRID_RRF_K: {HYBRID_RRF_K}")
+    if HYBRID_CANDIDATE_MULTIPLIER <= 0:
+        errors.append(f"Invalid HYBRID_CANDIDATE_MULTIPLIER: {HYBRID_CANDIDATE_MULTIPLIER}")
+
+    # 检查检索结果缓存配置
+    if SEARCH_CACHE_MAX_ENTRIES <= 0:
+        errors.append(f"Invalid SEARCH_CACHE_MAX_ENTRIES: {SEARCH_CACHE_MAX_ENTRIES}")
+    if SEARCH_CACHE_TTL_SECONDS <= 0:
+        errors.append(f"Invalid SEARCH_CACHE_TTL_SECONDS: {SEARCH_CACHE_TTL_SECONDS}")
 
     # 检查嵌入模型配置
     if DEFAULT_EMBEDDING_MODEL == "zhipuai" and not ZHIPUAI_API_KEY:
         errors.append("ZHIPUAI_API_KEY is required when using zhipuai as default embedding model")
+    if not (1 <= ZHIPUAI_EMBEDDING_BATCH_SIZE <= 64):
+        errors.append(f"Invalid ZHIPUAI_EMBEDDING_BATCH_SIZE: {ZHIPUAI_EMBEDDING_BATCH_SIZE}")
+    if ZHIPUAI_EMBEDDING_CONCURRENCY <= 0:
+        errors.append(f"Invalid ZHIPUAI_EMBEDDING_CONCURRENCY: {ZHIPUAI_EMBEDDING_CONCURRENCY}")
 
     if errors:
         raise ValueError(f"Configuration errors: {', '.join(errors)}")
@@ -96,20 +203,44 @@ def get_config_info() -> dict:
             "port": API_PORT,
             "workers": API_WORKERS
         },
+        "backend": {
+            "type": VECTOR_STORE_BACKEND,
+            "local_dir": LOCAL_VECTOR_STORE_DIR,
+            "local_hnsw_m": LOCAL_HNSW_M,
+            "local_hnsw_ef_search": LOCAL_HNSW_EF_SEARCH
+        },
         "milvus": {
             "uri": MILVUS_URI,
-            "default_collection": DEFAULT_COLLECTION_NAME
+            "default_collection": DEFAULT_COLLECTION_NAME,
+            "pool_size": MILVUS_POOL_SIZE,
+            "max_collection_handles": MILVUS_MAX_COLLECTION_HANDLES,
+            "index_type": MILVUS_INDEX_TYPE,
+            "metric_type": MILVUS_METRIC_TYPE,
+            "partition_key_enabled": MILVUS_PARTITION_KEY_ENABLED,
+            "num_partitions": MILVUS_NUM_PARTITIONS
         },
         "embedding": {
             "default_model": DEFAULT_EMBEDDING_MODEL,
             "zhipuai_model": ZHIPUAI_EMBEDDING_MODEL,
+            "zhipuai_batch_size": ZHIPUAI_EMBEDDING_BATCH_SIZE,
+            "zhipuai_concurrency": ZHIPUAI_EMBEDDING_CONCURRENCY,
             "bge_model": BGE_MODEL_NAME,
-            "bge_device": BGE_DEVICE
+            "bge_device": BGE_DEVICE,
+            "bge_backend": BGE_BACKEND,
+            "cache_enabled": EMBEDDING_CACHE_ENABLED,
+            "cache_db_path": EMBEDDING_CACHE_DB_PATH
         },
         "search": {
             "default_k": DEFAULT_SEARCH_K,
             "max_k": MAX_SEARCH_K,
-            "max_batch_size": MAX_BATCH_SIZE
+            "keyword_index_enabled": KEYWORD_INDEX_ENABLED,
+            "result_cache_enabled": SEARCH_CACHE_ENABLED and API_WORKERS == 1,
+            "result_cache_max_entries": SEARCH_CACHE_MAX_ENTRIES,
+            "result_cache_ttl": SEARCH_CACHE_TTL_SECONDS,
+            "max_batch_size": MAX_BATCH_SIZE,
+            "store_stream_batch_size": STORE_STREAM_BATCH_SIZE,
+            "embedding_batch_size": EMBEDDING_BATCH_SIZE,
+            "insert_batch_size": MILVUS_INSERT_BATCH_SIZE
         },
         "security": {
             "auth_enabled": ENABLE_AUTH,
@@ -2,6 +2,16 @@
 数据库模块
 """
 
+from .backend import VectorBackend, create_backend
+from .milvus_backend import MilvusBackend
+from .local_backend import LocalHNSWBackend
 from .milvus_client import MilvusVectorStore
+from .connection_pool import MilvusConnectionPool
+from .keyword_index import KeywordIndex
+from .result_cache import SearchResultCache, get_result_cache
 
-__all__ = ['MilvusVectorStore']
\ No newline at end of file
+__all__ = [
+    'VectorBackend', 'create_backend', 'MilvusBackend', 'LocalHNSWBackend',
+    'MilvusVectorStore', 'MilvusConnectionPool', 'KeywordIndex',
+    'SearchResultCache', 'get_result_cache'
+]
@@ -0,0 +1,129 @@
+"""
+向量存储后端接口 - 独立服务版本
+MilvusVectorStore 负责嵌入、去重、混合检索等上层逻辑，底层读写通过后端接口完成
+"""
+
+import os
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Dict, Any, Union
+
+import numpy as np
+
+# 集合字段定义
+ID_FIELD = "id"
+VECTOR_FIELD = "vector"
+TEXT_FIELD = "text"
+METADATA_FIELD = "metadata"
+
+# Milvus VARCHAR字段的最大字节长度
+TEXT_MAX_LENGTH = 65535
+
+# 确定性主键的最大长度
+ID_MAX_LENGTH = 128
+
+# 分区键字段：按用户划分分区，检索时按用户裁剪
+USER_ID_FIELD = "user_id"
+USER_ID_MAX_LENGTH = 64
+
+# 支持的后端类型
+VECTOR_STORE_BACKENDS = ("milvus", "local")
+
+
+class VectorBackend(ABC):
+    """
+    向量存储后端接口
+
+    行数据使用 ID_FIELD / VECTOR_FIELD / TEXT_FIELD / METADATA_FIELD / USER_ID_FIELD 作为键；
+    检索结果与 MilvusClient.search 的返回格式一致：{"id", "distance", "entity": {text, metadata}}，
+    distance 越大越相似。过滤表达式使用Milvus布尔表达式语法。
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def ping(self) -> bool:
+        """检测后端是否可用"""
+
+    @abstractmethod
+    def has_collection(self, collection_name: str) -> bool:
+        """集合是否存在"""
+
+    @abstractmethod
+    def create_collection(self, collection_name: str, dim: int):
+        """创建集合及向量索引"""
+
+    @abstractmethod
+    def describe_collection(self, collection_name: str) -> Dict[str, bool]:
+        """
+        读取集合结构
+
+        Returns:
+            Dict[str, bool]: string_ids 表示主键是否为确定性字符串，user_field 表示是否有 user_id 字段
+        """
+
+    @abstractmethod
+    def existing_ids(self, collection_name: str, ids: List[str]) -> set:
+        """返回ids中已存在的主键"""
+
+    @abstractmethod
+    def write(self, collection_name: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        """
+        写入行数据，行内带主键时按主键覆盖写入
+
+        Returns:
+            List[Any]: 与rows对应的主键
+        """
+
+    @abstractmethod
+    def search(self,
+               collection_name: str,
+               vectors: Union[np.ndarray, List[List[float]]],
+               k: int,
+               filter_expr: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """多向量top-k检索"""
+
+    @abstractmethod
+    def get(self,
+            collection_name: str,
+            ids: List[Any],
+            filter_expr: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按主键读取行（主键、文本、元数据），同时应用过滤条件"""
+
+    @abstractmethod
+    def iter_rows(self, collection_name: str, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """分批遍历集合全部行（主键、文本、元数据），用于重建关键词索引"""
+
+    @abstractmethod
+    def count(self, collection_name: str) -> int:
+        """集合行数"""
+
+    @abstractmethod
+    def drop_collection(self, collection_name: str):
+        """删除集合"""
+
+    def close(self):
+        """释放后端资源"""
+
+
+def create_backend(backend_type: Optional[str] = None, client=None) -> VectorBackend:
+    """
+    按配置创建向量存储后端
+
+    Args:
+        backend_type: 后端类型，'milvus' 或 'local'，为空时读取 VECTOR_STORE_BACKEND
+        client: 已建立的MilvusClient，仅milvus后端使用
+
+    Returns:
+        VectorBackend: 后端实例
+    """
+    backend_type = (backend_type or os.getenv('VECTOR_STORE_BACKEND', 'milvus')).lower()
+
+    if backend_type == "milvus":
+        from .milvus_backend import MilvusBackend
+        return MilvusBackend(client=client)
+
+    if backend_type == "local":
+        from .local_backend import LocalHNSWBackend
+        return LocalHNSWBackend(os.getenv('LOCAL_VECTOR_STORE_DIR', './data/vector_store'))
+
+    raise ValueError(f"不支持的向量存储后端: {backend_type}，可选 {', '.join(VECTOR_STORE_BACKENDS)}")
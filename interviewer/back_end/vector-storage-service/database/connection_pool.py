@@ -0,0 +1,234 @@
+"""
+Milvus连接池 - 独立服务版本
+共享少量存储后端连接（MilvusClient或本地HNSW后端），并以LRU方式管理各集合的向量存储实例
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+
+from pymilvus import MilvusClient
+
+from .backend import VectorBackend, create_backend
+from .milvus_client import MilvusVectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class MilvusConnectionPool:
+    """
+    Milvus连接池
+
+    - 固定数量的后端连接，按轮询方式分配给集合实例共享使用；本地后端只需一个实例
+    - 集合实例按最近使用顺序缓存，超过数量上限或空闲超时即淘汰（不关闭共享连接）
+    """
+
+    def __init__(self,
+                 uri: Optional[str] = None,
+                 token: Optional[str] = None,
+                 pool_size: int = 2,
+                 max_stores: int = 32,
+                 idle_timeout: float = 1800,
+                 backend_type: Optional[str] = None):
+        """
+        初始化连接池
+
+        Args:
+            uri: Milvus服务地址
+            token: Milvus访问令牌
+            pool_size: 共享连接数量
+            max_stores: 缓存的集合实例上限
+            idle_timeout: 集合实例空闲淘汰时间(秒)
+            backend_type: 存储后端类型，'milvus' 或 'local'，为空时读取 VECTOR_STORE_BACKEND
+        """
+        self.uri = uri or os.getenv('MILVUS_URI', 'http://43.142.157.145:19530')
+        self.token = token if token is not None else os.getenv('MILVUS_TOKEN', '')
+        self.backend_type = (backend_type or os.getenv('VECTOR_STORE_BACKEND', 'milvus')).lower()
+        # 本地后端的文件只能由一个实例读写
+        self.pool_size = 1 if self.backend_type == "local" else max(1, pool_size)
+        self.max_stores = max(1, max_stores)
+        self.idle_timeout = idle_timeout
+
+        self._backends: List[VectorBackend] = []
+        self._next_backend = 0
+        self._stores: "OrderedDict[str, Tuple[MilvusVectorStore, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        # 集合实例创建锁：同一集合只创建一次，不同集合的创建互不阻塞
+        self._store_locks: Dict[str, threading.Lock] = {}
+        self.evictions = 0
+
+    def connect(self) -> bool:
+        """
+        预先建立全部共享连接
+
+        Returns:
+            bool: 连接是否成功
+        """
+        try:
+            with self._lock:
+                while len(self._backends) < self.pool_size:
+                    if self.backend_type == "milvus":
+                        backend = create_backend("milvus", client=MilvusClient(uri=self.uri, token=self.token))
+                    else:
+                        backend = create_backend(self.backend_type)
+                    backend.ping()
+                    self._backends.append(backend)
+            target = self.uri if self.backend_type == "milvus" else self.backend_type
+            logger.info(f"连接池就绪 - 后端: {target}, 连接数: {len(self._backends)}")
+            return True
+        except Exception as e:
+            logger.error(f"连接池建立失败: {str(e)}")
+            return False
+
+    def get_backend(self) -> VectorBackend:
+        """
+        轮询获取一个共享后端连接，连接池为空时先建立连接
+
+        Raises:
+            ConnectionError: 无法连接到存储后端
+        """
+        with self._lock:
+            if not self._backends and not self.connect():
+                raise ConnectionError("无法连接到向量数据库")
+            backend = self._backends[self._next_backend % len(self._backends)]
+            self._next_backend += 1
+            return backend
+
+    def ping(self) -> bool:
+        """使用已有连接检测存储后端可用性，不新建连接"""
+        try:
+            return self.get_backend().ping()
+        except Exception as e:
+            logger.warning(f"存储后端连接检测失败: {str(e)}")
+            return False
+
+    @staticmethod
+    def _store_key(collection_name: str, embedding_model: str) -> str:
+        return f"{collection_name}_{embedding_model}"
+
+    def _evict(self):
+        """淘汰空闲超时和超出上限的集合实例，调用方需持有锁"""
+        now = time.time()
+        for key in [key for key, (_, last_used) in self._stores.items() if now - last_used > self.idle_timeout]:
+            del self._stores[key]
+            self.evictions += 1
+            logger.info(f"淘汰空闲集合实例: {key}")
+
+        while len(self._stores) > self.max_stores:
+            key, _ = self._stores.popitem(last=False)
+            self.evictions += 1
+            logger.info(f"淘汰最久未使用的集合实例: {key}")
+
+    def _cached_store(self, store_key: str) -> Optional[MilvusVectorStore]:
+        """读取已缓存的集合实例并刷新使用时间，调用方需持有锁"""
+        if store_key not in self._stores:
+            return None
+        store, _ = self._stores[store_key]
+        self._stores[store_key] = (store, time.time())
+        self._stores.move_to_end(store_key)
+        return store
+
+    def get_store(self,
+                  collection_name: str,
+                  embedding_model: str,
+                  create: bool = True) -> Optional[MilvusVectorStore]:
+        """
+        获取或创建集合的向量存储实例
+
+        创建实例需要探测向量维度和创建集合，只持有该集合的创建锁进行，
+        不阻塞其他集合的读取和创建
+
+        Args:
+            collection_name: 集合名称
+            embedding_model: 嵌入模型类型
+            create: 集合不存在时是否创建；检索、统计和删除等只读路径传False
+
+        Returns:
+            Optional[MilvusVectorStore]: 使用共享连接的向量存储实例，create为False且集合不存在时返回None
+
+        Raises:
+            ConnectionError: 无法连接到存储后端
+            RuntimeError: 无法创建或访问集合
+        """
+        store_key = self._store_key(collection_name, embedding_model)
+
+        with self._lock:
+            store = self._cached_store(store_key)
+            if store is not None:
+                return store
+            store_lock = self._store_locks.setdefault(store_key, threading.Lock())
+
+        with store_lock:
+            # 等待期间其他线程可能已创建完成
+            with self._lock:
+                store = self._cached_store(store_key)
+                if store is not None:
+                    return store
+
+            logger.info(f"创建新的向量存储实例: {store_key}")
+            store = MilvusVectorStore(
+                collection_name=collection_name,
+                embedding_model_type=embedding_model
+            )
+
+            if not store.create_connection(client=self.get_backend()):
+                raise ConnectionError("无法连接到向量数据库")
+
+            if not create:
+                if not store.load_collection():
+                    return None
+            elif not store.create_collection_if_not_exists():
+                raise RuntimeError("无法创建或访问集合")
+
+            with self._lock:
+                self._stores[store_key] = (store, time.time())
+                # 实例已缓存，之后的访问走缓存路径，创建锁不再需要
+                self._store_locks.pop(store_key, None)
+                self._evict()
+            return store
+
+    def remove_store(self, collection_name: str, embedding_model: str):
+        """移除集合实例缓存"""
+        with self._lock:
+            self._stores.pop(self._store_key(collection_name, embedding_model), None)
+
+    def preload(self, collections: List[Tuple[str, str]]):
+        """
+        预加载集合实例
+
+        Args:
+            collections: (集合名称, 嵌入模型类型) 列表
+        """
+        for collection_name, embedding_model in collections:
+            try:
+                self.get_store(collection_name, embedding_model)
+                logger.info(f"预加载集合完成: {collection_name} ({embedding_model})")
+            except Exception as e:
+                logger.warning(f"预加载集合失败: {collection_name} ({embedding_model}), 错误: {str(e)}")
+
+    def close(self):
+        """关闭全部共享连接"""
+        with self._lock:
+            self._stores.clear()
+            for backend in self._backends:
+                try:
+                    backend.close()
+                except Exception as e:
+                    logger.warning(f"关闭存储后端连接失败: {str(e)}")
+            self._backends.clear()
+        logger.info("连接池已关闭")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        with self._lock:
+            return {
+                "backend": self.backend_type,
+                "connections": len(self._backends),
+                "pool_size": self.pool_size,
+                "cached_stores": len(self._stores),
+                "max_stores": self.max_stores,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,195 @@
+"""
+关键词倒排索引 - 独立服务版本
+基于SQLite FTS5的BM25检索，配合向量检索实现混合搜索
+"""
+
+import os
+import re
+import sqlite3
+import logging
+import threading
+from typing import List, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# 英文/数字词（保留c++、c#、node.js这类技术词）或连续的中文字符
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#._-]*|[一-鿿]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    中英文混合分词
+
+    英文和数字按词切分并转小写；中文按字符二元组切分（单字保留原字），
+    无需额外的分词词典，对"线程池"、"muduo网络库"这类技术词召回稳定。
+
+    Args:
+        text: 待分词文本
+
+    Returns:
+        List[str]: 词项列表
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        part = match.group()
+        if "一" <= part[0] <= "鿿":
+            if len(part) == 1:
+                tokens.append(part)
+            else:
+                tokens.extend(part[i:i + 2] for i in range(len(part) - 1))
+        else:
+            part = part.rstrip("._-")
+            if part:
+                tokens.append(part)
+    return tokens
+
+
+class KeywordIndex:
+    """
+    关键词倒排索引
+
+    每个集合对应一张FTS5虚拟表，存储分词后的文本、Milvus主键和用户ID，
+    检索时由SQLite计算BM25分数。索引文件位于本地磁盘，只有同一主机上的worker进程共享，
+    且只包含经本机写入的数据：启用索引之前已有的数据、其他实例写入的数据需要调用
+    MilvusVectorStore.rebuild_keyword_index 重建，否则混合检索对这些数据只有向量一路。
+    """
+
+    def __init__(self, db_path: str = "./cache/keyword_index.db"):
+        """
+        初始化关键词索引
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._tables = set()
+
+        logger.info(f"关键词索引初始化完成 - 路径: {db_path}")
+
+    @staticmethod
+    def _table_name(collection_name: str) -> str:
+        """集合名转换为表名（Milvus集合名只含字母、数字和下划线）"""
+        return "kw_" + re.sub(r"[^0-9A-Za-z_]", "_", collection_name)
+
+    def _ensure_table(self, collection_name: str) -> str:
+        """确保集合对应的FTS5表存在，调用方需持有锁"""
+        table = self._table_name(collection_name)
+        if table not in self._tables:
+            self._conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+                f"tokens, doc_id UNINDEXED, user_id UNINDEXED, tokenize = \"unicode61 tokenchars '+#._-'\")"
+            )
+            self._tables.add(table)
+        return table
+
+    def add(self, collection_name: str, ids: List[Any], texts: List[str], user_ids: Optional[List[str]] = None):
+        """
+        添加文档到索引，已存在的主键先删除旧条目，与向量库按主键覆盖写入保持一致
+
+        Args:
+            collection_name: 集合名称
+            ids: Milvus主键列表
+            texts: 与ids对应的原文
+            user_ids: 与ids对应的用户ID
+        """
+        if not ids:
+            return
+
+        user_ids = user_ids or [""] * len(ids)
+        # 同一批次内重复的主键只保留最后一条
+        latest = {doc_id: (text, user_id) for doc_id, text, user_id in zip(ids, texts, user_ids)}
+        rows = [(" ".join(tokenize(text)), doc_id, user_id) for doc_id, (text, user_id) in latest.items()]
+        doc_ids = list(latest)
+        with self._lock:
+            table = self._ensure_table(collection_name)
+            # 删除与插入在同一事务中提交，检索不会看到缺失或重复的条目
+            for start in range(0, len(doc_ids), 500):
+                part = doc_ids[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                self._conn.execute(f"DELETE FROM {table} WHERE doc_id IN ({placeholders})", part)
+            self._conn.executemany(f"INSERT INTO {table} (tokens, doc_id, user_id) VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def search(self,
+               collection_name: str,
+               query: str,
+               limit: int,
+               user_id: Optional[str] = None) -> List[Tuple[Any, float]]:
+        """
+        BM25检索
+
+        Args:
+            collection_name: 集合名称
+            query: 查询文本
+            limit: 返回数量
+            user_id: 用户ID，指定时只返回该用户的文档
+
+        Returns:
+            List[Tuple[Any, float]]: (Milvus主键, BM25分数) 列表，分数越大越相关
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        match_expr = " OR ".join(f'"{term}"' for term in terms)
+        user_clause = "AND user_id = ? " if user_id is not None else ""
+        params = (match_expr, user_id, limit) if user_id is not None else (match_expr, limit)
+        with self._lock:
+            table = self._ensure_table(collection_name)
+            rows = self._conn.execute(
+                f"SELECT doc_id, bm25({table}) FROM {table} WHERE {table} MATCH ? {user_clause}"
+                f"ORDER BY bm25({table}) LIMIT ?",
+                params
+            ).fetchall()
+
+        # SQLite的bm25()返回负数，越小越相关
+        return [(doc_id, -score) for doc_id, score in rows]
+
+    def delete(self, collection_name: str, ids: Optional[List[Any]] = None):
+        """
+        删除索引数据
+
+        Args:
+            collection_name: 集合名称
+            ids: 要删除的主键列表，为空时删除整个集合的索引
+        """
+        with self._lock:
+            table = self._table_name(collection_name)
+            if ids is None:
+                self._conn.execute(f"DROP TABLE IF EXISTS {table}")
+                self._tables.discard(table)
+            else:
+                table = self._ensure_table(collection_name)
+                self._conn.executemany(f"DELETE FROM {table} WHERE doc_id = ?", [(doc_id,) for doc_id in ids])
+            self._conn.commit()
+
+    def count(self, collection_name: str) -> int:
+        """获取集合索引的文档数"""
+        with self._lock:
+            table = self._ensure_table(collection_name)
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+_keyword_index: Optional[KeywordIndex] = None
+_keyword_index_lock = threading.Lock()
+
+
+def get_keyword_index() -> Optional[KeywordIndex]:
+    """获取全局关键词索引，未启用时返回None"""
+    global _keyword_index
+
+    if os.getenv('KEYWORD_INDEX_ENABLED', 'true').lower() != 'true':
+        return None
+
+    with _keyword_index_lock:
+        if _keyword_index is None:
+            _keyword_index = KeywordIndex(os.getenv('KEYWORD_INDEX_DB_PATH', './cache/keyword_index.db'))
+    return _keyword_index
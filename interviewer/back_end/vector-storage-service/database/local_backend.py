@@ -0,0 +1,558 @@
+"""
+本地向量存储后端 - 独立服务版本
+进程内HNSW检索，向量保存在内存映射文件中，适合小规模部署、离线环境和测试
+"""
+
+import os
+import re
+import json
+import uuid
+import shutil
+import sqlite3
+import logging
+import threading
+from typing import Iterator, List, Optional, Dict, Any, Union, Callable
+
+import numpy as np
+
+from .backend import VectorBackend, ID_FIELD, VECTOR_FIELD, TEXT_FIELD, METADATA_FIELD, USER_ID_FIELD
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+# 过滤后候选数不超过该值时直接精确计算，避免HNSW在强过滤下召回不足
+EXACT_SEARCH_THRESHOLD = 2048
+
+# 累计多少条未落盘的写入后保存一次HNSW图
+INDEX_SAVE_EVERY = 10000
+
+# 单个比较子句: 字段 运算符 取值
+_CLAUSE_PATTERN = re.compile(
+    r'^\s*(id|user_id|metadata\[\s*"([^"]+)"\s*\])\s*(==|!=|>=|<=|>|<|not\s+in|in)\s*(.+?)\s*$',
+    re.S | re.I
+)
+
+
+def _strip_parens(expr: str) -> str:
+    """去掉包裹整个表达式的括号"""
+    expr = expr.strip()
+    while expr.startswith("(") and expr.endswith(")"):
+        depth = 0
+        for i, ch in enumerate(expr):
+            depth += ch == "("
+            depth -= ch == ")"
+            if depth == 0 and i < len(expr) - 1:
+                return expr
+        expr = expr[1:-1].strip()
+    return expr
+
+
+def _split_and(expr: str) -> List[str]:
+    """按顶层的 and 切分表达式，忽略括号和字符串内的内容"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    i = 0
+    lowered = expr.lower()
+    while i < len(expr):
+        ch = expr[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif depth == 0:
+            if lowered.startswith(" and ", i):
+                parts.append(expr[start:i])
+                start = i + 5
+                i += 4
+            elif lowered.startswith(" or ", i) or expr.startswith("||", i):
+                raise ValueError(f"本地后端不支持 or 过滤表达式: {expr}")
+        i += 1
+    parts.append(expr[start:])
+    return parts
+
+
+def _parse_literal(value: str) -> Any:
+    """解析字面量，支持JSON取值和单引号字符串"""
+    try:
+        return json.loads(value)
+    except ValueError:
+        if value.startswith("'") and value.endswith("'"):
+            return value[1:-1]
+        try:
+            return json.loads(value.replace("'", '"'))
+        except ValueError:
+            raise ValueError(f"无法解析过滤取值: {value}")
+
+
+def compile_filter(expr: Optional[str]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """
+    将Milvus布尔表达式的常用子集编译为Python判断函数
+
+    支持 id / user_id / metadata["key"] 与 ==、!=、>、>=、<、<=、in、not in 的比较，
+    多个子句用 and 连接，可加括号。
+
+    Args:
+        expr: 过滤表达式
+
+    Returns:
+        Optional[Callable]: 入参为 {id, user_id, metadata} 的判断函数，表达式为空时返回None
+
+    Raises:
+        ValueError: 表达式不在支持范围内
+    """
+    if not expr or not expr.strip():
+        return None
+
+    expr = _strip_parens(expr)
+    parts = _split_and(expr)
+    if len(parts) > 1:
+        clauses = [compile_filter(part) for part in parts]
+        return lambda row: all(clause(row) for clause in clauses)
+
+    match = _CLAUSE_PATTERN.match(expr)
+    if not match:
+        raise ValueError(f"本地后端不支持的过滤表达式: {expr}")
+
+    field, meta_key, op, raw_value = match.groups()
+    op = " ".join(op.lower().split())
+    return _make_clause(None if meta_key else field.lower(), meta_key, op, _parse_literal(raw_value))
+
+
+def _make_clause(field: Optional[str], meta_key: Optional[str], op: str, value: Any) -> Callable[[Dict[str, Any]], bool]:
+    """构造单个比较子句"""
+    def get(row):
+        if meta_key is not None:
+            return (row.get(METADATA_FIELD) or {}).get(meta_key)
+        return row.get(field)
+
+    def clause(row):
+        actual = get(row)
+        try:
+            if op == "==":
+                return actual == value
+            if op == "!=":
+                return actual != value
+            if op == "in":
+                return actual in value
+            if op == "not in":
+                return actual not in value
+            if actual is None:
+                return False
+            if op == ">":
+                return actual > value
+            if op == ">=":
+                return actual >= value
+            if op == "<":
+                return actual < value
+            return actual <= value
+        except TypeError:
+            return False
+
+    return clause
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2归一化，归一化后内积即余弦相似度"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+class _LocalCollection:
+    """
+    单个本地集合
+
+    - vectors.f32: 按行号存放的float32向量，np.memmap内存映射，容量不足时翻倍扩展
+    - meta.db: SQLite，保存主键、用户ID、原文和元数据；行号即HNSW标签
+    - hnsw.bin: hnswlib图索引，启动时加载；未保存部分由向量文件补建
+    """
+
+    def __init__(self, path: str, dim: Optional[int], m: int, ef_construction: int, ef_search: int):
+        self.path = path
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.lock = threading.RLock()
+
+        os.makedirs(path, exist_ok=True)
+        self.vector_path = os.path.join(path, "vectors.f32")
+        self.index_path = os.path.join(path, "hnsw.bin")
+
+        self.conn = sqlite3.connect(os.path.join(path, "meta.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rows (
+                label INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                user_id TEXT,
+                text TEXT,
+                metadata TEXT
+            )
+            """
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)")
+
+        stored_dim = self.conn.execute("SELECT value FROM info WHERE key = 'dim'").fetchone()
+        if stored_dim:
+            dim = int(stored_dim[0])
+        elif dim:
+            self.conn.execute("INSERT INTO info (key, value) VALUES ('dim', ?)", (str(dim),))
+        else:
+            raise ValueError(f"本地集合不存在: {path}")
+        self.conn.commit()
+        self.dim = dim
+
+        # 内存中保留过滤所需的字段（不含原文），原文检索命中后再从SQLite读取
+        self.rows: Dict[int, Dict[str, Any]] = {}
+        for label, row_id, user_id, metadata in self.conn.execute("SELECT label, id, user_id, metadata FROM rows"):
+            self.rows[label] = {ID_FIELD: row_id, USER_ID_FIELD: user_id, METADATA_FIELD: json.loads(metadata or "{}")}
+
+        max_label = self.conn.execute("SELECT MAX(label) FROM rows").fetchone()[0]
+        stored_size = self.conn.execute("SELECT value FROM info WHERE key = 'size'").fetchone()
+        self.size = max(int(stored_size[0]) if stored_size else 0, (max_label + 1) if max_label is not None else 0)
+
+        self.capacity = 0
+        self.vectors = None
+        if os.path.exists(self.vector_path):
+            self.capacity = os.path.getsize(self.vector_path) // (4 * dim)
+            if self.capacity:
+                self.vectors = np.memmap(self.vector_path, dtype=np.float32, mode="r+", shape=(self.capacity, dim))
+        self._ensure_capacity(max(self.size, 1024))
+
+        self.index = None
+        self.unsaved = 0
+        if hnswlib is not None:
+            self._load_index()
+
+    def _ensure_capacity(self, needed: int):
+        """扩展向量文件和HNSW容量"""
+        if needed <= self.capacity:
+            return
+
+        new_capacity = max(needed, self.capacity * 2)
+        if self.vectors is not None:
+            self.vectors.flush()
+            del self.vectors
+        with open(self.vector_path, "ab"):
+            pass
+        os.truncate(self.vector_path, new_capacity * self.dim * 4)
+        self.vectors = np.memmap(self.vector_path, dtype=np.float32, mode="r+", shape=(new_capacity, self.dim))
+        self.capacity = new_capacity
+
+        if getattr(self, "index", None) is not None:
+            self.index.resize_index(new_capacity)
+
+    def _load_index(self):
+        """加载HNSW图，补建上次未保存的向量并恢复删除标记"""
+        self.index = hnswlib.Index(space="ip", dim=self.dim)
+        if os.path.exists(self.index_path):
+            self.index.load_index(self.index_path, max_elements=self.capacity)
+        else:
+            self.index.init_index(max_elements=self.capacity, ef_construction=self.ef_construction, M=self.m)
+        self.index.set_ef(self.ef_search)
+
+        indexed = self.index.get_current_count()
+        if indexed < self.size:
+            labels = np.arange(indexed, self.size)
+            self.index.add_items(np.asarray(self.vectors[indexed:self.size]), labels)
+            self.unsaved += len(labels)
+            logger.info(f"本地集合 {self.path} 补建HNSW索引 {len(labels)} 条")
+
+        for label in range(self.size):
+            if label not in self.rows:
+                try:
+                    self.index.mark_deleted(label)
+                except RuntimeError:
+                    pass  # 已经标记过
+
+    def save(self):
+        """向量和HNSW图落盘"""
+        with self.lock:
+            if self.vectors is not None:
+                self.vectors.flush()
+            if self.index is not None and self.unsaved:
+                self.index.save_index(self.index_path)
+                self.unsaved = 0
+
+    def write(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        """按主键覆盖写入"""
+        # 同一批内重复主键以最后一条为准
+        latest: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            latest[row.get(ID_FIELD) or uuid.uuid4().hex] = row
+        ids = list(latest)
+        vectors = _normalize(np.asarray([row[VECTOR_FIELD] for row in latest.values()], dtype=np.float32))
+
+        with self.lock:
+            placeholders = ",".join("?" * len(ids))
+            for (label,) in self.conn.execute(f"SELECT label FROM rows WHERE id IN ({placeholders})", ids).fetchall():
+                self.rows.pop(label, None)
+                if self.index is not None:
+                    self.index.mark_deleted(label)
+            self.conn.execute(f"DELETE FROM rows WHERE id IN ({placeholders})", ids)
+
+            start = self.size
+            labels = np.arange(start, start + len(ids))
+            self._ensure_capacity(start + len(ids))
+            self.vectors[start:start + len(ids)] = vectors
+
+            records = []
+            for label, row_id, row in zip(labels.tolist(), ids, latest.values()):
+                metadata = row.get(METADATA_FIELD) or {}
+                user_id = row.get(USER_ID_FIELD, "")
+                records.append((label, row_id, user_id, row.get(TEXT_FIELD, ""), json.dumps(metadata, ensure_ascii=False)))
+                self.rows[label] = {ID_FIELD: row_id, USER_ID_FIELD: user_id, METADATA_FIELD: metadata}
+            self.conn.executemany("INSERT INTO rows (label, id, user_id, text, metadata) VALUES (?, ?, ?, ?, ?)", records)
+
+            self.size = start + len(ids)
+            self.conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('size', ?)", (str(self.size),))
+            self.conn.commit()
+            self.vectors.flush()
+
+            if self.index is not None:
+                self.index.add_items(vectors, labels)
+                self.unsaved += len(ids)
+                if self.unsaved >= INDEX_SAVE_EVERY:
+                    self.save()
+
+        return ids
+
+    def _candidates(self, predicate) -> Optional[np.ndarray]:
+        """满足过滤条件的行号，无过滤时返回None"""
+        if predicate is None:
+            return None
+        return np.fromiter((label for label, row in self.rows.items() if predicate(row)), dtype=np.int64)
+
+    def _exact_search(self, queries: np.ndarray, candidates: np.ndarray, k: int):
+        """在候选行上精确计算内积"""
+        if len(candidates) == 0:
+            return [[] for _ in queries]
+        scores = queries @ np.asarray(self.vectors[candidates]).T
+        results = []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, min(k, len(row_scores)) - 1)[:k]
+            top = top[np.argsort(-row_scores[top])]
+            results.append([(int(candidates[i]), float(row_scores[i])) for i in top])
+        return results
+
+    def search(self, vectors, k: int, predicate) -> List[List[Dict[str, Any]]]:
+        """多向量检索，返回与Milvus一致的命中格式"""
+        queries = _normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim))
+
+        with self.lock:
+            candidates = self._candidates(predicate)
+            total = len(self.rows) if candidates is None else len(candidates)
+            k = min(k, total)
+            if k == 0:
+                return [[] for _ in queries]
+
+            if self.index is None or (candidates is not None and len(candidates) <= EXACT_SEARCH_THRESHOLD):
+                if candidates is None:
+                    candidates = np.fromiter(self.rows.keys(), dtype=np.int64)
+                results = self._exact_search(queries, candidates, k)
+            else:
+                allowed = set(candidates.tolist()) if candidates is not None else None
+                self.index.set_ef(max(self.ef_search, k))
+                try:
+                    labels, distances = self.index.knn_query(
+                        queries,
+                        k=k,
+                        num_threads=1 if allowed is not None else -1,
+                        filter=(lambda label: label in allowed) if allowed is not None else None
+                    )
+                    results = [
+                        [(int(label), 1.0 - float(distance)) for label, distance in zip(row_labels, row_distances)]
+                        for row_labels, row_distances in zip(labels, distances)
+                    ]
+                except RuntimeError:
+                    # 过滤过强时HNSW可能凑不满k个结果，退化为精确计算
+                    if candidates is None:
+                        candidates = np.fromiter(self.rows.keys(), dtype=np.int64)
+                    results = self._exact_search(queries, candidates, k)
+
+            hit_labels = sorted({label for hits in results for label, _ in hits})
+            texts = {}
+            if hit_labels:
+                placeholders = ",".join("?" * len(hit_labels))
+                texts = dict(self.conn.execute(
+                    f"SELECT label, text FROM rows WHERE label IN ({placeholders})", hit_labels
+                ).fetchall())
+
+            return [
+                [
+                    {
+                        ID_FIELD: self.rows[label][ID_FIELD],
+                        "distance": score,
+                        "entity": {TEXT_FIELD: texts.get(label, ""), METADATA_FIELD: self.rows[label][METADATA_FIELD]}
+                    }
+                    for label, score in hits
+                ]
+                for hits in results
+            ]
+
+    def get(self, ids: List[Any], predicate) -> List[Dict[str, Any]]:
+        """按主键读取行"""
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, user_id, text, metadata FROM rows WHERE id IN ({placeholders})", list(ids)
+            ).fetchall()
+        results = []
+        for row_id, user_id, text, metadata in rows:
+            row = {ID_FIELD: row_id, USER_ID_FIELD: user_id, TEXT_FIELD: text, METADATA_FIELD: json.loads(metadata or "{}")}
+            if predicate is None or predicate(row):
+                results.append(row)
+        return results
+
+    def iter_rows(self, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """按标签顺序分批读取全部行，每批单独加锁"""
+        last_label = -1
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT label, id, text, metadata FROM rows WHERE label > ? ORDER BY label LIMIT ?",
+                    (last_label, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_label = rows[-1][0]
+            yield [
+                {ID_FIELD: row_id, TEXT_FIELD: text, METADATA_FIELD: json.loads(metadata or "{}")}
+                for _, row_id, text, metadata in rows
+            ]
+
+    def existing_ids(self, ids: List[str]) -> set:
+        """返回已存在的主键"""
+        placeholders = ",".join("?" * len(ids))
+        with self.lock:
+            rows = self.conn.execute(f"SELECT id FROM rows WHERE id IN ({placeholders})", list(ids)).fetchall()
+        return {row_id for (row_id,) in rows}
+
+    def close(self):
+        """落盘并关闭文件"""
+        self.save()
+        with self.lock:
+            self.conn.close()
+            self.vectors = None
+            self.index = None
+
+
+class LocalHNSWBackend(VectorBackend):
+    """
+    进程内HNSW后端
+
+    每个集合一个目录，向量文件内存映射、元数据存SQLite、HNSW图存 hnsw.bin。
+    安装hnswlib时使用HNSW近似检索，否则在内存映射的向量上做精确检索。
+    文件只允许单个进程写入，使用该后端时服务应以单worker运行。
+    """
+
+    name = "local"
+
+    def __init__(self, data_dir: str = "./data/vector_store"):
+        """
+        初始化本地后端
+
+        Args:
+            data_dir: 数据目录，每个集合对应其中一个子目录
+        """
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+
+        self.m = int(os.getenv('LOCAL_HNSW_M', '16'))
+        self.ef_construction = int(os.getenv('LOCAL_HNSW_EF_CONSTRUCTION', '200'))
+        self.ef_search = int(os.getenv('LOCAL_HNSW_EF_SEARCH', '64'))
+
+        self._collections: Dict[str, _LocalCollection] = {}
+        self._lock = threading.Lock()
+
+        if hnswlib is None:
+            logger.warning("未安装hnswlib，本地后端将使用精确检索: pip install hnswlib")
+        logger.info(f"本地向量存储后端初始化完成 - 目录: {data_dir}")
+
+    def _path(self, collection_name: str) -> str:
+        return os.path.join(self.data_dir, re.sub(r"[^0-9A-Za-z_]", "_", collection_name))
+
+    def _collection(self, collection_name: str, dim: Optional[int] = None) -> _LocalCollection:
+        """获取已打开的集合，未打开时从磁盘加载"""
+        with self._lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                path = self._path(collection_name)
+                if dim is None and not os.path.exists(path):
+                    raise ValueError(f"集合不存在: {collection_name}")
+                collection = _LocalCollection(path, dim, self.m, self.ef_construction, self.ef_search)
+                self._collections[collection_name] = collection
+            return collection
+
+    def ping(self) -> bool:
+        return os.path.isdir(self.data_dir)
+
+    def has_collection(self, collection_name: str) -> bool:
+        return collection_name in self._collections or os.path.exists(self._path(collection_name))
+
+    def create_collection(self, collection_name: str, dim: int):
+        self._collection(collection_name, dim)
+        logger.info(f"本地集合 {collection_name} 创建成功 - 向量维度: {dim}, "
+                    f"索引: {'HNSW' if hnswlib is not None else 'FLAT'}")
+
+    def describe_collection(self, collection_name: str) -> Dict[str, bool]:
+        return {"string_ids": True, "user_field": True}
+
+    def existing_ids(self, collection_name: str, ids: List[str]) -> set:
+        if not ids:
+            return set()
+        return self._collection(collection_name).existing_ids(ids)
+
+    def write(self, collection_name: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        if not rows:
+            return []
+        return self._collection(collection_name).write(rows)
+
+    def search(self,
+               collection_name: str,
+               vectors: Union[np.ndarray, List[List[float]]],
+               k: int,
+               filter_expr: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        return self._collection(collection_name).search(vectors, k, compile_filter(filter_expr))
+
+    def get(self,
+            collection_name: str,
+            ids: List[Any],
+            filter_expr: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._collection(collection_name).get(ids, compile_filter(filter_expr))
+
+    def iter_rows(self, collection_name: str, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        return self._collection(collection_name).iter_rows(batch_size)
+
+    def count(self, collection_name: str) -> int:
+        return len(self._collection(collection_name).rows)
+
+    def drop_collection(self, collection_name: str):
+        with self._lock:
+            collection = self._collections.pop(collection_name, None)
+            if collection is not None:
+                collection.close()
+            shutil.rmtree(self._path(collection_name), ignore_errors=True)
+        logger.info(f"本地集合 {collection_name} 已删除")
+
+    def close(self):
+        with self._lock:
+            for collection in self._collections.values():
+                collection.close()
+            self._collections.clear()
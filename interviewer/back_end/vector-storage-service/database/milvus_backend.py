@@ -0,0 +1,200 @@
+"""
+Milvus向量存储后端 - 独立服务版本
+基于 MilvusClient 实现后端接口
+"""
+
+import os
+import json
+import logging
+from typing import Iterator, List, Optional, Dict, Any, Union
+
+import numpy as np
+from pymilvus import MilvusClient, DataType
+
+from .backend import (
+    VectorBackend, ID_FIELD, VECTOR_FIELD, TEXT_FIELD, METADATA_FIELD,
+    TEXT_MAX_LENGTH, ID_MAX_LENGTH, USER_ID_FIELD, USER_ID_MAX_LENGTH
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MilvusBackend(VectorBackend):
+    """Milvus后端，多个集合实例可共享同一个客户端"""
+
+    name = "milvus"
+
+    def __init__(self, client: Optional[MilvusClient] = None):
+        """
+        初始化Milvus后端
+
+        Args:
+            client: 已建立的MilvusClient，为空时按 MILVUS_URI / MILVUS_TOKEN 新建连接
+        """
+        self.client = client or MilvusClient(
+            uri=os.getenv('MILVUS_URI', 'http://43.142.157.145:19530'),
+            token=os.getenv('MILVUS_TOKEN', '')
+        )
+
+        # 索引与搜索参数
+        self.index_type = os.getenv('MILVUS_INDEX_TYPE', 'HNSW').upper()
+        self.metric_type = os.getenv('MILVUS_METRIC_TYPE', 'COSINE').upper()
+        self.hnsw_m = int(os.getenv('MILVUS_HNSW_M', '16'))
+        self.hnsw_ef_construction = int(os.getenv('MILVUS_HNSW_EF_CONSTRUCTION', '200'))
+        self.ivf_nlist = int(os.getenv('MILVUS_IVF_NLIST', '128'))
+        self.search_ef = int(os.getenv('MILVUS_SEARCH_EF', '64'))
+        self.search_nprobe = int(os.getenv('MILVUS_SEARCH_NPROBE', '16'))
+
+        # 分区键配置：新建集合时以 user_id 作为分区键
+        self.partition_key_enabled = os.getenv('MILVUS_PARTITION_KEY_ENABLED', 'true').lower() == 'true'
+        self.num_partitions = int(os.getenv('MILVUS_NUM_PARTITIONS', '64'))
+
+    def ping(self) -> bool:
+        self.client.list_collections()
+        return True
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self.client.has_collection(collection_name)
+
+    def create_collection(self, collection_name: str, dim: int):
+        # 主键由来源文件哈希、分块序号和内容哈希确定，重复写入同一分块时可去重
+        schema = self.client.create_schema(auto_id=False, enable_dynamic_field=False)
+        schema.add_field(field_name=ID_FIELD, datatype=DataType.VARCHAR, is_primary=True, max_length=ID_MAX_LENGTH)
+        schema.add_field(field_name=VECTOR_FIELD, datatype=DataType.FLOAT_VECTOR, dim=dim)
+        schema.add_field(field_name=TEXT_FIELD, datatype=DataType.VARCHAR, max_length=TEXT_MAX_LENGTH)
+        schema.add_field(field_name=METADATA_FIELD, datatype=DataType.JSON)
+        if self.partition_key_enabled:
+            schema.add_field(
+                field_name=USER_ID_FIELD,
+                datatype=DataType.VARCHAR,
+                max_length=USER_ID_MAX_LENGTH,
+                is_partition_key=True
+            )
+
+        index_params = self.client.prepare_index_params()
+        index_params.add_index(
+            field_name=VECTOR_FIELD,
+            index_type=self.index_type,
+            metric_type=self.metric_type,
+            params=self._build_index_params()
+        )
+
+        # 携带索引参数创建时，Milvus会自动建索引并加载集合
+        create_kwargs = {"num_partitions": self.num_partitions} if self.partition_key_enabled else {}
+        self.client.create_collection(
+            collection_name=collection_name,
+            schema=schema,
+            index_params=index_params,
+            **create_kwargs
+        )
+
+        logger.info(f"集合 {collection_name} 创建成功 - 向量维度: {dim}, 索引: {self.index_type}, "
+                    f"分区键: {USER_ID_FIELD if self.partition_key_enabled else '无'}")
+
+    def describe_collection(self, collection_name: str) -> Dict[str, bool]:
+        fields = self.client.describe_collection(collection_name).get("fields", [])
+        return {
+            "string_ids": any(field.get("is_primary") and field.get("type") == DataType.VARCHAR for field in fields),
+            "user_field": any(field.get("name") == USER_ID_FIELD for field in fields)
+        }
+
+    def _build_index_params(self) -> Dict[str, Any]:
+        """
+        根据索引类型构建建索引参数
+
+        Returns:
+            Dict[str, Any]: 索引构建参数
+        """
+        if self.index_type == "HNSW":
+            return {"M": self.hnsw_m, "efConstruction": self.hnsw_ef_construction}
+        if self.index_type == "IVF_FLAT":
+            return {"nlist": self.ivf_nlist}
+        raise ValueError(f"不支持的索引类型: {self.index_type}，可选 HNSW 或 IVF_FLAT")
+
+    def _build_search_params(self, k: int) -> Dict[str, Any]:
+        """
+        根据索引类型构建搜索参数
+
+        Args:
+            k: 返回结果数量，HNSW要求ef不小于k
+
+        Returns:
+            Dict[str, Any]: 搜索参数
+        """
+        if self.index_type == "HNSW":
+            params = {"ef": max(self.search_ef, k)}
+        else:
+            params = {"nprobe": self.search_nprobe}
+        return {"metric_type": self.metric_type, "params": params}
+
+    def existing_ids(self, collection_name: str, ids: List[str]) -> set:
+        if not ids:
+            return set()
+        rows = self.client.query(
+            collection_name=collection_name,
+            filter=f"{ID_FIELD} in {json.dumps(ids, ensure_ascii=False)}",
+            output_fields=[ID_FIELD]
+        )
+        return {row[ID_FIELD] for row in rows}
+
+    def write(self, collection_name: str, rows: List[Dict[str, Any]]) -> List[Any]:
+        if rows and ID_FIELD in rows[0]:
+            self.client.upsert(collection_name=collection_name, data=rows)
+            return [row[ID_FIELD] for row in rows]
+
+        # 旧的自增主键集合
+        result = self.client.insert(collection_name=collection_name, data=rows)
+        return list(result.get("ids", []))
+
+    def search(self,
+               collection_name: str,
+               vectors: Union[np.ndarray, List[List[float]]],
+               k: int,
+               filter_expr: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        return self.client.search(
+            collection_name=collection_name,
+            data=list(vectors),
+            limit=k,
+            filter=filter_expr or "",
+            output_fields=[TEXT_FIELD, METADATA_FIELD],
+            search_params=self._build_search_params(k)
+        )
+
+    def get(self,
+            collection_name: str,
+            ids: List[Any],
+            filter_expr: Optional[str] = None) -> List[Dict[str, Any]]:
+        if not ids:
+            return []
+        expr = f"{ID_FIELD} in {json.dumps(ids, ensure_ascii=False)}"
+        if filter_expr:
+            expr = f"({expr}) and ({filter_expr})"
+        return self.client.query(
+            collection_name=collection_name,
+            filter=expr,
+            output_fields=[ID_FIELD, TEXT_FIELD, METADATA_FIELD]
+        )
+
+    def iter_rows(self, collection_name: str, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        iterator = self.client.query_iterator(
+            collection_name=collection_name,
+            batch_size=batch_size,
+            output_fields=[ID_FIELD, TEXT_FIELD, METADATA_FIELD]
+        )
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    return
+                yield rows
+        finally:
+            iterator.close()
+
+    def count(self, collection_name: str) -> int:
+        return self.client.get_collection_stats(collection_name).get("row_count", 0)
+
+    def drop_collection(self, collection_name: str):
+        self.client.drop_collection(collection_name)
+
+    def close(self):
+        self.client.close()
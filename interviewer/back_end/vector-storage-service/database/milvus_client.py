@@ -1,13 +1,19 @@
 """
 Milvus向量数据库客户端 - 独立服务版本
-提供向量存储和检索功能
+提供向量存储和检索功能，底层读写通过可替换的存储后端完成（Milvus或本地HNSW）
 """
 
 import os
+import json
+import time
+import hashlib
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Union
+
+import numpy as np
 from langchain_core.documents import Document
-from pymilvus import MilvusClient, connections, utility, Collection, FieldSchema, CollectionSchema, DataType
+from pymilvus import MilvusClient
 
 # 修复相对导入问题
 import sys
@@ -15,6 +21,12 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from embeddings import embedding_service
+from database.keyword_index import get_keyword_index
+from database.result_cache import get_result_cache
+from database.backend import (
+    VectorBackend, create_backend, ID_FIELD, VECTOR_FIELD, TEXT_FIELD, METADATA_FIELD,
+    TEXT_MAX_LENGTH, ID_MAX_LENGTH, USER_ID_FIELD, USER_ID_MAX_LENGTH
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,35 +51,62 @@ class MilvusVectorStore:
         self.embedding_model_type = embedding_model_type
         self.embedding_model = embedding_service.get_embedding_model(embedding_model_type)
         self.vector_store = None
-        self.client = None
+        self.backend: Optional[VectorBackend] = None
+
+        # 批处理配置：每次嵌入的文本数、每次写入Milvus的行数
+        self.embedding_batch_size = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+        self.insert_batch_size = int(os.getenv('MILVUS_INSERT_BATCH_SIZE', '500'))
+
+        # 混合检索配置：关键词索引、RRF常数、每路候选数倍数
+        self.keyword_index = get_keyword_index()
+        self.rrf_k = int(os.getenv('HYBRID_RRF_K', '60'))
+        self.hybrid_candidate_multiplier = int(os.getenv('HYBRID_CANDIDATE_MULTIPLIER', '4'))
+
+        # 检索结果缓存，写入或删除集合时按集合版本号失效
+        self.result_cache = get_result_cache()
+
+        # 是否使用确定性字符串主键（旧的自增主键集合为False，退化为普通插入）
+        self.deterministic_ids = True
+
+        # 当前集合是否包含 user_id 分区键字段（旧集合按元数据过滤）
+        self.has_user_field = True
 
-        # 从环境变量获取Milvus配置
-        self.milvus_uri = os.getenv('MILVUS_URI', 'http://43.142.157.145:19530')
-        self.milvus_token = os.getenv('MILVUS_TOKEN', '')
+        # 向量维度，首次建表时探测
+        self._embedding_dim: Optional[int] = None
 
         logger.info(f"初始化Milvus向量存储 - 集合: {collection_name}, 模型: {embedding_model_type}")
 
-    def create_connection(self) -> bool:
+    def create_connection(self, client: Optional[Union[MilvusClient, VectorBackend]] = None) -> bool:
         """
-        创建Milvus连接
+        创建存储后端连接
+
+        Args:
+            client: 连接池提供的共享后端或MilvusClient，传入时直接复用不再新建连接；
+                    为空时按 VECTOR_STORE_BACKEND 新建后端
 
         Returns:
             bool: 连接是否成功
         """
+        if isinstance(client, VectorBackend):
+            self.backend = client
+            return True
+
         try:
-            logger.info(f"连接到Milvus服务器: {self.milvus_uri}")
+            if client is not None:
+                self.backend = create_backend("milvus", client=client)
+                return True
 
-            # 创建PyMilvus客户端
-            self.client = MilvusClient(uri=self.milvus_uri, token=self.milvus_token)
+            self.backend = create_backend()
+            logger.info(f"连接到存储后端: {self.backend.name}")
 
             # 测试连接
-            self.client.list_collections()
+            self.backend.ping()
 
-            logger.info("Milvus连接创建成功")
+            logger.info("存储后端连接创建成功")
             return True
 
         except Exception as e:
-            logger.error(f"Milvus连接失败: {str(e)}")
+            logger.error(f"存储后端连接失败: {str(e)}")
             return False
 
     def check_collection_exists(self) -> bool:
@@ -78,13 +117,35 @@ class MilvusVectorStore:
             bool: 集合是否存在
         """
         try:
-            if not self.client:
+            if not self.backend:
                 return False
-            return self.client.has_collection(self.collection_name)
+            return self.backend.has_collection(self.collection_name)
         except Exception as e:
             logger.error(f"检查集合存在性失败: {str(e)}")
             return False
 
+    def load_collection(self) -> bool:
+        """
+        打开已存在的集合并读取其结构，集合不存在时不创建
+
+        Returns:
+            bool: 集合是否存在
+        """
+        if not self.backend:
+            logger.error("存储后端未初始化")
+            return False
+
+        if not self.backend.has_collection(self.collection_name):
+            return False
+
+        self._inspect_schema()
+        if not self.deterministic_ids:
+            logger.warning(f"集合 {self.collection_name} 使用自增主键，写入不做去重")
+        if not self.has_user_field:
+            logger.warning(f"集合 {self.collection_name} 没有 {USER_ID_FIELD} 分区键，按用户检索时使用元数据过滤")
+        logger.info(f"集合 {self.collection_name} 已存在")
+        return True
+
     def create_collection_if_not_exists(self) -> bool:
         """
         如果集合不存在则创建集合
@@ -93,23 +154,229 @@ class MilvusVectorStore:
             bool: 操作是否成功
         """
         try:
-            if not self.client:
-                logger.error("Milvus客户端未初始化")
+            if not self.backend:
+                logger.error("存储后端未初始化")
                 return False
 
             # 检查集合是否存在
-            if self.client.has_collection(self.collection_name):
-                logger.info(f"集合 {self.collection_name} 已存在")
+            if self.load_collection():
                 return True
 
-            # 让LangChain自动创建集合
-            logger.info(f"集合 {self.collection_name} 将由LangChain自动创建")
+            # 按探测到的维度创建集合和向量索引
+            self.backend.create_collection(self.collection_name, self._get_embedding_dim())
+            self._inspect_schema()
             return True
 
         except Exception as e:
             logger.error(f"准备集合失败: {str(e)}")
             return False
 
+    def _inspect_schema(self):
+        """读取集合结构，确定主键类型和是否有分区键字段"""
+        description = self.backend.describe_collection(self.collection_name)
+        self.deterministic_ids = description["string_ids"]
+        self.has_user_field = description["user_field"]
+
+    def scoped_filter(self, filter_expr: Optional[str] = None, user_id: Optional[str] = None) -> Optional[str]:
+        """
+        将用户范围合并到过滤表达式
+
+        集合带有 user_id 分区键时按分区键过滤，Milvus只检索该用户所在的分区；
+        旧集合退化为按 metadata["user_id"] 过滤。
+
+        Args:
+            filter_expr: 原过滤表达式
+            user_id: 用户ID，为空时不限定用户
+
+        Returns:
+            Optional[str]: 合并后的过滤表达式
+        """
+        if user_id is None:
+            return filter_expr
+
+        field = USER_ID_FIELD if self.has_user_field else f'{METADATA_FIELD}["user_id"]'
+        scope = f"{field} == {json.dumps(user_id, ensure_ascii=False)}"
+        return f"({scope}) and ({filter_expr})" if filter_expr else scope
+
+    @staticmethod
+    def _user_id_of(metadata: Dict[str, Any]) -> str:
+        """从元数据中取出分区键取值，缺省为空字符串"""
+        user_id = metadata.get("user_id")
+        return str(user_id)[:USER_ID_MAX_LENGTH] if user_id is not None else ""
+
+    @staticmethod
+    def make_chunk_id(text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """
+        生成分块的确定性主键
+
+        元数据带有 source_hash（来源文件sha256）时，主键为 来源文件哈希_分块序号_内容哈希，
+        带有 user_id 时在来源文件哈希后加入用户哈希，不同用户上传同一文件时各自写入自己的分区；
+        否则使用文本与元数据整体的哈希（已包含 user_id），相同的写入请求重复提交时得到相同主键。
+
+        Args:
+            text: 分块文本
+            metadata: 分块元数据
+
+        Returns:
+            str: 主键字符串
+        """
+        metadata = metadata or {}
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        source_hash = metadata.get("source_hash")
+        if source_hash:
+            source_key = str(source_hash)[:32]
+            user_id = metadata.get("user_id")
+            if user_id is not None:
+                source_key += "_" + hashlib.sha256(str(user_id).encode("utf-8")).hexdigest()[:16]
+            return f"{source_key}_{metadata.get('chunk_id', 0)}_{content_hash[:32]}"
+
+        payload = json.dumps(metadata, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(f"{text}\n{payload}".encode("utf-8")).hexdigest()
+
+    def _existing_ids(self, ids: List[str]) -> set:
+        """批量查询已存在的主键"""
+        return self.backend.existing_ids(self.collection_name, ids)
+
+    def _get_embedding_dim(self) -> int:
+        """
+        探测当前嵌入模型的向量维度
+
+        Returns:
+            int: 向量维度
+        """
+        if self._embedding_dim is None:
+            probe = self.embedding_model.embed_array(["维度探测"])
+            self._embedding_dim = int(probe.shape[1])
+        return self._embedding_dim
+
+    @staticmethod
+    def _truncate_text(text: str) -> str:
+        """按UTF-8字节长度截断文本，避免超出VARCHAR字段限制"""
+        encoded = text.encode("utf-8")
+        if len(encoded) <= TEXT_MAX_LENGTH:
+            return text
+        return encoded[:TEXT_MAX_LENGTH].decode("utf-8", errors="ignore")
+
+    @staticmethod
+    def _normalize_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """将元数据转换为可写入JSON字段的字典"""
+        if not metadata:
+            return {}
+        return json.loads(json.dumps(metadata, ensure_ascii=False, default=str))
+
+    def insert_texts(self,
+                     texts: List[str],
+                     metadatas: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        分批嵌入文本并批量写入Milvus
+
+        每个批次先按确定性主键查询已存在的分块，只对新分块做一次嵌入调用；
+        嵌入结果跨批次缓冲，攒满 insert_batch_size 行再调用 MilvusClient.upsert 写入，
+        最后一个批次结束时写入剩余行。重复导入未修改的文件时，每个分块只需一次存在性查询。
+
+        Args:
+            texts: 要添加的文本列表
+            metadatas: 元数据列表，长度需与texts一致
+
+        Returns:
+            List[Dict[str, Any]]: 每个批次的写入数量、跳过数量和耗时统计，
+                写入数量和写入耗时计入触发写入的批次
+
+        Raises:
+            ValueError: 参数不合法
+            RuntimeError: 存储后端未初始化
+        """
+        if not self.backend:
+            raise RuntimeError("存储后端未初始化")
+
+        if metadatas is not None and len(metadatas) != len(texts):
+            raise ValueError(f"metadatas数量({len(metadatas)})与texts数量({len(texts)})不一致")
+
+        batch_stats = []
+        # 本次调用内已处理的主键，避免同一请求内的重复分块被写入两次
+        seen_ids = set()
+        # 已嵌入、尚未写入的行
+        pending_rows = []
+        for batch_index, start in enumerate(range(0, len(texts), self.embedding_batch_size)):
+            is_last = start + self.embedding_batch_size >= len(texts)
+            batch_texts = texts[start:start + self.embedding_batch_size]
+            batch_metadatas = [
+                self._normalize_metadata(metadatas[i] if metadatas else None)
+                for i in range(start, start + len(batch_texts))
+            ]
+
+            lookup_start = time.time()
+            batch_ids = None
+            if self.deterministic_ids:
+                batch_ids = [self.make_chunk_id(text, metadata) for text, metadata in zip(batch_texts, batch_metadatas)]
+                existing = self._existing_ids([pk for pk in dict.fromkeys(batch_ids) if pk not in seen_ids])
+                keep = []
+                for i, pk in enumerate(batch_ids):
+                    if pk not in seen_ids and pk not in existing:
+                        keep.append(i)
+                    seen_ids.add(pk)
+            else:
+                keep = list(range(len(batch_texts)))
+            lookup_time = time.time() - lookup_start
+
+            embedding_time = 0.0
+            if keep:
+                embed_start = time.time()
+                # 保持float32数组，写入时按行取视图，不转换为Python列表
+                vectors = self.embedding_model.embed_array([batch_texts[i] for i in keep])
+                embedding_time = time.time() - embed_start
+
+                for position, i in enumerate(keep):
+                    row = {
+                        VECTOR_FIELD: vectors[position],
+                        TEXT_FIELD: self._truncate_text(batch_texts[i]),
+                        METADATA_FIELD: batch_metadatas[i]
+                    }
+                    if batch_ids is not None:
+                        row[ID_FIELD] = batch_ids[i]
+                    if self.has_user_field:
+                        row[USER_ID_FIELD] = self._user_id_of(batch_metadatas[i])
+                    pending_rows.append(row)
+
+            inserted = 0
+            insert_start = time.time()
+            while pending_rows and (len(pending_rows) >= self.insert_batch_size or is_last):
+                chunk = pending_rows[:self.insert_batch_size]
+                del pending_rows[:self.insert_batch_size]
+                self._write_rows(chunk)
+                inserted += len(chunk)
+            insert_time = time.time() - insert_start if inserted else 0.0
+
+            skipped = len(batch_texts) - len(keep)
+            batch_stats.append({
+                "batch_index": batch_index,
+                "size": inserted,
+                "skipped": skipped,
+                "lookup_time": round(lookup_time, 4),
+                "embedding_time": round(embedding_time, 4),
+                "insert_time": round(insert_time, 4)
+            })
+            logger.info(f"批次 {batch_index} 写入完成 - 数量: {inserted}, 已存在跳过: {skipped}, "
+                        f"嵌入耗时: {embedding_time:.2f}秒, 写入耗时: {insert_time:.2f}秒")
+
+        return batch_stats
+
+    def _write_rows(self, rows: List[Dict[str, Any]]):
+        """写入一组行并同步关键词索引"""
+        # 行内带主键时按主键覆盖写入
+        row_ids = self.backend.write(self.collection_name, rows)
+        self._invalidate_cache()
+
+        # 同步写入关键词索引，供混合检索使用
+        if self.keyword_index is not None:
+            self.keyword_index.add(
+                self.collection_name,
+                row_ids,
+                [row[TEXT_FIELD] for row in rows],
+                [self._user_id_of(row[METADATA_FIELD]) for row in rows]
+            )
+
     def add_documents(self, documents: List[Document]) -> bool:
         """
         添加文档到向量存储
@@ -121,14 +388,18 @@ class MilvusVectorStore:
             bool: 操作是否成功
         """
         try:
-            if not self.client:
-                logger.error("Milvus客户端未初始化")
+            if not self.backend:
+                logger.error("存储后端未初始化")
                 return False
 
             logger.info(f"开始添加 {len(documents)} 个文档到向量存储")
 
-            # 暂时返回成功，实际实现需要使用pymilvus
-            logger.info("文档添加成功（暂时模拟）")
+            self.insert_texts(
+                [doc.page_content for doc in documents],
+                [doc.metadata for doc in documents]
+            )
+
+            logger.info(f"文档添加成功 - 数量: {len(documents)}")
             return True
 
         except Exception as e:
@@ -147,54 +418,241 @@ class MilvusVectorStore:
             bool: 操作是否成功
         """
         try:
-            if not self.client:
-                logger.error("Milvus客户端未初始化")
+            if not self.backend:
+                logger.error("存储后端未初始化")
                 return False
 
             logger.info(f"开始添加 {len(texts)} 个文本到向量存储")
 
-            # 暂时返回成功，实际实现需要使用pymilvus
-            logger.info("文本添加成功（暂时模拟）")
+            self.insert_texts(texts, metadatas)
+
+            logger.info(f"文本添加成功 - 数量: {len(texts)}")
             return True
 
         except Exception as e:
             logger.error(f"添加文本失败: {str(e)}")
             return False
 
-    def similarity_search(self,
-                         query: str,
-                         k: int = 5,
-                         filter_expr: Optional[str] = None) -> List[Document]:
+    def _cache_key(self,
+                   mode: str,
+                   query: str,
+                   k: int,
+                   filter_expr: Optional[str],
+                   user_id: Optional[str]) -> Optional[tuple]:
+        """生成检索结果缓存键，未启用缓存时返回None"""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.make_key(
+            self.collection_name, self.embedding_model_type, mode, query, k, filter_expr, user_id
+        )
+
+    def _cache_version(self) -> int:
+        """检索开始前读取集合版本号"""
+        return self.result_cache.version(self.collection_name) if self.result_cache is not None else 0
+
+    def _cache_get(self, key: Optional[tuple]) -> Optional[List[Tuple[Document, float]]]:
+        """读取检索结果缓存"""
+        if key is None:
+            return None
+        return self.result_cache.get(key)
+
+    def _cache_put(self, key: Optional[tuple], version: int, results: List[Tuple[Document, float]]):
+        """写入检索结果缓存，检索期间集合有写入时不会写入"""
+        if key is not None:
+            self.result_cache.put(key, version, results)
+
+    def _invalidate_cache(self):
+        """集合数据变更后使该集合的检索结果缓存失效"""
+        if self.result_cache is not None:
+            self.result_cache.bump(self.collection_name)
+
+    def search_by_vectors(self,
+                          vectors: Union[np.ndarray, List[List[float]]],
+                          k: int = 5,
+                          filter_expr: Optional[str] = None,
+                          user_id: Optional[str] = None) -> List[List[Tuple[Document, float]]]:
         """
-        相似性搜索
+        按查询向量执行top-k搜索
+
+        一次调用可以携带多个查询向量，Milvus在服务端并行检索。
+
+        Args:
+            vectors: 查询向量列表或二维float32数组
+            k: 每个查询返回的结果数量
+            filter_expr: Milvus布尔过滤表达式，如 metadata["source_filename"] == "a.pdf"
+            user_id: 用户ID，指定时只检索该用户的分区
+
+        Returns:
+            List[List[Tuple[Document, float]]]: 与查询向量一一对应的 (Document, score) 列表
+
+        Raises:
+            RuntimeError: 存储后端未初始化
+        """
+        if not self.backend:
+            raise RuntimeError("存储后端未初始化")
+
+        if len(vectors) == 0:
+            return []
+
+        results = self._search_hits(vectors, k, self.scoped_filter(filter_expr, user_id))
+        return [[(self._hit_to_document(hit), float(hit["distance"])) for hit in hits] for hits in results]
+
+    def _search_hits(self,
+                     vectors: Union[np.ndarray, List[List[float]]],
+                     k: int,
+                     filter_expr: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """执行向量搜索，返回原始命中结果（包含主键）"""
+        return self.backend.search(self.collection_name, vectors, k, filter_expr)
+
+    @staticmethod
+    def _hit_to_document(hit: Dict[str, Any]) -> Document:
+        """将Milvus命中结果转换为Document"""
+        entity = hit.get("entity", hit)
+        return Document(
+            page_content=entity.get(TEXT_FIELD, ""),
+            metadata=entity.get(METADATA_FIELD) or {}
+        )
+
+    def _hybrid_from_vector(self,
+                            query: str,
+                            query_vectors: np.ndarray,
+                            k: int,
+                            filter_expr: Optional[str] = None,
+                            user_id: Optional[str] = None) -> List[Tuple[Document, float]]:
+        """
+        稠密向量与BM25关键词检索结果做倒数排名融合(RRF)
+
+        Args:
+            query: 查询文本，用于关键词检索
+            query_vectors: 形状为 (1, dim) 的查询向量
+            k: 返回结果数量
+            filter_expr: 过滤表达式，对两路结果都生效
+            user_id: 用户ID，对两路结果都生效
+
+        Returns:
+            List[Tuple[Document, float]]: 按RRF分数降序的 (Document, score) 列表
+        """
+        candidates = k * max(1, self.hybrid_candidate_multiplier)
+        filter_expr = self.scoped_filter(filter_expr, user_id)
+
+        dense_hits = self._search_hits(query_vectors, candidates, filter_expr)[0]
+        keyword_hits = []
+        if self.keyword_index is not None:
+            keyword_hits = self.keyword_index.search(self.collection_name, query, candidates, user_id=user_id)
+
+        documents: Dict[Any, Document] = {hit["id"]: self._hit_to_document(hit) for hit in dense_hits}
+
+        # 关键词命中但稠密结果中没有的文档，回查原文，同时应用过滤条件
+        missing_ids = [doc_id for doc_id, _ in keyword_hits if doc_id not in documents]
+        for row in self.backend.get(self.collection_name, missing_ids, filter_expr):
+            documents[row[ID_FIELD]] = self._hit_to_document(row)
+
+        # 每路结果中同一主键只按最高排名计分一次
+        scores: Dict[Any, float] = {}
+        for ranked_ids in (dict.fromkeys(hit["id"] for hit in dense_hits),
+                           dict.fromkeys(doc_id for doc_id, _ in keyword_hits)):
+            rank = 0
+            for doc_id in ranked_ids:
+                if doc_id not in documents:
+                    continue
+                rank += 1
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (self.rrf_k + rank)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(documents[doc_id], score) for doc_id, score in ranked]
+
+    def hybrid_search_with_score(self,
+                                 query: str,
+                                 k: int = 5,
+                                 filter_expr: Optional[str] = None,
+                                 user_id: Optional[str] = None) -> List[Tuple[Document, float]]:
+        """
+        混合检索（稠密向量 + BM25关键词）
 
         Args:
             query: 查询文本
             k: 返回结果数量
             filter_expr: 过滤表达式
+            user_id: 用户ID，指定时只检索该用户的分区
 
         Returns:
-            List[Document]: 搜索结果
+            List[Tuple[Document, float]]: (Document, RRF分数) 元组列表
         """
         try:
-            if not self.client:
-                logger.error("Milvus客户端未初始化")
+            if not self.backend:
+                logger.error("存储后端未初始化")
                 return []
 
-            logger.info(f"执行相似性搜索: {query[:50]}...")
+            cache_key = self._cache_key("hybrid", query, k, filter_expr, user_id)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            version = self._cache_version()
+
+            query_vectors = self.embedding_model.embed_array([query])
+            results = self._hybrid_from_vector(query, query_vectors, k, filter_expr, user_id)
+            self._cache_put(cache_key, version, results)
+            return results
 
-            # 暂时返回空结果，实际实现需要使用pymilvus
-            logger.info("搜索完成（暂时模拟），返回 0 个结果")
+        except Exception as e:
+            logger.error(f"混合检索失败: {str(e)}")
             return []
 
+    async def ahybrid_search_with_score(self,
+                                        query: str,
+                                        k: int = 5,
+                                        filter_expr: Optional[str] = None,
+                                        user_id: Optional[str] = None) -> List[Tuple[Document, float]]:
+        """异步混合检索，嵌入和检索调用都不阻塞事件循环"""
+        try:
+            if not self.backend:
+                logger.error("存储后端未初始化")
+                return []
+
+            cache_key = self._cache_key("hybrid", query, k, filter_expr, user_id)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.info(f"混合检索命中缓存: {query[:50]}...")
+                return cached
+            version = self._cache_version()
+
+            logger.info(f"执行异步混合检索: {query[:50]}...")
+
+            query_vectors = await self.embedding_model.aembed_array([query])
+            results = await asyncio.to_thread(self._hybrid_from_vector, query, query_vectors, k, filter_expr, user_id)
+            self._cache_put(cache_key, version, results)
+
+            logger.info(f"异步混合检索完成，返回 {len(results)} 个结果")
+            return results
+
         except Exception as e:
-            logger.error(f"相似性搜索失败: {str(e)}")
+            logger.error(f"异步混合检索失败: {str(e)}")
             return []
 
+    def similarity_search(self,
+                         query: str,
+                         k: int = 5,
+                         filter_expr: Optional[str] = None,
+                         user_id: Optional[str] = None) -> List[Document]:
+        """
+        相似性搜索
+
+        Args:
+            query: 查询文本
+            k: 返回结果数量
+            filter_expr: 过滤表达式
+            user_id: 用户ID，指定时只检索该用户的分区
+
+        Returns:
+            List[Document]: 搜索结果
+        """
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter_expr, user_id)]
+
     def similarity_search_with_score(self,
                                    query: str,
                                    k: int = 5,
-                                   filter_expr: Optional[str] = None) -> List[Tuple[Document, float]]:
+                                   filter_expr: Optional[str] = None,
+                                   user_id: Optional[str] = None) -> List[Tuple[Document, float]]:
         """
         带分数的相似性搜索
 
@@ -202,25 +660,123 @@ class MilvusVectorStore:
             query: 查询文本
             k: 返回结果数量
             filter_expr: 过滤表达式
+            user_id: 用户ID，指定时只检索该用户的分区
 
         Returns:
             List[Tuple[Document, float]]: (Document, score) 元组列表
         """
         try:
-            if not self.client:
-                logger.error("Milvus客户端未初始化")
+            if not self.backend:
+                logger.error("存储后端未初始化")
                 return []
 
+            cache_key = self._cache_key("dense", query, k, filter_expr, user_id)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.info(f"相似性搜索命中缓存: {query[:50]}...")
+                return cached
+            version = self._cache_version()
+
             logger.info(f"执行带分数的相似性搜索: {query[:50]}...")
 
-            # 暂时返回空结果，实际实现需要使用pymilvus
-            logger.info("带分数搜索完成（暂时模拟），返回 0 个结果")
-            return []
+            # 查询只嵌入一次
+            query_vectors = self.embedding_model.embed_array([query])
+            results = self.search_by_vectors(query_vectors, k, filter_expr, user_id)[0]
+            self._cache_put(cache_key, version, results)
+
+            logger.info(f"带分数搜索完成，返回 {len(results)} 个结果")
+            return results
 
         except Exception as e:
             logger.error(f"带分数相似性搜索失败: {str(e)}")
             return []
 
+    async def asimilarity_search_with_score(self,
+                                            query: str,
+                                            k: int = 5,
+                                            filter_expr: Optional[str] = None,
+                                            user_id: Optional[str] = None) -> List[Tuple[Document, float]]:
+        """
+        异步带分数的相似性搜索，嵌入和Milvus调用都不阻塞事件循环
+
+        Args:
+            query: 查询文本
+            k: 返回结果数量
+            filter_expr: 过滤表达式
+            user_id: 用户ID，指定时只检索该用户的分区
+
+        Returns:
+            List[Tuple[Document, float]]: (Document, score) 元组列表
+        """
+        try:
+            if not self.backend:
+                logger.error("存储后端未初始化")
+                return []
+
+            cache_key = self._cache_key("dense", query, k, filter_expr, user_id)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                logger.info(f"相似性搜索命中缓存: {query[:50]}...")
+                return cached
+            version = self._cache_version()
+
+            logger.info(f"执行异步带分数的相似性搜索: {query[:50]}...")
+
+            query_vectors = await self.embedding_model.aembed_array([query])
+            results = await asyncio.to_thread(self.search_by_vectors, query_vectors, k, filter_expr, user_id)
+            self._cache_put(cache_key, version, results[0])
+
+            logger.info(f"异步带分数搜索完成，返回 {len(results[0])} 个结果")
+            return results[0]
+
+        except Exception as e:
+            logger.error(f"异步带分数相似性搜索失败: {str(e)}")
+            return []
+
+    async def asimilarity_search_batch(self,
+                                       queries: List[str],
+                                       k: int = 5,
+                                       filter_expr: Optional[str] = None,
+                                       user_id: Optional[str] = None) -> List[List[Tuple[Document, float]]]:
+        """
+        异步批量相似性搜索：一次嵌入所有查询，一次多向量Milvus搜索
+
+        Args:
+            queries: 查询文本列表
+            k: 每个查询返回的结果数量
+            filter_expr: 过滤表达式，对所有查询生效
+            user_id: 用户ID，指定时只检索该用户的分区
+
+        Returns:
+            List[List[Tuple[Document, float]]]: 与queries一一对应的 (Document, score) 列表
+
+        Raises:
+            RuntimeError: 存储后端未初始化
+        """
+        if not self.backend:
+            raise RuntimeError("存储后端未初始化")
+
+        if not queries:
+            return []
+
+        # 命中缓存的查询直接返回，其余查询合并为一次嵌入和一次多向量搜索
+        cache_keys = [self._cache_key("dense", query, k, filter_expr, user_id) for query in queries]
+        results: List[Optional[List[Tuple[Document, float]]]] = [self._cache_get(key) for key in cache_keys]
+        pending = [i for i, hits in enumerate(results) if hits is None]
+
+        logger.info(f"执行批量相似性搜索: 查询数={len(queries)}, 命中缓存={len(queries) - len(pending)}")
+
+        if pending:
+            version = self._cache_version()
+            query_vectors = await self.embedding_model.aembed_array([queries[i] for i in pending])
+            searched = await asyncio.to_thread(self.search_by_vectors, query_vectors, k, filter_expr, user_id)
+            for i, hits in zip(pending, searched):
+                results[i] = hits
+                self._cache_put(cache_keys[i], version, hits)
+
+        logger.info(f"批量搜索完成，返回 {sum(len(hits) for hits in results)} 个结果")
+        return results
+
     def get_collection_stats(self) -> Dict[str, Any]:
         """
         获取集合统计信息
@@ -229,27 +785,86 @@ class MilvusVectorStore:
             Dict[str, Any]: 集合统计信息
         """
         try:
-            if not self.client:
-                logger.error("Milvus客户端未初始化")
+            if not self.backend:
+                logger.error("存储后端未初始化")
                 return {}
 
-            if not self.client.has_collection(self.collection_name):
+            if not self.backend.has_collection(self.collection_name):
                 return {"exists": False}
 
-            # 获取集合信息
-            stats = self.client.get_collection_stats(self.collection_name)
-
+            row_count = self.backend.count(self.collection_name)
             return {
                 "exists": True,
-                "row_count": stats.get("row_count", 0),
+                "row_count": row_count,
                 "collection_name": self.collection_name,
-                "embedding_model": self.embedding_model_type
+                "embedding_model": self.embedding_model_type,
+                "search_cache": self.get_cache_stats(),
+                "keyword_index": self.get_keyword_index_stats(row_count)
             }
 
         except Exception as e:
             logger.error(f"获取集合统计信息失败: {str(e)}")
             return {"exists": False, "error": str(e)}
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取当前集合的检索结果缓存命中统计"""
+        if self.result_cache is None:
+            return {"enabled": False}
+        return self.result_cache.get_stats(self.collection_name)
+
+    def get_keyword_index_stats(self, row_count: int) -> Dict[str, Any]:
+        """
+        获取关键词索引覆盖情况
+
+        Args:
+            row_count: 集合行数
+
+        Returns:
+            Dict[str, Any]: 已索引行数和覆盖率，覆盖率低于1说明有数据未进入索引，需要重建
+        """
+        if self.keyword_index is None:
+            return {"enabled": False}
+
+        indexed_rows = self.keyword_index.count(self.collection_name)
+        return {
+            "enabled": True,
+            "indexed_rows": indexed_rows,
+            "coverage": round(min(indexed_rows / row_count, 1.0), 4) if row_count else 1.0
+        }
+
+    def rebuild_keyword_index(self) -> int:
+        """
+        从存储后端重建集合的关键词索引
+
+        用于补齐启用索引之前已有的数据和其他实例写入的数据；重建期间的新写入会正常进入索引。
+
+        Returns:
+            int: 写入索引的行数
+
+        Raises:
+            RuntimeError: 存储后端未初始化或关键词索引未启用
+        """
+        if not self.backend:
+            raise RuntimeError("存储后端未初始化")
+        if self.keyword_index is None:
+            raise RuntimeError("关键词索引未启用")
+
+        start_time = time.time()
+        self.keyword_index.delete(self.collection_name)
+        indexed = 0
+        for rows in self.backend.iter_rows(self.collection_name, self.insert_batch_size):
+            self.keyword_index.add(
+                self.collection_name,
+                [row[ID_FIELD] for row in rows],
+                [row.get(TEXT_FIELD) or "" for row in rows],
+                [self._user_id_of(row.get(METADATA_FIELD) or {}) for row in rows]
+            )
+            indexed += len(rows)
+        self._invalidate_cache()
+
+        logger.info(f"集合 {self.collection_name} 关键词索引重建完成 - 行数: {indexed}, 耗时: {time.time() - start_time:.2f}秒")
+        return indexed
+
     def delete_collection(self) -> bool:
         """
         删除集合
@@ -258,12 +873,16 @@ class MilvusVectorStore:
             bool: 操作是否成功
         """
         try:
-            if not self.client:
-                logger.error("Milvus客户端未初始化")
+            if not self.backend:
+                logger.error("存储后端未初始化")
                 return False
 
-            if self.client.has_collection(self.collection_name):
-                self.client.drop_collection(self.collection_name)
+            if self.keyword_index is not None:
+                self.keyword_index.delete(self.collection_name)
+
+            if self.backend.has_collection(self.collection_name):
+                self.backend.drop_collection(self.collection_name)
+                self._invalidate_cache()
                 logger.info(f"集合 {self.collection_name} 已删除")
                 return True
             else:
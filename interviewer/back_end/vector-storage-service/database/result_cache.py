@@ -0,0 +1,204 @@
+"""
+检索结果缓存 - 独立服务版本
+按规范化后的检索参数缓存 (Document, score) 结果，TTL + LRU 淘汰，集合版本号失效
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+SearchResults = List[Tuple[Document, float]]
+
+
+class SearchResultCache:
+    """
+    检索结果缓存
+
+    每个集合维护一个版本号，写入或删除集合时递增；缓存条目记录写入时的版本号，
+    读取时版本号不一致即视为失效，因此不会返回写入之前的旧结果。
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 300):
+        """
+        初始化检索结果缓存
+
+        Args:
+            max_entries: 最大缓存条目数，超过时淘汰最久未使用的条目
+            ttl: 条目有效期(秒)
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+
+        # 缓存键 -> (集合版本号, 过期时间, 检索结果)
+        self._entries: "OrderedDict[Tuple, Tuple[int, float, SearchResults]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        # 集合名 -> [命中数, 未命中数]
+        self._counters: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+        self.evictions = 0
+        self.invalidations = 0
+
+        logger.info(f"检索结果缓存初始化完成 - 容量: {self.max_entries}, 有效期: {ttl}秒")
+
+    @staticmethod
+    def make_key(collection_name: str,
+                 embedding_model: str,
+                 mode: str,
+                 query: str,
+                 k: int,
+                 filter_expr: Optional[str] = None,
+                 user_id: Optional[str] = None) -> Tuple:
+        """
+        生成缓存键，查询文本和过滤表达式的空白差异不影响命中
+
+        Args:
+            collection_name: 集合名称
+            embedding_model: 嵌入模型类型
+            mode: 检索模式，dense 或 hybrid
+            query: 查询文本
+            k: 返回结果数量
+            filter_expr: 过滤表达式
+            user_id: 用户ID
+
+        Returns:
+            Tuple: 缓存键
+        """
+        return (
+            collection_name,
+            embedding_model,
+            mode,
+            " ".join(query.split()),
+            k,
+            " ".join((filter_expr or "").split()),
+            user_id or ""
+        )
+
+    def version(self, collection_name: str) -> int:
+        """获取集合当前版本号，检索前读取，写入缓存时一并提交"""
+        with self._lock:
+            return self._versions.get(collection_name, 0)
+
+    def bump(self, collection_name: str):
+        """集合数据变更后递增版本号，并清除该集合的缓存条目"""
+        with self._lock:
+            self._versions[collection_name] = self._versions.get(collection_name, 0) + 1
+            stale = [key for key in self._entries if key[0] == collection_name]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def get(self, key: Tuple) -> Optional[SearchResults]:
+        """
+        读取缓存
+
+        Args:
+            key: make_key 生成的缓存键
+
+        Returns:
+            Optional[SearchResults]: 命中时返回结果列表的副本，否则返回None
+        """
+        collection_name = key[0]
+        with self._lock:
+            counters = self._counters.setdefault(collection_name, [0, 0])
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, expires_at, results = entry
+                if version == self._versions.get(collection_name, 0) and expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    counters[0] += 1
+                    return list(results)
+                del self._entries[key]
+            counters[1] += 1
+            return None
+
+    def put(self, key: Tuple, version: int, results: SearchResults):
+        """
+        写入缓存
+
+        Args:
+            key: make_key 生成的缓存键
+            version: 检索开始前读取的集合版本号，检索期间集合有写入时丢弃本次结果
+            results: 检索结果
+        """
+        with self._lock:
+            if version != self._versions.get(key[0], 0):
+                return
+            self._entries[key] = (version, time.time() + self.ttl, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self, collection_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Args:
+            collection_name: 集合名称，为空时返回全局统计
+
+        Returns:
+            Dict[str, Any]: 命中数、未命中数、命中率等
+        """
+        with self._lock:
+            if collection_name is None:
+                hits = sum(counter[0] for counter in self._counters.values())
+                misses = sum(counter[1] for counter in self._counters.values())
+                extra = {
+                    "entries": len(self._entries),
+                    "max_entries": self.max_entries,
+                    "ttl": self.ttl,
+                    "evictions": self.evictions,
+                    "invalidations": self.invalidations
+                }
+            else:
+                hits, misses = self._counters.get(collection_name, [0, 0])
+                extra = {"version": self._versions.get(collection_name, 0)}
+
+        total = hits + misses
+        return {
+            "enabled": True,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            **extra
+        }
+
+
+_result_cache: Optional[SearchResultCache] = None
+_result_cache_lock = threading.Lock()
+_multi_worker_warned = False
+
+
+def get_result_cache() -> Optional[SearchResultCache]:
+    """
+    获取全局检索结果缓存，未启用时返回None
+
+    集合版本号保存在进程内，多worker部署时其他进程的写入无法使本进程的缓存失效，
+    因此 API_WORKERS 大于1时不启用缓存。
+    """
+    global _result_cache, _multi_worker_warned
+
+    if os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() != 'true':
+        return None
+
+    if int(os.getenv('API_WORKERS', '1')) > 1:
+        if not _multi_worker_warned:
+            _multi_worker_warned = True
+            logger.warning("API_WORKERS 大于1，检索结果缓存无法跨进程失效，已禁用")
+        return None
+
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = SearchResultCache(
+                max_entries=int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '2048')),
+                ttl=float(os.getenv('SEARCH_CACHE_TTL_SECONDS', '300'))
+            )
+    return _result_cache
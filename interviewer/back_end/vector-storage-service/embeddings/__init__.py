@@ -3,5 +3,6 @@
 """
 
 from .embedding_service import EmbeddingService, ZhipuAIEmbeddings, embedding_service
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
 
-__all__ = ['EmbeddingService', 'ZhipuAIEmbeddings', 'embedding_service']
\ No newline at end of file
+__all__ = ['EmbeddingService', 'ZhipuAIEmbeddings', 'embedding_service', 'EmbeddingCache', 'CachedEmbeddings']
\ No newline at end of file
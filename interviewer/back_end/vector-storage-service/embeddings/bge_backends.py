@@ -0,0 +1,155 @@
+"""
+BGE推理后端 - 独立服务版本
+提供PyTorch、int8动态量化、ONNX Runtime三种CPU推理后端
+"""
+
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 支持的后端类型
+BGE_BACKENDS = ("torch", "int8", "onnx")
+
+
+class OnnxBGEEncoder:
+    """
+    基于ONNX Runtime的BGE编码器
+
+    接口与 SentenceTransformer.encode 保持一致，按文本长度分桶后再做padding，
+    使用CLS向量作为句向量（与bge-small-zh-v1.5的池化方式一致）。
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 onnx_path: Optional[str] = None,
+                 intra_op_threads: int = 0,
+                 bucket_size: int = 16,
+                 max_seq_length: int = 512):
+        """
+        初始化ONNX编码器
+
+        Args:
+            model_name: HuggingFace模型名称，用于加载分词器和按需导出ONNX
+            onnx_path: 已导出的ONNX模型目录，为空时从model_name导出
+            intra_op_threads: 算子内并行线程数，0表示由ONNX Runtime决定
+            bucket_size: 每个长度分桶的文本数
+            max_seq_length: 最大序列长度
+        """
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+        except ImportError:
+            raise ImportError("请安装ONNX推理依赖: pip install onnxruntime optimum[onnxruntime]")
+
+        self.bucket_size = max(1, bucket_size)
+        self.max_seq_length = max_seq_length
+
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = intra_op_threads
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        source = onnx_path or model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(source)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            source,
+            export=not onnx_path,
+            provider="CPUExecutionProvider",
+            session_options=session_options
+        )
+        logger.info(f"ONNX编码器初始化成功: {source}, 线程数: {intra_op_threads or 'auto'}")
+
+    def _encode_bucket(self, texts: List[str]) -> np.ndarray:
+        """编码一个长度相近的分桶"""
+        inputs = self.tokenizer(
+            texts,
+            padding="longest",
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np"
+        )
+        outputs = self.model(**inputs)
+        hidden = outputs.last_hidden_state
+        if not isinstance(hidden, np.ndarray):
+            hidden = hidden.numpy()
+        return hidden[:, 0]
+
+    def encode(self, texts: List[str], normalize_embeddings: bool = True, **kwargs) -> np.ndarray:
+        """
+        编码文本列表
+
+        Args:
+            texts: 文本列表
+            normalize_embeddings: 是否做L2归一化
+
+        Returns:
+            np.ndarray: 形状为 (len(texts), dim) 的float32数组
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # 按长度排序分桶，减少每桶内的padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        embeddings = None
+        for start in range(0, len(order), self.bucket_size):
+            indexes = order[start:start + self.bucket_size]
+            bucket = self._encode_bucket([texts[i] for i in indexes])
+            if embeddings is None:
+                embeddings = np.empty((len(texts), bucket.shape[1]), dtype=np.float32)
+            embeddings[indexes] = bucket
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+
+        return embeddings
+
+
+def load_bge_model(model_name: str,
+                   device: str = "cpu",
+                   backend: str = "torch",
+                   intra_op_threads: int = 0,
+                   onnx_path: Optional[str] = None,
+                   bucket_size: int = 16):
+    """
+    按后端类型加载BGE模型
+
+    Args:
+        model_name: 模型名称
+        device: 推理设备，int8和onnx后端仅支持cpu
+        backend: 后端类型，'torch'、'int8' 或 'onnx'
+        intra_op_threads: 算子内并行线程数，0表示使用默认值
+        onnx_path: 已导出的ONNX模型目录
+        bucket_size: ONNX后端的长度分桶大小
+
+    Returns:
+        具有 encode(texts, normalize_embeddings=...) 接口的模型对象
+    """
+    if backend not in BGE_BACKENDS:
+        raise ValueError(f"不支持的BGE推理后端: {backend}，可选 {', '.join(BGE_BACKENDS)}")
+
+    if backend == "onnx":
+        return OnnxBGEEncoder(
+            model_name,
+            onnx_path=onnx_path,
+            intra_op_threads=intra_op_threads,
+            bucket_size=bucket_size
+        )
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if intra_op_threads > 0:
+        torch.set_num_threads(intra_op_threads)
+
+    if backend == "torch":
+        return SentenceTransformer(model_name, device=device)
+
+    # int8动态量化只作用于Linear层，仅支持CPU
+    model = SentenceTransformer(model_name, device="cpu")
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    logger.info(f"BGE模型已完成int8动态量化: {model_name}")
+    return model
@@ -0,0 +1,300 @@
+"""
+嵌入向量缓存 - 独立服务版本
+按 (模型类型, 模型名称, sha256(文本)) 缓存向量，内存LRU + SQLite磁盘两级存储
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    两级嵌入向量缓存
+
+    内存层使用OrderedDict实现LRU；磁盘层使用SQLite，向量以float32字节存储，
+    超过容量时按最近访问时间淘汰。
+    """
+
+    def __init__(self,
+                 db_path: str = "./cache/embeddings.db",
+                 memory_size: int = 10000,
+                 max_disk_entries: int = 200000):
+        """
+        初始化嵌入缓存
+
+        Args:
+            db_path: SQLite数据库文件路径
+            memory_size: 内存层最大条目数
+            max_disk_entries: 磁盘层最大条目数
+        """
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 命中统计
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        # 连接在锁保护下跨线程共享
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                cache_key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+        self._conn.commit()
+
+        # 磁盘层条目数，写入时增量维护，避免每次写入都全表计数
+        self._disk_count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        logger.info(f"嵌入缓存初始化完成 - 路径: {db_path}, 内存容量: {memory_size}, 磁盘容量: {max_disk_entries}")
+
+    @staticmethod
+    def make_key(model_type: str, model_name: str, text: str) -> str:
+        """生成缓存键"""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model_type}:{model_name}:{text_hash}"
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """写入内存层并执行LRU淘汰，调用方需持有锁"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        批量查询缓存
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            List[Optional[np.ndarray]]: 与keys对应的向量，未命中为None
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+
+        with self._lock:
+            disk_lookup = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[i] = vector
+                else:
+                    disk_lookup.setdefault(key, []).append(i)
+
+            if not disk_lookup:
+                return results
+
+            found = {}
+            lookup_keys = list(disk_lookup)
+            # SQLite单条语句参数个数有限，分段查询
+            for start in range(0, len(lookup_keys), 500):
+                part = lookup_keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT cache_key, vector FROM embeddings WHERE cache_key IN ({placeholders})",
+                    part
+                ).fetchall()
+                for cache_key, blob in rows:
+                    found[cache_key] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE cache_key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            for key, indexes in disk_lookup.items():
+                vector = found.get(key)
+                if vector is None:
+                    self.misses += len(indexes)
+                    continue
+                self.disk_hits += len(indexes)
+                self._remember(key, vector)
+                for i in indexes:
+                    results[i] = vector
+
+        return results
+
+    def put_many(self, items: List[Tuple[str, Any]]):
+        """
+        批量写入缓存
+
+        Args:
+            items: (缓存键, 向量) 列表
+        """
+        if not items:
+            return
+
+        now = time.time()
+        rows = []
+        with self._lock:
+            for key, vector in items:
+                # 复制一份，避免内存层持有整个批次数组的视图
+                array = np.array(vector, dtype=np.float32)
+                self._remember(key, array)
+                rows.append((key, int(array.shape[0]), array.tobytes(), now))
+
+            # 同一缓存键的向量相同，已存在的条目只需刷新访问时间；rowcount 即新增条目数
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (cache_key, dim, vector, last_access) VALUES (?, ?, ?, ?)",
+                rows
+            ).rowcount
+            if inserted < len(rows):
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE cache_key = ?",
+                    [(now, row[0]) for row in rows]
+                )
+            self._disk_count += inserted
+            self._evict_disk()
+            self._conn.commit()
+
+    def _evict_disk(self):
+        """磁盘层超出容量时淘汰最久未访问的条目，调用方需持有锁"""
+        if self._disk_count <= self.max_disk_entries:
+            return
+
+        # 一次多淘汰10%，避免每次写入都触发淘汰
+        overflow = self._disk_count - int(self.max_disk_entries * 0.9)
+        deleted = self._conn.execute(
+            "DELETE FROM embeddings WHERE cache_key IN "
+            "(SELECT cache_key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+            (overflow,)
+        ).rowcount
+        self._disk_count -= deleted
+        self.evictions += deleted
+        logger.info(f"嵌入缓存磁盘层淘汰 {deleted} 条")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            # 统计接口调用不频繁，顺便校正增量维护的条目数（其他进程共享同一数据库时会有偏差）
+            disk_entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._disk_count = disk_entries
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(hits / total, 4) if total else 0.0
+            }
+
+
+class CachedEmbeddings:
+    """
+    带缓存的嵌入模型包装器
+
+    对外暴露与被包装模型相同的 embed_array / embed_documents / embed_query 接口，
+    只对缓存未命中的文本调用底层模型。
+    """
+
+    def __init__(self, model, cache: EmbeddingCache, model_type: str, model_name: str):
+        self.model = model
+        self.cache = cache
+        self.model_type = model_type
+        self.model_name = model_name
+
+    def __getattr__(self, name):
+        # 其余属性透传给底层模型
+        return getattr(self.model, name)
+
+    def _key(self, text: str) -> str:
+        return EmbeddingCache.make_key(self.model_type, self.model_name, text)
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], List[Optional[np.ndarray]], Dict[str, str]]:
+        """查询缓存，返回缓存键、命中结果和去重后的未命中文本"""
+        keys = [self._key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+
+        pending: Dict[str, str] = {}
+        for key, text, vector in zip(keys, texts, cached):
+            if vector is None:
+                pending.setdefault(key, text)
+
+        return keys, cached, pending
+
+    def _merge(self, keys: List[str], cached: List[Optional[np.ndarray]],
+               pending: Dict[str, str], computed: np.ndarray) -> np.ndarray:
+        """写入新计算的向量并按输入顺序拼装为float32数组"""
+        computed_map: Dict[str, np.ndarray] = {}
+        if pending:
+            computed_map = dict(zip(pending.keys(), computed))
+            self.cache.put_many(list(computed_map.items()))
+
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+
+        vectors = [vector if vector is not None else computed_map[key] for key, vector in zip(keys, cached)]
+        result = np.empty((len(vectors), vectors[0].shape[0]), dtype=np.float32)
+        for i, vector in enumerate(vectors):
+            result[i] = vector
+        return result
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """嵌入多个文档，命中缓存的文本不再计算，返回float32数组"""
+        keys, cached, pending = self._lookup(texts)
+        computed = self.model.embed_array(list(pending.values())) if pending else None
+        return self._merge(keys, cached, pending, computed)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """嵌入多个文档"""
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """嵌入单个查询，优先读取缓存"""
+        return self.embed_array([text])[0].tolist()
+
+    async def aembed_array(self, texts: List[str]) -> np.ndarray:
+        """
+        异步嵌入多个文档，缓存未命中部分交给底层模型的异步接口
+
+        缓存查询和回写涉及SQLite读写与提交，放到线程中执行，不阻塞事件循环。
+        """
+        keys, cached, pending = await asyncio.to_thread(self._lookup, texts)
+        computed = await self.model.aembed_array(list(pending.values())) if pending else None
+        return await asyncio.to_thread(self._merge, keys, cached, pending, computed)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """异步嵌入多个文档"""
+        return (await self.aembed_array(texts)).tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """异步嵌入单个查询"""
+        return (await self.aembed_array([text]))[0].tolist()
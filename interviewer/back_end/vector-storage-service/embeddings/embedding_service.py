@@ -4,89 +4,278 @@
 """
 
 import os
+import time
+import asyncio
+import random
 import logging
-from typing import List, Optional
-from sentence_transformers import SentenceTransformer
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any
+
+import numpy as np
+from .embedding_cache import EmbeddingCache, CachedEmbeddings
+from .bge_backends import load_bge_model
 
 logger = logging.getLogger(__name__)
 
+class _EncodeBatcher:
+    """
+    编码微批处理器
+
+    在短时间窗口内收集并发的小请求，合并为一次encode调用，
+    结果按提交顺序拆分后回填给各请求。所有状态只在事件循环线程中访问。
+    """
+
+    def __init__(self, encode_fn, executor: ThreadPoolExecutor, window_ms: float, max_batch_size: int):
+        self._encode_fn = encode_fn
+        self._executor = executor
+        self._window = window_ms / 1000.0
+        self._max_batch_size = max_batch_size
+        self._pending = []
+        self._pending_count = 0
+        self._flush_handle = None
+
+    async def submit(self, texts: List[str]) -> np.ndarray:
+        """提交一组文本，等待合并编码的结果"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_count += len(texts)
+
+        if self._pending_count >= self._max_batch_size:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        """把当前窗口内的请求交给推理线程池"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        self._pending_count = 0
+        if not batch:
+            return
+
+        texts = [text for item_texts, _ in batch for text in item_texts]
+        task = loop.run_in_executor(self._executor, self._encode_fn, texts)
+        task.add_done_callback(lambda done: self._dispatch(batch, done))
+
+    @staticmethod
+    def _dispatch(batch, done: asyncio.Future):
+        """按提交顺序拆分合并结果，各请求拿到的是同一数组的切片视图"""
+        error = done.exception()
+        vectors = None if error else done.result()
+
+        offset = 0
+        for item_texts, future in batch:
+            if not future.done():
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(vectors[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
+
 # BGE嵌入模型类
 class BGEEmbeddings:
     """BGE嵌入模型"""
 
-    def __init__(self, model_name: str = "BAAI/bge-small-zh-v1.5", device: str = "cpu", normalize_embeddings: bool = True):
+    def __init__(self,
+                 model_name: str = "BAAI/bge-small-zh-v1.5",
+                 device: str = "cpu",
+                 normalize_embeddings: bool = True,
+                 inference_threads: int = 1,
+                 batch_window_ms: float = 5.0,
+                 max_batch_size: int = 64,
+                 backend: str = "torch",
+                 intra_op_threads: int = 0,
+                 onnx_path: Optional[str] = None):
         self.model_name = model_name
         self.device = device
         self.normalize_embeddings = normalize_embeddings
+        self.max_batch_size = max_batch_size
+        self.backend = backend
 
         try:
-            self.model = SentenceTransformer(model_name, device=device)
-            logger.info(f"BGE嵌入模型初始化成功: {model_name}")
+            self.model = load_bge_model(
+                model_name,
+                device=device,
+                backend=backend,
+                intra_op_threads=intra_op_threads,
+                onnx_path=onnx_path
+            )
+            logger.info(f"BGE嵌入模型初始化成功: {model_name}, 后端: {backend}")
         except Exception as e:
             logger.error(f"BGE嵌入模型初始化失败: {str(e)}")
             raise
 
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """嵌入多个文档"""
+        # 专用推理线程池，避免encode阻塞事件循环
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, inference_threads),
+            thread_name_prefix="bge-inference"
+        )
+        self._batcher = _EncodeBatcher(self._encode, self._executor, batch_window_ms, max_batch_size)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """同步编码，供推理线程池调用，返回连续的float32数组"""
+        embeddings = self.model.encode(
+            texts,
+            normalize_embeddings=self.normalize_embeddings,
+            convert_to_numpy=True
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """嵌入多个文档，返回形状为 (len(texts), dim) 的float32数组"""
         try:
-            embeddings = self.model.encode(texts, normalize_embeddings=self.normalize_embeddings)
-            return embeddings.tolist()
+            return self._encode(texts)
         except Exception as e:
             logger.error(f"BGE文档嵌入失败: {str(e)}")
             raise
 
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """嵌入多个文档"""
+        return self.embed_array(texts).tolist()
+
     def embed_query(self, text: str) -> List[float]:
         """嵌入单个查询"""
+        return self.embed_array([text])[0].tolist()
+
+    async def aembed_array(self, texts: List[str]) -> np.ndarray:
+        """异步嵌入多个文档，小请求参与微批合并，大请求直接提交线程池"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
         try:
-            embedding = self.model.encode([text], normalize_embeddings=self.normalize_embeddings)
-            return embedding[0].tolist()
+            if len(texts) >= self.max_batch_size:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, self._encode, texts)
+            return await self._batcher.submit(texts)
         except Exception as e:
-            logger.error(f"BGE查询嵌入失败: {str(e)}")
+            logger.error(f"BGE异步文档嵌入失败: {str(e)}")
             raise
 
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """异步嵌入多个文档"""
+        return (await self.aembed_array(texts)).tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """异步嵌入单个查询"""
+        return (await self.aembed_array([text]))[0].tolist()
+
+
 # 智谱AI嵌入模型类
 class ZhipuAIEmbeddings:
     """智谱AI嵌入模型"""
 
-    def __init__(self, api_key: str, model: str = "embedding-2"):
+    # 智谱AI单次请求允许的最大输入条数
+    MAX_BATCH_SIZE = 64
+
+    def __init__(self,
+                 api_key: str,
+                 model: str = "embedding-2",
+                 batch_size: int = 64,
+                 max_concurrency: int = 4,
+                 max_retries: int = 3):
         self.api_key = api_key
         self.model = model
         self.base_url = "https://open.bigmodel.cn/api/paas/v4/"
+        self.batch_size = max(1, min(batch_size, self.MAX_BATCH_SIZE))
+        self.max_retries = max_retries
+
+        # 并发信号量在实例内共享，多个请求同时嵌入时总并发仍受限
+        self._semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency),
+            thread_name_prefix="zhipuai-embed"
+        )
 
         # 检查是否安装了zhipuai库
         try:
             from zhipuai import ZhipuAI
             self.client = ZhipuAI(api_key=api_key)
-            logger.info(f"智谱AI嵌入模型初始化成功: {model}")
+            logger.info(f"智谱AI嵌入模型初始化成功: {model}, 批大小: {self.batch_size}, 并发: {max_concurrency}")
         except ImportError:
             raise ImportError("请安装zhipuai库: pip install zhipuai")
 
+    @staticmethod
+    def _is_throttled(error: Exception) -> bool:
+        """判断异常是否为限流"""
+        status_code = getattr(error, "status_code", None)
+        if status_code is None:
+            status_code = getattr(getattr(error, "response", None), "status_code", None)
+        return status_code == 429 or "ReachLimit" in type(error).__name__
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        单次请求嵌入一批文本，遇到限流按指数退避重试
+
+        Args:
+            texts: 一批文本，数量不超过batch_size
+
+        Returns:
+            List[List[float]]: 与输入顺序一致的向量列表
+        """
+        attempt = 0
+        while True:
+            try:
+                with self._semaphore:
+                    response = self.client.embeddings.create(
+                        model=self.model,
+                        input=texts
+                    )
+                # 按返回的index排序，保证与输入顺序一致
+                data = sorted(response.data, key=lambda item: item.index)
+                return [item.embedding for item in data]
+            except Exception as e:
+                if not self._is_throttled(e) or attempt >= self.max_retries:
+                    logger.error(f"智谱AI嵌入失败: {str(e)}")
+                    raise
+                delay = (2 ** attempt) * 0.5 + random.uniform(0, 0.5)
+                attempt += 1
+                logger.warning(f"智谱AI嵌入被限流，{delay:.2f}秒后第{attempt}次重试")
+                time.sleep(delay)
+
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """嵌入多个文档"""
+        if not texts:
+            return []
+
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        # 各批次并发请求，map保证结果按批次顺序返回
         embeddings = []
-        for text in texts:
-            try:
-                response = self.client.embeddings.create(
-                    model=self.model,
-                    input=text
-                )
-                embeddings.append(response.data[0].embedding)
-            except Exception as e:
-                logger.error(f"智谱AI嵌入失败: {str(e)}")
-                raise
+        for batch_embeddings in self._executor.map(self._embed_batch, batches):
+            embeddings.extend(batch_embeddings)
         return embeddings
 
     def embed_query(self, text: str) -> List[float]:
-        """嵌入单个查询"""
-        try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            logger.error(f"智谱AI查询嵌入失败: {str(e)}")
-            raise
+        """嵌入单个查询，与文档嵌入共用并发限制和限流重试"""
+        return self._embed_batch([text])[0]
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        """嵌入多个文档，返回形状为 (len(texts), dim) 的float32数组"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.asarray(self.embed_documents(texts), dtype=np.float32)
+
+    async def aembed_array(self, texts: List[str]) -> np.ndarray:
+        """异步嵌入多个文档，HTTP调用在线程中执行"""
+        return await asyncio.to_thread(self.embed_array, texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """异步嵌入多个文档，HTTP调用在线程中执行"""
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """异步嵌入单个查询"""
+        return await asyncio.to_thread(self.embed_query, text)
 
 
 class EmbeddingService:
@@ -95,15 +284,52 @@ class EmbeddingService:
     def __init__(self):
         self._bge_embedding = None
         self._zhipuai_embedding = None
+        self._cached_models = {}
+        self._cache: Optional[EmbeddingCache] = None
 
         # 从环境变量获取配置
         self.zhipuai_api_key = os.getenv('ZHIPUAI_API_KEY', '')
         self.zhipuai_model = os.getenv('ZHIPUAI_EMBEDDING_MODEL', 'embedding-2')
+        self.zhipuai_batch_size = int(os.getenv('ZHIPUAI_EMBEDDING_BATCH_SIZE', '64'))
+        self.zhipuai_concurrency = int(os.getenv('ZHIPUAI_EMBEDDING_CONCURRENCY', '4'))
+        self.zhipuai_max_retries = int(os.getenv('ZHIPUAI_EMBEDDING_MAX_RETRIES', '3'))
         self.bge_model_name = os.getenv('BGE_MODEL_NAME', 'BAAI/bge-small-zh-v1.5')
         self.bge_device = os.getenv('BGE_DEVICE', 'cpu')
         self.bge_normalize = os.getenv('BGE_NORMALIZE_EMBEDDINGS', 'True').lower() == 'true'
+        self.bge_inference_threads = int(os.getenv('BGE_INFERENCE_THREADS', '1'))
+        self.bge_batch_window_ms = float(os.getenv('BGE_MICRO_BATCH_WINDOW_MS', '5'))
+        self.bge_max_batch_size = int(os.getenv('BGE_MICRO_BATCH_MAX_SIZE', '64'))
+        self.bge_backend = os.getenv('BGE_BACKEND', 'torch').lower()
+        self.bge_intra_op_threads = int(os.getenv('BGE_INTRA_OP_THREADS', '0'))
+        self.bge_onnx_path = os.getenv('BGE_ONNX_PATH') or None
         self.default_model = os.getenv('DEFAULT_EMBEDDING_MODEL', 'zhipuai')
 
+        # 嵌入缓存配置
+        self.cache_enabled = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+        self.cache_db_path = os.getenv('EMBEDDING_CACHE_DB_PATH', './cache/embeddings.db')
+        self.cache_memory_size = int(os.getenv('EMBEDDING_CACHE_MEMORY_SIZE', '10000'))
+        self.cache_max_disk_entries = int(os.getenv('EMBEDDING_CACHE_MAX_DISK_ENTRIES', '200000'))
+
+    def get_cache(self) -> Optional[EmbeddingCache]:
+        """获取嵌入缓存，未启用时返回None"""
+        if not self.cache_enabled:
+            return None
+
+        if self._cache is None:
+            self._cache = EmbeddingCache(
+                db_path=self.cache_db_path,
+                memory_size=self.cache_memory_size,
+                max_disk_entries=self.cache_max_disk_entries
+            )
+
+        return self._cache
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """获取嵌入缓存统计信息"""
+        if not self.cache_enabled:
+            return {"enabled": False}
+        return {"enabled": True, **self.get_cache().get_stats()}
+
     def get_bge_embedding(self):
         """获取BGE嵌入模型"""
         if self._bge_embedding is None:
@@ -112,7 +338,13 @@ class EmbeddingService:
             self._bge_embedding = BGEEmbeddings(
                 model_name=self.bge_model_name,
                 device=self.bge_device,
-                normalize_embeddings=self.bge_normalize
+                normalize_embeddings=self.bge_normalize,
+                inference_threads=self.bge_inference_threads,
+                batch_window_ms=self.bge_batch_window_ms,
+                max_batch_size=self.bge_max_batch_size,
+                backend=self.bge_backend,
+                intra_op_threads=self.bge_intra_op_threads,
+                onnx_path=self.bge_onnx_path
             )
             logger.info("BGE嵌入模型初始化完成")
 
@@ -126,7 +358,10 @@ class EmbeddingService:
 
             self._zhipuai_embedding = ZhipuAIEmbeddings(
                 api_key=self.zhipuai_api_key,
-                model=self.zhipuai_model
+                model=self.zhipuai_model,
+                batch_size=self.zhipuai_batch_size,
+                max_concurrency=self.zhipuai_concurrency,
+                max_retries=self.zhipuai_max_retries
             )
 
         return self._zhipuai_embedding
@@ -143,13 +378,26 @@ class EmbeddingService:
         """
         model_type = model_type or self.default_model
 
+        if model_type in self._cached_models:
+            return self._cached_models[model_type]
+
         if model_type == 'bge':
-            return self.get_bge_embedding()
+            model = self.get_bge_embedding()
+            # 不同推理后端（int8量化、ONNX）的输出向量有细微差异，缓存按后端区分
+            model_name = f"{self.bge_model_name}:{self.bge_backend}"
         elif model_type == 'zhipuai':
-            return self.get_zhipuai_embedding()
+            model = self.get_zhipuai_embedding()
+            model_name = self.zhipuai_model
         else:
             raise ValueError(f"不支持的嵌入模型类型: {model_type}")
 
+        cache = self.get_cache()
+        if cache is None:
+            return model
+
+        self._cached_models[model_type] = CachedEmbeddings(model, cache, model_type, model_name)
+        return self._cached_models[model_type]
+
     def embed_texts(self, texts: List[str], model_type: Optional[str] = None) -> List[List[float]]:
         """
         嵌入文本列表
@@ -178,6 +426,21 @@ class EmbeddingService:
         embedding_model = self.get_embedding_model(model_type)
         return embedding_model.embed_query(text)
 
+    async def aembed_array(self, texts: List[str], model_type: Optional[str] = None) -> np.ndarray:
+        """异步嵌入文本列表，返回float32数组，供服务内部使用"""
+        embedding_model = self.get_embedding_model(model_type)
+        return await embedding_model.aembed_array(texts)
+
+    async def aembed_texts(self, texts: List[str], model_type: Optional[str] = None) -> List[List[float]]:
+        """异步嵌入文本列表，不阻塞事件循环"""
+        embedding_model = self.get_embedding_model(model_type)
+        return await embedding_model.aembed_documents(texts)
+
+    async def aembed_query(self, text: str, model_type: Optional[str] = None) -> List[float]:
+        """异步嵌入查询文本，不阻塞事件循环"""
+        embedding_model = self.get_embedding_model(model_type)
+        return await embedding_model.aembed_query(text)
+
 
 # 全局嵌入服务实例
 embedding_service = EmbeddingService()
\ No newline at end of file
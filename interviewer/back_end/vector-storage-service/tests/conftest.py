@@ -0,0 +1,8 @@
+"""
+测试公共配置：将服务根目录加入导入路径，与 main.py 启动时的模块布局一致
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,122 @@
+"""
+本地HNSW后端测试：过滤表达式编译、按主键覆盖写入、精确检索与HNSW检索结果一致
+"""
+
+import numpy as np
+import pytest
+
+from database import local_backend
+from database.backend import ID_FIELD, VECTOR_FIELD, TEXT_FIELD, METADATA_FIELD, USER_ID_FIELD
+from database.local_backend import LocalHNSWBackend, compile_filter
+
+DIM = 16
+
+
+def make_row(index: int, vector: np.ndarray, user_id: str = "u1", **metadata):
+    return {
+        ID_FIELD: f"id{index}",
+        VECTOR_FIELD: vector,
+        TEXT_FIELD: f"text{index}",
+        METADATA_FIELD: {"user_id": user_id, **metadata},
+        USER_ID_FIELD: user_id
+    }
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    # 调大 ef，使小数据集上HNSW的结果与精确检索一致
+    monkeypatch.setenv("LOCAL_HNSW_EF_SEARCH", "400")
+    backend = LocalHNSWBackend(str(tmp_path / "store"))
+    yield backend
+    backend.close()
+
+
+def test_compile_filter_fields_and_operators():
+    row = {ID_FIELD: "id1", USER_ID_FIELD: "u1", METADATA_FIELD: {"page": 3, "source": "a.pdf"}}
+
+    assert compile_filter(None) is None
+    assert compile_filter("  ") is None
+    assert compile_filter('user_id == "u1"')(row)
+    assert not compile_filter("user_id != 'u1'")(row)
+    assert compile_filter('metadata["page"] >= 3 and metadata["page"] < 4')(row)
+    assert compile_filter('(user_id == "u1") and (metadata["source"] in ["a.pdf", "b.pdf"])')(row)
+    assert compile_filter('id not in ["id2", "id3"]')(row)
+    # 缺失的元数据字段不满足范围比较
+    assert not compile_filter('metadata["missing"] > 1')(row)
+
+
+@pytest.mark.parametrize("expr", [
+    'user_id == "u1" or user_id == "u2"',
+    'user_id == "u1" || user_id == "u2"',
+    'text like "abc%"',
+    'metadata["page"] >= ',
+    'user_id == u1',
+])
+def test_compile_filter_rejects_unsupported_expressions(expr):
+    with pytest.raises(ValueError):
+        compile_filter(expr)
+
+
+def test_compile_filter_keeps_or_inside_string_literal():
+    predicate = compile_filter('metadata["title"] == "a or b"')
+    assert predicate({METADATA_FIELD: {"title": "a or b"}})
+
+
+def test_upsert_replaces_vector_and_hides_old_label(backend):
+    rng = np.random.default_rng(0)
+    backend.create_collection("c", DIM)
+    old_vector = rng.standard_normal(DIM).astype(np.float32)
+    new_vector = -old_vector
+    backend.write("c", [make_row(0, old_vector)] + [make_row(i, rng.standard_normal(DIM)) for i in range(1, 50)])
+
+    backend.write("c", [{**make_row(0, new_vector), TEXT_FIELD: "updated"}])
+
+    assert backend.count("c") == 50
+    hits = backend.search("c", [old_vector], 50)[0]
+    assert [hit[ID_FIELD] for hit in hits].count("id0") == 1
+    replaced = next(hit for hit in hits if hit[ID_FIELD] == "id0")
+    assert replaced["entity"][TEXT_FIELD] == "updated"
+    assert replaced["distance"] == pytest.approx(-1.0, abs=1e-5)
+    # 新向量方向上 id0 排第一
+    assert backend.search("c", [new_vector], 1)[0][0][ID_FIELD] == "id0"
+
+
+def test_upsert_survives_reopen(backend, tmp_path):
+    rng = np.random.default_rng(1)
+    backend.create_collection("c", DIM)
+    vector = rng.standard_normal(DIM).astype(np.float32)
+    backend.write("c", [make_row(0, vector), make_row(1, rng.standard_normal(DIM))])
+    backend.write("c", [make_row(0, -vector)])
+    backend.close()
+
+    reopened = LocalHNSWBackend(str(tmp_path / "store"))
+    try:
+        assert reopened.count("c") == 2
+        hits = reopened.search("c", [-vector], 2)[0]
+        assert [hit[ID_FIELD] for hit in hits] == ["id0", "id1"]
+    finally:
+        reopened.close()
+
+
+def test_filtered_search_exact_and_hnsw_agree(backend, monkeypatch):
+    pytest.importorskip("hnswlib")
+    rng = np.random.default_rng(2)
+    backend.create_collection("c", DIM)
+    vectors = rng.standard_normal((3000, DIM)).astype(np.float32)
+    backend.write("c", [make_row(i, vectors[i], user_id=f"u{i % 3}", page=i % 10) for i in range(3000)])
+    queries = rng.standard_normal((5, DIM)).astype(np.float32)
+    expr = 'user_id == "u1" and metadata["page"] < 8'
+
+    # 候选数（约800）低于阈值，走精确检索
+    exact = backend.search("c", queries, 10, expr)
+    # 阈值调到0，同样的过滤改走HNSW
+    monkeypatch.setattr(local_backend, "EXACT_SEARCH_THRESHOLD", 0)
+    approximate = backend.search("c", queries, 10, expr)
+
+    predicate = compile_filter(expr)
+    for exact_hits, approximate_hits in zip(exact, approximate):
+        assert len(exact_hits) == 10
+        assert [hit[ID_FIELD] for hit in approximate_hits] == [hit[ID_FIELD] for hit in exact_hits]
+        for hit in approximate_hits:
+            index = int(hit[ID_FIELD][2:])
+            assert predicate({USER_ID_FIELD: f"u{index % 3}", METADATA_FIELD: hit["entity"][METADATA_FIELD]})